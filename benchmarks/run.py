@@ -0,0 +1,285 @@
+"""
+Offline benchmarks of the router, the agent run path and MCP tool calls, against local stand-ins for every service.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+Starts the fake Honu platform (Conversation server and scheduling API), a fake MCP server and the router with a
+stub-model agent, each served by uvicorn on 127.0.0.1, then measures each scenario. By default the router is added to
+the ADK's own app from `get_fast_api_app` and reaches the agent over its HTTP API, as deployed. Pass
+`--session-client in-process` to run the agent in the router's process instead. Results are written as JSON,
+and compared against a baseline when one is given, exiting with status 1 if any scenario regressed.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import platform as python_platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+import httpx
+import structlog
+
+from honu_google_adk.main import HonuToolSet
+from honu_google_adk.mcp_session_pool import MCPSessionPool
+from honu_google_adk.testing import (
+    STUB_APP_NAME,
+    FakeHonuPlatform,
+    ServerThread,
+    build_adk_router_app,
+    build_fake_mcp_server,
+    build_router_app,
+    build_stub_app,
+    free_port,
+    write_stub_agents_dir,
+)
+from honu_google_adk.testing.stats import compare, summarise
+from honu_google_adk.tool_result_cache import ToolResultCache
+
+
+class _BenchToolContext:
+
+    def __init__(self, state: dict[str, Any]):
+        self.state = state
+
+    async def save_artifact(self, filename, artifact):
+        raise ValueError('Artifact service is not initialized.')
+
+
+async def _measure(make_request: Callable[[int], Awaitable[bool]], requests: int, concurrency: int) -> dict[str, float]:
+    """
+    Make `requests` requests, `concurrency` at a time.
+    :param make_request: Makes the i-th request, returning whether it succeeded.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def _one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                success = await make_request(i)
+            except Exception:
+                success = False
+            if success:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_one(i) for i in range(requests)))
+    return summarise(latencies, errors, time.perf_counter() - start)
+
+
+def _signature(agent_url: str, model_ref: str) -> str:
+    payload = {'agent_url': agent_url, 'app_name': STUB_APP_NAME, 'model_ref': model_ref}
+    return 'external_agent/' + base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+async def _router_scenarios(
+        router_url: str,
+        fake_platform: FakeHonuPlatform,
+        token: str,
+        requests: int,
+        concurrency: int,
+) -> dict[str, dict[str, float]]:
+    results = {}
+    model_refs = [f'model|bench|m{i}' for i in range(requests)]
+    async with httpx.AsyncClient(base_url=router_url, timeout=120) as client:
+
+        async def _engage(i: int) -> bool:
+            response = await client.post(
+                f'/hapra/v1/agents/{STUB_APP_NAME}/init_engagement',
+                json={'mdl_ref': model_refs[i], 'auth_token': token, 'agent_signature': _signature(router_url, model_refs[i])},
+            )
+            return response.status_code == 201
+        results['init_engagement'] = await _measure(_engage, requests, concurrency)
+
+        conversations = list(fake_platform.conversations.values())
+        # Let the intros init_engagement left running finish, so they aren't measured with the messages
+        for conversation in conversations:
+            while True:
+                response = await client.get(f'/hapra/v1/agents/{STUB_APP_NAME}/engagements/{conversation["conversation_id"]}')
+                if all(response.json()[step]['status'] not in ('pending', 'running') for step in ('intro', 'brainbeat')):
+                    break
+                await asyncio.sleep(0.01)
+
+        def _message(i: int, text: str) -> dict:
+            conversation = conversations[i % len(conversations)]
+            return {
+                'agent_signature': _signature(router_url, conversation['mdl_ref']),
+                'conversation': conversation,
+                'message': {
+                    'message_id': f'bench-{i}',
+                    'author_id': 'user',
+                    'timestamp': datetime.now(timezone.utc).isoformat(),
+                    'payload': {'body': text},
+                },
+            }
+
+        async def _send(i: int) -> bool:
+            response = await client.post('/hapra/v1/messages', json=_message(i, f'Benchmark message {i}'))
+            return response.is_success
+        results['messages'] = await _measure(_send, requests, concurrency)
+
+        async def _send_with_tool_call(i: int) -> bool:
+            response = await client.post('/hapra/v1/messages', json=_message(i, 'call get_board {"board_id": "board_%d"}' % (i % 20)))
+            return response.is_success
+        results['messages_with_tool_call'] = await _measure(_send_with_tool_call, requests, concurrency)
+
+        async def _brainbeat(i: int) -> bool:
+            conversation = conversations[i % len(conversations)]
+            response = await client.post(
+                '/hapra/v1/scheduler',
+                json={'app_name': STUB_APP_NAME, 'session_id': conversation['conversation_id'], 'message': 'Brainbeat'},
+            )
+            return response.is_success and response.json() == 'success'
+        results['scheduler'] = await _measure(_brainbeat, requests, concurrency)
+
+        async def _disengage(i: int) -> bool:
+            response = await client.post(
+                f'/hapra/v1/agents/{STUB_APP_NAME}/disengage',
+                json={'mdl_ref': model_refs[i], 'agent_signature': _signature(router_url, model_refs[i])},
+            )
+            return response.is_success and all(result['success'] for result in response.json()['results'])
+        results['disengage_agent'] = await _measure(_disengage, requests, concurrency)
+    return results
+
+
+async def _mcp_tool_scenarios(mcp_host: str, token: str, requests: int, concurrency: int) -> dict[str, dict[str, float]]:
+    # Own pool and cache, as the shared ones belong to the router's event loop. Results expire straight away so every
+    # call goes to the MCP host
+    pool = MCPSessionPool()
+    toolset = HonuToolSet(mcp_host, session_pool=pool, result_cache=ToolResultCache(ttl=0))
+    tools = {tool.name: tool for tool in await toolset.get_tools()}
+    tool_context = _BenchToolContext({'token': token, 'model_ref': 'model|bench|tools'})
+    results = {}
+    try:
+        async def _read(i: int) -> bool:
+            response = await tools['get_board'].run_async(args={'board_id': f'board_{i % 20}'}, tool_context=tool_context)
+            return response['success']
+        results['mcp_tool_read'] = await _measure(_read, requests, concurrency)
+
+        async def _write(i: int) -> bool:
+            response = await tools['add_card'].run_async(args={'board_id': 'board_0', 'name': f'Card {i}'}, tool_context=tool_context)
+            return response['success']
+        results['mcp_tool_write'] = await _measure(_write, requests, concurrency)
+    finally:
+        await toolset.close()
+        await pool.close()
+    return results
+
+
+def run_benchmarks(
+        requests: int = 50,
+        concurrency: int = 10,
+        model_latency: float = 0,
+        backend_latency: float = 0,
+        session_client: str = 'http',
+) -> dict[str, dict[str, float]]:
+    """
+    Run every scenario against freshly started stand-ins.
+    :param requests: Number of requests made in each scenario.
+    :param concurrency: Number of requests in flight at once.
+    :param model_latency: Seconds each stub model turn takes.
+    :param backend_latency: Seconds each request to the fake platform takes.
+    :param session_client: How the router reaches the agent. `http` serves the router from the ADK's app and goes
+        through its HTTP API with LocalSessionClient, `in-process` runs the agent with InProcessSessionClient.
+    :return: Latency and throughput stats for each scenario.
+    """
+    fake_platform = FakeHonuPlatform(latency=backend_latency)
+    with (
+        ServerThread(fake_platform.app) as platform_server,
+        ServerThread(build_fake_mcp_server().http_app()) as mcp_server,
+        tempfile.TemporaryDirectory() as agents_dir,
+    ):
+        mcp_host = f'{mcp_server.url}/mcp'
+        token = FakeHonuPlatform.make_token(platform_server.url)
+        port = free_port()
+        router_options = {'agents_with_brainbeats': {STUB_APP_NAME: '0 9 * * *'}}
+        if session_client == 'http':
+            write_stub_agents_dir(agents_dir, mcp_host=mcp_host, model_latency=model_latency)
+            app, _ = build_adk_router_app(f'http://127.0.0.1:{port}', port, agents_dir, **router_options)
+        else:
+            app, _ = build_router_app(
+                f'http://127.0.0.1:{port}',
+                {STUB_APP_NAME: build_stub_app(mcp_host=mcp_host, model_latency=model_latency)},
+                **router_options,
+            )
+        with ServerThread(app, port) as router_server:
+            results = asyncio.run(_router_scenarios(router_server.url, fake_platform, token, requests, concurrency))
+        results.update(asyncio.run(_mcp_tool_scenarios(mcp_host, token, requests, concurrency)))
+    return results
+
+
+def _print_results(results: dict[str, dict[str, float]]):
+    print(f'{"scenario":<26}{"requests":>9}{"errors":>8}{"rps":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}')
+    for scenario, result in results.items():
+        print(
+            f'{scenario:<26}{result["requests"]:>9}{result["errors"]:>8}{result["throughput_rps"]:>9.1f}'
+            f'{result["p50_ms"]:>9.1f}{result["p95_ms"]:>9.1f}{result["p99_ms"]:>9.1f}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the offline benchmarks.')
+    parser.add_argument('--requests', type=int, default=50, help='Requests made in each scenario.')
+    parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight at once.')
+    parser.add_argument('--model-latency', type=float, default=0, help='Seconds each stub model turn takes.')
+    parser.add_argument('--backend-latency', type=float, default=0, help='Seconds each fake platform request takes.')
+    parser.add_argument(
+        '--session-client',
+        choices=['http', 'in-process'],
+        default='http',
+        help='Reach the agent through the ADK app\'s HTTP API, as deployed, or run it in the router\'s process.',
+    )
+    parser.add_argument('--output', default='benchmark_results.json', help='File the results are written to.')
+    parser.add_argument('--baseline', help='Results of an earlier run to compare against.')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='Allowed relative regression, e.g. 0.2 for 20%%.')
+    args = parser.parse_args()
+
+    # Per request logs would drown out the results
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    logging.getLogger().setLevel(logging.WARNING)
+    # The ADK's tracing warns on every call of a tool without a description, as the fake MCP server's tools are
+    logging.getLogger('opentelemetry.attributes').setLevel(logging.ERROR)
+
+    results = run_benchmarks(args.requests, args.concurrency, args.model_latency, args.backend_latency, args.session_client)
+    _print_results(results)
+    with open(args.output, 'w') as f:
+        json.dump(
+            {
+                'meta': {
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    'python': python_platform.python_version(),
+                    'requests': args.requests,
+                    'concurrency': args.concurrency,
+                    'model_latency': args.model_latency,
+                    'backend_latency': args.backend_latency,
+                    'session_client': args.session_client,
+                },
+                'results': results,
+            },
+            f,
+            indent=2,
+        )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(baseline, results, args.max_regression)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
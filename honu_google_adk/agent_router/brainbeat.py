@@ -0,0 +1,60 @@
+import hashlib
+
+import structlog
+
+logger = structlog.get_logger('honu_google_adk.brainbeat')
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def brainbeat_offset(key: str, window_minutes: int) -> int:
+    """
+    A stable offset in [0, window_minutes) for the key, the same in every process and on every restart.
+    """
+    if window_minutes <= 1:
+        return 0
+    digest = hashlib.sha256(key.encode()).digest()
+    return int.from_bytes(digest[:8], 'big') % window_minutes
+
+
+def _int_list(field: str) -> list[int] | None:
+    try:
+        return [int(value) for value in field.split(',')]
+    except ValueError:
+        return None
+
+
+def jitter_cron(cron_string: str, key: str, window_minutes: int) -> str:
+    """
+    Delay a cron schedule by a stable offset of up to `window_minutes` for the key, so brainbeats registered with
+    the same cron string don't all fire in the same minute.
+
+    Only schedules with a single minute and a list of hours (or every hour) can be shifted, e.g. `0 9 * * *`,
+    `30 9,17 * * 1-5` or `0 * * * *`. Hourly schedules are spread across at most an hour, and schedules restricted to
+    some days are never pushed past midnight. Anything else is returned unchanged.
+    """
+    fields = cron_string.split()
+    minutes = _int_list(fields[0]) if len(fields) == 5 else None
+    if minutes is None or len(minutes) != 1:
+        if window_minutes > 1:
+            logger.warning('brainbeat_cron_not_jittered', cron_string=cron_string)
+        return cron_string
+    minute, hour_field, *day_fields = fields
+    minute = minutes[0]
+
+    if hour_field == '*':
+        offset = brainbeat_offset(key, min(window_minutes, 60))
+        return ' '.join([str((minute + offset) % 60), '*', *day_fields])
+
+    hours = _int_list(hour_field)
+    if hours is None:
+        logger.warning('brainbeat_cron_not_jittered', cron_string=cron_string)
+        return cron_string
+    window = window_minutes
+    if day_fields != ['*', '*', '*']:
+        # Keep every run on the day it was scheduled for
+        window = min(window, MINUTES_PER_DAY - (max(hours) * 60 + minute))
+    offset = brainbeat_offset(key, window)
+    starts = sorted({(hour * 60 + minute + offset) % MINUTES_PER_DAY for hour in hours})
+    # Every hour keeps the same minute, as the offset is the same for each
+    return ' '.join([str(starts[0] % 60), ','.join(str(start // 60) for start in starts), *day_fields])
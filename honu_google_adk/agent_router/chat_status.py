@@ -0,0 +1,73 @@
+import asyncio
+
+import structlog
+
+from ..ttl_cache import TTLCache
+from .conversation_utils import AsyncConversationClient
+from .schema import Conversation
+
+ConversationKey = tuple[str, str]
+
+_NOTHING_SENT = object()
+
+
+class ChatStatusCoalescer:
+    """
+    Sends chat status updates for conversations in the background.
+    A burst of updates for one conversation is collapsed into its latest status, and a status equal to the last one
+    sent is skipped, so an agent turn doesn't turn into a stream of PATCH requests.
+    """
+
+    def __init__(self, conversation_client: AsyncConversationClient, window: float = 0.25):
+        """
+        :param conversation_client: Client used to send the statuses.
+        :param window: Seconds to wait for a newer status before sending the latest one.
+        """
+        self.conversation_client = conversation_client
+        self.window = window
+        self.logger = structlog.get_logger('honu_google_adk.chat_status_coalescer')
+
+        self._pending: dict[ConversationKey, tuple[str, Conversation, str | None]] = {}
+        self._last_sent: TTLCache[ConversationKey, str | None] = TTLCache(maxsize=10_000, ttl=3600)
+        self._workers: dict[ConversationKey, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(conversation: Conversation) -> ConversationKey:
+        return conversation.mdl_ref, conversation.conversation_id
+
+    def update(self, token: str, conversation: Conversation, chat_status: str | None):
+        """
+        Queue a status for the conversation. Returns immediately, the status is sent in the background.
+        """
+        key = self._key(conversation)
+        self._pending[key] = (token, conversation, chat_status)
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._send_pending(key))
+
+    async def _send_pending(self, key: ConversationKey):
+        try:
+            while True:
+                await asyncio.sleep(self.window)
+                pending = self._pending.pop(key, None)
+                if pending is None:
+                    # Nothing new came in while the last status was being sent
+                    return
+
+                token, conversation, chat_status = pending
+                if self._last_sent.get(key, _NOTHING_SENT, record=False) == chat_status:
+                    continue
+                try:
+                    await self.conversation_client.set_chat_status(token, conversation, chat_status)
+                    self._last_sent.set(key, chat_status)
+                except Exception as e:
+                    self.logger.error('failed_to_send_chat_status', conversation_id=key[1], chat_status=chat_status, error=str(e))
+        finally:
+            del self._workers[key]
+
+    async def flush(self, conversation: Conversation):
+        """
+        Wait until every status queued for the conversation has been sent.
+        """
+        worker = self._workers.get(self._key(conversation))
+        if worker is not None:
+            await asyncio.shield(worker)
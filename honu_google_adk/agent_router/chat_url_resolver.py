@@ -0,0 +1,89 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import structlog
+
+from ..ttl_cache import TTLCache
+
+
+@dataclass
+class _Resolution:
+    # None when none of the candidate URLs could be reached
+    chat_url: str | None
+    checked_at: float
+
+
+class ChatURLResolver:
+    """
+    Works out which Conversation server to use for each tenant, keyed by the `url` claim of their tokens.
+    Reachable URLs are served from memory and re-checked in the background, and unreachable tenants are remembered
+    for a while so requests for them fail fast instead of each waiting on a health check.
+    """
+
+    def __init__(
+            self,
+            candidates: Callable[[str], list[str]],
+            probe: Callable[[str], Awaitable[bool]],
+            refresh_interval: float = 300,
+            negative_ttl: float = 30,
+            maxsize: int = 1_000,
+    ):
+        """
+        :param candidates: Gives the chat URLs to try for a `url` claim, in order of preference.
+        :param probe: Checks whether a chat URL is reachable.
+        :param refresh_interval: Seconds after which a reachable URL is checked again, in the background.
+        :param negative_ttl: Seconds an unreachable tenant is failed fast for before its URLs are tried again.
+        :param maxsize: Number of tenants remembered.
+        """
+        self.candidates = candidates
+        self.probe = probe
+        self.refresh_interval = refresh_interval
+        self.negative_ttl = negative_ttl
+        self.logger = structlog.get_logger('honu_google_adk.chat_url_resolver')
+
+        # Resolutions stay around while in use, they are refreshed rather than expired
+        self._resolutions: TTLCache[str, _Resolution] = TTLCache(maxsize=maxsize, ttl=24 * 60 * 60)
+        self._probes: dict[str, asyncio.Task[_Resolution]] = {}
+
+    async def resolve(self, url_claim: str) -> str:
+        """
+        :raise ValueError: If none of the chat URLs for the claim can be reached.
+        """
+        resolution = self._resolutions.get(url_claim)
+        age = time.monotonic() - resolution.checked_at if resolution is not None else None
+
+        if resolution is not None and resolution.chat_url is not None:
+            if age >= self.refresh_interval:
+                self._start_probe(url_claim)
+            return resolution.chat_url
+
+        if resolution is None or age >= self.negative_ttl:
+            resolution = await asyncio.shield(self._start_probe(url_claim))
+        if resolution.chat_url is None:
+            raise ValueError(f"Could not connect to URL: {self.candidates(url_claim)[-1]}")
+        return resolution.chat_url
+
+    def _start_probe(self, url_claim: str) -> asyncio.Task[_Resolution]:
+        # Every caller waiting on the same tenant shares one probe
+        task = self._probes.get(url_claim)
+        if task is None:
+            task = self._probes[url_claim] = asyncio.create_task(self._probe_claim(url_claim))
+            task.add_done_callback(lambda _: self._probes.pop(url_claim, None))
+        return task
+
+    async def _probe_claim(self, url_claim: str) -> _Resolution:
+        resolution = _Resolution(chat_url=None, checked_at=time.monotonic())
+        for chat_url in self.candidates(url_claim):
+            if await self.probe(chat_url):
+                resolution.chat_url = chat_url
+                break
+
+        previous = self._resolutions.get(url_claim, record=False)
+        if resolution.chat_url is None and previous is not None and previous.chat_url is not None:
+            # Keep using a URL that has worked before rather than failing every request on one bad health check
+            self.logger.warning('chat_server_health_check_failed', url_claim=url_claim, chat_url=previous.chat_url)
+            resolution.chat_url = previous.chat_url
+        self._resolutions.set(url_claim, resolution)
+        return resolution
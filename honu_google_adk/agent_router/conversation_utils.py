@@ -6,6 +6,9 @@ import jwt
 import structlog
 from starlette import status
 
+from ..metrics import CONVERSATION_REQUEST_SECONDS, CONVERSATION_RESPONSES, timed
+from ..ttl_cache import TTLCache
+from .chat_url_resolver import ChatURLResolver
 from .schema import Conversation, TextMessage, SupportedMessages
 
 MAX_MESSAGE_RETRY = 10
@@ -16,17 +19,25 @@ class ConversationClientCouldNotCreateConversation(Exception):
     ...
 
 
-class ConversationClient:
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    # httpx needs the http2 extra for HTTP/2, fall back to HTTP/1.1 keep-alive without it
+    HTTP2_AVAILABLE = False
+
+
+class _BaseConversationClient:
     """
-    Accessed via ctxt.chat_client.
-    Uses a singleton because we don't need multiple instances.
+    Shared URL resolution and response handling for the sync and async Conversation server clients.
     """
     _instance = None
 
     app_logger: Any
     chat_timeout: int
+    # Health checks only need to tell whether the server is up, so give up on them sooner than on real requests
+    chat_probe_timeout: int
     _status_history: dict[str, list[str]]
-    chat_url: str | None = None
 
     @classmethod
     def get_instance(cls):
@@ -35,9 +46,11 @@ class ConversationClient:
         inst = cls.__new__(cls)
         inst.app_logger = structlog.get_logger('hap_adk.conversation_client')
         inst.chat_timeout = 60
+        inst.chat_probe_timeout = 5
 
         # Maintains a history of statuses sent so we can manage nested statuses
         inst._status_history = defaultdict(list)
+        inst._setup()
         cls._instance = inst
 
         return inst
@@ -45,30 +58,120 @@ class ConversationClient:
     def __init__(self):
         raise NotImplementedError()
 
+    def _setup(self):
+        ...
+
+    @staticmethod
+    def _url_claim(token: str) -> str:
+        # Tokens of the same tenant share this claim, so chat URLs are resolved per claim rather than per token
+        return jwt.decode(token, options={'verify_signature': False}).get('url', '')
+
+    @staticmethod
+    def _candidate_chat_urls(url_claim: str) -> list[str]:
+        chat_url = url_claim.rstrip('/').replace('happi', 'chat').replace('8080', '8008')
+        if chat_url.startswith("http://host.docker.internal"):
+            return [chat_url, "http://localhost:8008"]
+        return [chat_url]
+
+    def _handle_send_message_response(self, response: httpx.Response, conversation: Conversation, payload: dict):
+        if response.status_code != status.HTTP_201_CREATED:
+            self.app_logger.error(
+                'failed_to_send_message',
+                response=f'{response.status_code}: {response.text}',
+                conversation=conversation,
+                message=payload,
+            )
+        else:
+            self.app_logger.info(
+                'conversation_client_sent_message',
+                extra=dict(
+                    conversation=conversation,
+                    message=response.json(),
+                )
+            )
+
+    def _handle_create_conversation_response(self, response: httpx.Response, model_ref: str) -> Conversation:
+        if response.status_code != status.HTTP_201_CREATED:
+            self.app_logger.error(
+                f'failed_to_create_conversation_in_server',
+                response=f'{response.status_code}: {response.text}',
+                model_ref=model_ref,
+            )
+            raise ConversationClientCouldNotCreateConversation()
+        else:
+            conv = Conversation(**response.json())
+            self.app_logger.info(
+                f'created_conversation_in_server',
+                model_ref=model_ref,
+                conversation=conv.model_dump(),
+            )
+        return conv
+
+    def _handle_conversations_list_response(self, response: httpx.Response, model_ref: str) -> list[Conversation]:
+        if response.status_code != status.HTTP_200_OK:
+            self.app_logger.error(
+                'failed_to_fetch_conversations_list',
+                response=f'{response.status_code}: {response.text}',
+                model_ref=model_ref,
+            )
+            return []
+        return [Conversation(**conv) for conv in response.json()]
+
+    def _handle_delete_conversation_response(self, response: httpx.Response, model_ref: str, conv_id: str) -> bool:
+        if response.status_code != status.HTTP_204_NO_CONTENT:
+            self.app_logger.error(
+                'failed_to_delete_conversation',
+                response=f'{response.status_code}: {response.text}',
+                model_ref=model_ref,
+                conversation_id=conv_id,
+            )
+            return False
+        return True
+
+    def _handle_set_chat_status_response(self, response: httpx.Response, conversation: Conversation, chat_status: str | None):
+        if not response.is_success:
+            self.app_logger.error(
+                'failed_to_set_chat_status',
+                conversation=conversation,
+                chat_status=chat_status,
+                response=f'{response.status_code}: {response.text}'
+            )
+
+
+class ConversationClient(_BaseConversationClient):
+    """
+    Accessed via ctxt.chat_client.
+    Uses a singleton because we don't need multiple instances.
+    Blocking client kept for backwards compatibility, use AsyncConversationClient from async code.
+    """
+    _instance = None
+
+    _chat_urls: TTLCache[str, str]
+
+    def _setup(self):
+        self._chat_urls = TTLCache(maxsize=1_000, ttl=300)
+
     def _ping_conversation_server(self, base_url: str) -> bool:
         try:
             # self._get_client(base_url, "").get('/')
-            httpx.get(base_url, timeout=self.chat_timeout)
+            httpx.get(base_url, timeout=self.chat_probe_timeout)
             return True
         except:
             return False
 
     def _get_chat_url(self, token: str) -> str:
-        if self.chat_url is not None:
-            return self.chat_url
-
-        chat_url = jwt.decode(token, options={'verify_signature': False}).get('url', '').rstrip('/').replace('happi', 'chat').replace('8080', '8008')
-        if self._ping_conversation_server(chat_url):
-            self.chat_url = chat_url
+        url_claim = self._url_claim(token)
+        chat_url = self._chat_urls.get(url_claim)
+        if chat_url is not None:
             return chat_url
 
-        if chat_url.startswith("http://host.docker.internal"):
-            chat_url = "http://localhost:8008"
+        chat_urls = self._candidate_chat_urls(url_claim)
+        for chat_url in chat_urls:
             if self._ping_conversation_server(chat_url):
-                self.chat_url = chat_url
+                self._chat_urls.set(url_claim, chat_url)
                 return chat_url
 
-        raise ValueError(f"Could not connect to URL: {chat_url}")
+        raise ValueError(f"Could not connect to URL: {chat_urls[-1]}")
 
     def _get_client(self, token: str) -> httpx.Client:
         # Access current_context info for retrieving url/auth information
@@ -91,22 +194,7 @@ class ConversationClient:
             f'/v1/conversations/{conversation.mdl_ref}/{conversation.conversation_id}/messages/',
             json=payload,
         )
-
-        if response.status_code != status.HTTP_201_CREATED:
-            self.app_logger.error(
-                'failed_to_send_message',
-                response=f'{response.status_code}: {response.text}',
-                conversation=conversation,
-                message=payload,
-            )
-        else:
-            self.app_logger.info(
-                'conversation_client_sent_message',
-                extra=dict(
-                    conversation=conversation,
-                    message=response.json(),
-                )
-            )
+        self._handle_send_message_response(response, conversation, payload)
         return response
 
     def create_conversation(self, token: str, model_ref: str, name: str = '') -> Conversation:
@@ -123,57 +211,195 @@ class ConversationClient:
             f'/v1/conversations/{model_ref}',
             json=payload,
         )
-
-        if response.status_code != status.HTTP_201_CREATED:
-            self.app_logger.error(
-                f'failed_to_create_conversation_in_server',
-                response=f'{response.status_code}: {response.text}',
-                model_ref=model_ref,
-            )
-            raise ConversationClientCouldNotCreateConversation()
-        else:
-            conv = Conversation(**response.json())
-            self.app_logger.info(
-                f'created_conversation_in_server',
-                model_ref=model_ref,
-                conversation=conv.model_dump(),
-            )
-        return conv
+        return self._handle_create_conversation_response(response, model_ref)
 
     def get_conversations_for_model(self, token: str, model_ref: str, with_messages: int = 0) -> list[Conversation]:
         response = self._get_client(token).get(
             f"/v1/conversations/{model_ref}",
             params={'with_messages': with_messages},
         )
+        return self._handle_conversations_list_response(response, model_ref)
 
-        if response.status_code != status.HTTP_200_OK:
-            self.app_logger.error(
-                'failed_to_fetch_conversations_list',
-                response=f'{response.status_code}: {response.text}',
-                model_ref=model_ref,
+    def delete_conversation(self, token: str, model_ref: str, conv_id: str) -> bool:
+        response = self._get_client(token).delete(f"/v1/conversations/{model_ref}/{conv_id}")
+        return self._handle_delete_conversation_response(response, model_ref, conv_id)
+
+    def set_chat_status(self, token: str, conversation: Conversation, chat_status: str | None = None):
+        response = self._get_client(token).patch(
+            f'/v1/conversations/{conversation.mdl_ref}/{conversation.conversation_id}',
+            json={'status': chat_status}
+        )
+        self._handle_set_chat_status_response(response, conversation, chat_status)
+
+
+class AsyncConversationClient(_BaseConversationClient):
+    """
+    Non-blocking client for the Conversation server, for use from the router and plugin callbacks.
+    Keeps one long-lived connection pool per chat server URL, shared by every token.
+    Chat server URLs are resolved per tenant and health checked in the background, see ChatURLResolver.
+    Also caches conversations by (model_ref, conversation_id) as the plugin looks them up on every callback, and for a
+    short while the ones that couldn't be fetched, so a session without a conversation isn't looked up every callback.
+    Uses a singleton so every caller shares the same pools and cache.
+    """
+    _instance = None
+
+    _clients: dict[str, httpx.AsyncClient]
+    _conversations: TTLCache[tuple[str, str], Conversation]
+    _missing_conversations: TTLCache[tuple[str, str], bool]
+    _chat_url_resolver: ChatURLResolver
+
+    def _setup(self):
+        self._clients = {}
+        self._conversations = TTLCache(maxsize=10_000, ttl=600)
+        self._missing_conversations = TTLCache(maxsize=10_000, ttl=30)
+        self._chat_url_resolver = ChatURLResolver(self._candidate_chat_urls, self._ping_conversation_server)
+
+    def _client_for(self, base_url: str) -> httpx.AsyncClient:
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                http2=HTTP2_AVAILABLE,
+                timeout=self.chat_timeout,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
             )
-            return []
-        return [Conversation(**conv) for conv in response.json()]
+            self._clients[base_url] = client
+        return client
 
-    def delete_conversation(self, token: str, model_ref: str, conv_id: str):
-        response = self._get_client(token).delete(f"/v1/conversations/{model_ref}/{conv_id}")
-        if response.status_code != status.HTTP_204_NO_CONTENT:
+    async def _ping_conversation_server(self, base_url: str) -> bool:
+        try:
+            await self._client_for(base_url).get('/', timeout=self.chat_probe_timeout)
+            return True
+        except:
+            return False
+
+    async def _get_chat_url(self, token: str) -> str:
+        return await self._chat_url_resolver.resolve(self._url_claim(token))
+
+    async def _get_client(self, token: str) -> httpx.AsyncClient:
+        return self._client_for(await self._get_chat_url(token))
+
+    @staticmethod
+    def _auth_headers(token: str) -> dict[str, str]:
+        return {'Authorization': f'Bearer {token}'}
+
+    async def _request(self, operation: str, token: str, method: str, url: str, **kwargs) -> httpx.Response:
+        client = await self._get_client(token)
+        with timed(CONVERSATION_REQUEST_SECONDS, f'honu.conversation.{operation}', operation=operation):
+            response = await client.request(method, url, headers=self._auth_headers(token), **kwargs)
+        CONVERSATION_RESPONSES.inc(operation=operation, status=response.status_code)
+        return response
+
+    async def send_message(self, token: str, conversation: Conversation, message: SupportedMessages) -> httpx.Response:
+        """
+        Send a message to the Chat server.
+        :param token: Access token.
+        :param conversation: The Conversation data to send the Message to.
+        :param message: The Message object to send. Can be any of the supported types of Message.
+        :return: The response of the send request
+        """
+        payload = message.model_dump()
+        response = await self._request(
+            'send_message',
+            token,
+            'POST',
+            f'/v1/conversations/{conversation.mdl_ref}/{conversation.conversation_id}/messages/',
+            json=payload,
+        )
+        self._handle_send_message_response(response, conversation, payload)
+        return response
+
+    async def create_conversation(self, token: str, model_ref: str, name: str = '') -> Conversation:
+        """
+        Create a Conversation in the system. Will add the agent and any users for the model to it for conversations.
+        :param token: Access token.
+        :param model_ref: Model reference
+        :param name: The (optional) name of the room.
+        :raise ConversationClientCouldNotCreateConversation: If the server did not create the conversation.
+        """
+        response = await self._request(
+            'create_conversation',
+            token,
+            'POST',
+            f'/v1/conversations/{model_ref}',
+            json={'name': name},
+        )
+        conv = self._handle_create_conversation_response(response, model_ref)
+        self.remember_conversation(conv)
+        return conv
+
+    def remember_conversation(self, conversation: Conversation):
+        self._missing_conversations.pop((conversation.mdl_ref, conversation.conversation_id))
+        self._conversations.set((conversation.mdl_ref, conversation.conversation_id), conversation)
+
+    def forget_conversation(self, model_ref: str, conv_id: str):
+        self._conversations.pop((model_ref, conv_id))
+
+    async def get_conversation(self, token: str, model_ref: str, conv_id: str) -> Conversation | None:
+        """
+        Get a single conversation, from the cache if we've seen it recently.
+        :return: The conversation, or None if it could not be fetched, now or in the last 30 seconds.
+        """
+        conv = self._conversations.get((model_ref, conv_id))
+        if conv is not None:
+            return conv
+        if (model_ref, conv_id) in self._missing_conversations:
+            return None
+
+        response = await self._request('get_conversation', token, 'GET', f"/v1/conversations/{model_ref}/{conv_id}")
+        if response.status_code != status.HTTP_200_OK:
             self.app_logger.error(
-                'failed_to_delete_conversation',
+                'failed_to_fetch_conversation',
                 response=f'{response.status_code}: {response.text}',
                 model_ref=model_ref,
                 conversation_id=conv_id,
             )
+            self._missing_conversations.set((model_ref, conv_id), True)
+            return None
+        conv = Conversation(**response.json())
+        self.remember_conversation(conv)
+        return conv
 
-    def set_chat_status(self, token: str, conversation: Conversation, chat_status: str | None = None):
-        response = self._get_client(token).patch(
+    async def get_conversations_for_model(self, token: str, model_ref: str, with_messages: int = 0) -> list[Conversation]:
+        response = await self._request(
+            'get_conversations_for_model',
+            token,
+            'GET',
+            f"/v1/conversations/{model_ref}",
+            params={'with_messages': with_messages},
+        )
+        return self._handle_conversations_list_response(response, model_ref)
+
+    async def delete_conversation(self, token: str, model_ref: str, conv_id: str) -> bool:
+        """
+        :return: Whether the conversation was deleted.
+        """
+        self.forget_conversation(model_ref, conv_id)
+        response = await self._request('delete_conversation', token, 'DELETE', f"/v1/conversations/{model_ref}/{conv_id}")
+        return self._handle_delete_conversation_response(response, model_ref, conv_id)
+
+    async def set_chat_status(self, token: str, conversation: Conversation, chat_status: str | None = None):
+        response = await self._request(
+            'set_chat_status',
+            token,
+            'PATCH',
             f'/v1/conversations/{conversation.mdl_ref}/{conversation.conversation_id}',
-            json={'status': chat_status}
+            json={'status': chat_status},
         )
-        if not response.is_success:
-            self.app_logger.error(
-                'failed_to_set_chat_status',
-                conversation=conversation,
-                chat_status=chat_status,
-                response=f'{response.status_code}: {response.text}'
-            )
+        self._handle_set_chat_status_response(response, conversation, chat_status)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            'connection_pools': len(self._clients),
+            'cached_conversations': len(self._conversations),
+            'conversation_cache_hits': self._conversations.hits,
+            'conversation_cache_misses': self._conversations.misses,
+        }
+
+    async def aclose(self):
+        """
+        Close every connection pool. They are recreated if the client is used again.
+        """
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
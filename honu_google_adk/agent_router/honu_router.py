@@ -1,10 +1,15 @@
+import asyncio
 import base64
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Awaitable, Callable
+
 import httpx
 
 import json
 import jwt
-from datetime import datetime, timezone
-from fastapi import APIRouter
+from fastapi import APIRouter, FastAPI, Header, Request, Response
+from fastapi.routing import APIRoute
 from google.adk.cli.adk_web_server import RunAgentRequest
 from google.adk.events import Event
 from google.genai.types import Part, Content
@@ -13,13 +18,29 @@ from starlette import status
 from starlette.exceptions import HTTPException
 import structlog
 
-from honu_google_adk.agent_router.tasks_utils import ModelTasksAPIClient
+from honu_google_adk.agent_router.tasks_utils import AsyncModelTasksAPIClient
+from honu_google_adk.mcp_session_pool import MCPSessionPool
+from honu_google_adk.metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, MetricFamily, MetricsRegistry, timed
+from honu_google_adk.tool_result_cache import ToolResultCache
+from honu_google_adk.ttl_cache import TTLCache
 
-from .conversation_utils import ConversationClient
-from .schema import GADKAgentSchedulerPayload, HAPMessage, InitEngagement, DisengageAgent, MessageNotification, TextMessage, AgentDisplayInformation
+from .conversation_utils import AsyncConversationClient
+from .run_queue import AgentRunQueue, RunQueueFull
+from .scheduler_dedup import SchedulerDeliveryLog
+from .session_index import ModelSessionIndex
+from .session_runs import SessionRunCoalescer
+from .traffic_recorder import TrafficRecorder
+from .brainbeat import jitter_cron
+from .schema import BatchSchedulerPayload, BatchSchedulerResult, CleanupResult, DisengageResult, EngagementStatus, EngagementStep, GADKAgentSchedulerPayload, ScheduledRunResult, InitEngagement, DisengageAgent, MessageNotification, AgentDisplayInformation, Conversation, TextMessage
+from .in_process_client import InProcessSessionClient
+from .intro_cache import CachedIntro, IntroMessageCache, capture_intro
 from .utils import LocalSessionClient
 
 
+INTRO_MESSAGE = 'honulabs_system_message: You have just been engaged by a User. Please introduce yourself to them.'
+BRAINBEAT_MESSAGE = 'honulabs_system_message: This is an automated system message. It is time to run your regular "brainbeat", where you check on the user\'s data, and perform any daily tasks you are instructed to do. Write your message as though you are coming directly to the User.'
+
+
 class SignaturePayload(BaseModel):
     agent_url: str
     app_name: str
@@ -31,6 +52,33 @@ class SignaturePayload(BaseModel):
         return cls(**payload)
 
 
+class _TimedRoute(APIRoute):
+    """
+    Times every request handled by the route, labelled by the route's path template rather than the requested path.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            with timed(HTTP_REQUEST_SECONDS, f'honu.router {request.method} {self.path}', method=request.method, route=self.path):
+                return await handler(request)
+        return timed_handler
+
+
+def _gauges(prefix: str, documentation: str, stats: dict[str, float], counters: set[str] | None = None) -> list[MetricFamily]:
+    counters = counters or set()
+    return [
+        MetricFamily(
+            f'{prefix}_{key}_total' if key in counters else f'{prefix}_{key}',
+            f'{documentation} ({key}).',
+            'counter' if key in counters else 'gauge',
+            [({}, value)],
+        )
+        for key, value in stats.items()
+    ]
+
+
 class HonuAgentRouter:
 
     def __init__(
@@ -38,42 +86,320 @@ class HonuAgentRouter:
             hostname: str,
             port: int,
             agent_display_cards: dict[str, AgentDisplayInformation] | None = None,
-            agents_with_brainbeats: dict[str, str] | None = None
+            agents_with_brainbeats: dict[str, str] | None = None,
+            streaming_apps: set[str] | None = None,
+            async_messages: bool = False,
+            max_concurrent_runs: int = 8,
+            max_queued_runs: int = 100,
+            session_client: LocalSessionClient | InProcessSessionClient | None = None,
+            disengage_concurrency: int = 10,
+            session_index: ModelSessionIndex | None = None,
+            traffic_recorder: TrafficRecorder | None = None,
+            brainbeat_jitter_minutes: int = 0,
+            max_concurrent_scheduled_runs: int = 4,
+            scheduler_deliveries: SchedulerDeliveryLog | None = None,
+            intro_cache: IntroMessageCache | None = None,
     ):
+        """
+        :param hostname: Public URL of this service, used as the target of scheduled brainbeats.
+        :param port: Port the ADK app is served on.
+        :param agent_display_cards: How each app is shown in the Platform, by app name.
+        :param agents_with_brainbeats: Cron string of the brainbeat for each app that has one, by app name.
+        :param streaming_apps: Apps whose runs are streamed, so their responses reach the user paragraph by paragraph
+            as the model writes them.
+        :param async_messages: Respond to message notifications with 202 as soon as the run is queued, instead of
+            after the agent has finished responding.
+        :param max_concurrent_runs: Number of queued runs worked on at the same time when `async_messages` is set.
+        :param max_queued_runs: Number of runs that can wait for a worker before messages are rejected with a 503.
+        :param session_client: How to reach the ADK app. Defaults to its HTTP API on `port`, pass an
+            InProcessSessionClient to call the ADK Runner directly when the router runs in the same process.
+        :param disengage_concurrency: Number of resources deleted at the same time when disengaging an agent.
+        :param session_index: Index of each model's sessions, kept up to date by the router. Without it finding a
+            model's sessions when disengaging means listing every session of the app.
+        :param traffic_recorder: Records every message notification, engagement and scheduled run the router receives,
+            to be replayed with `python -m honu_google_adk.replay`.
+        :param brainbeat_jitter_minutes: Spread each app's brainbeats over this many minutes after its cron time,
+            by an offset derived from the session id, so they don't all run at once. See `jitter_cron`.
+        :param max_concurrent_scheduled_runs: Number of runs from `/scheduler/batch` deliveries worked on at the same
+            time, across all deliveries.
+        :param scheduler_deliveries: Log of the runs delivered to the scheduler endpoints, so repeated deliveries are
+            acknowledged without running the agent again. Without it every delivery is run.
+        :param intro_cache: Introductions reused across engagements of the apps that opt in, instead of running the
+            agent to introduce itself to every user.
+        """
         self.agent_router = self._agent_engagement_api()
         self.display_info = agent_display_cards or {}
         self.brainbeat_data = agents_with_brainbeats or {}
+        self.streaming_apps = streaming_apps or set()
+        self.async_messages = async_messages
+        self.disengage_concurrency = disengage_concurrency
+        self.session_index = session_index
+        self.traffic_recorder = traffic_recorder
+        self.brainbeat_jitter_minutes = brainbeat_jitter_minutes
+        self._scheduled_runs = asyncio.Semaphore(max_concurrent_scheduled_runs)
+        self.scheduler_deliveries = scheduler_deliveries
+        self.intro_cache = intro_cache
+        # What init_engagement left running in the background, by (app_name, session_id)
+        self.engagements: TTLCache[tuple[str, str], EngagementStatus] = TTLCache(maxsize=10_000, ttl=3600)
+        self.run_queue = AgentRunQueue(concurrency=max_concurrent_runs, max_queued=max_queued_runs)
+        self.session_runs = SessionRunCoalescer()
         self.logger = structlog.get_logger('honu_agent_router')
 
         # store token
         self.hostname = hostname
-        self.local_session_client = LocalSessionClient(port)
+        self.local_session_client = session_client or LocalSessionClient(port)
         self.USER_ID = "user"  # could be the model ref for now
+        MetricsRegistry.get_instance().register_collector('honu_agent_router', self._collect_metrics)
+
+    def _collect_metrics(self) -> list[MetricFamily]:
+        families = _gauges(
+            'honu_run_queue',
+            'Agent runs queued by /messages',
+            self.run_queue.stats(),
+            counters={'completed', 'failed', 'rejected'},
+        )
+        families += _gauges(
+            'honu_session_runs',
+            'Turns run per session, one at a time',
+            self.session_runs.stats(),
+            counters={'messages', 'turns', 'exclusive_turns', 'coalesced'},
+        )
+        if isinstance(self.local_session_client, LocalSessionClient):
+            families += _gauges(
+                'honu_session_client',
+                'Connection pool to the ADK app',
+                self.local_session_client.pool_stats(),
+                counters={'requests', 'saturated_requests'},
+            )
+        families += _gauges(
+            'honu_conversation_client',
+            'Conversation server client',
+            AsyncConversationClient.get_instance().stats(),
+            counters={'conversation_cache_hits', 'conversation_cache_misses'},
+        )
+        tool_results = ToolResultCache.get_instance()
+        families += _gauges(
+            'honu_tool_result_cache',
+            'Cache of read-only MCP tool results',
+            {
+                'entries': len(tool_results),
+                'hits': tool_results.hits,
+                'misses': tool_results.misses,
+                'hit_ratio': tool_results.hit_rate,
+                'deduplicated': tool_results.deduplicated,
+            },
+            counters={'hits', 'misses', 'deduplicated'},
+        )
+        if self.scheduler_deliveries is not None:
+            families += _gauges(
+                'honu_scheduler_deliveries',
+                'Log of deliveries to the scheduler',
+                {'entries': len(self.scheduler_deliveries), 'duplicates': self.scheduler_deliveries.duplicates},
+                counters={'duplicates'},
+            )
+        if self.intro_cache is not None:
+            families += _gauges(
+                'honu_intro_cache',
+                'Cache of agent introductions',
+                {'hits': self.intro_cache.hits, 'misses': self.intro_cache.misses},
+                counters={'hits', 'misses'},
+            )
+        return families
+
+    def _make_run_request(self, app_name: str, session_id: str, *texts: str) -> RunAgentRequest:
+        return RunAgentRequest(
+            app_name=app_name,
+            user_id=self.USER_ID,
+            session_id=session_id,
+            new_message=Content(
+                parts=[Part(text=text) for text in texts],
+                role="user",
+            ),
+            streaming=app_name in self.streaming_apps,
+        )
+
+    async def _get_sessions_for_model_ref(self, app_name: str, model_ref: str) -> list[tuple[str, str]]:
+        """
+        :return: (token, session_id) for each of the model's sessions.
+        """
+        if self.session_index is None:
+            return await self.local_session_client.get_sessions_for_model_ref(app_name, model_ref)
+
+        semaphore = asyncio.Semaphore(self.disengage_concurrency)
+
+        async def _get_token(token: str | None, session_id: str) -> tuple[str, str] | None:
+            if token is not None:
+                return token, session_id
+            # Indexed before tokens were kept, so it is read from the session
+            async with semaphore:
+                try:
+                    state = await self.local_session_client.get_session_state(app_name, session_id)
+                except (httpx.HTTPStatusError, HTTPException) as e:
+                    code = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else e.status_code
+                    if code != status.HTTP_404_NOT_FOUND:
+                        raise
+                    # The session was deleted without going through the router
+                    await self.session_index.aremove(app_name, session_id)
+                    return None
+            return state['token'], session_id
+
+        indexed = await self.session_index.asessions(app_name, model_ref)
+        sessions = await asyncio.gather(*(_get_token(token, session_id) for token, session_id in indexed))
+        return [session for session in sessions if session is not None]
+
+    async def _run_turn(self, app_name: str, session_id: str, texts: list[str]):
+        await self.local_session_client.run(self._make_run_request(app_name, session_id, *texts))
+
+    async def _run_scheduled(self, payload: GADKAgentSchedulerPayload, delivery_id: str | None = None):
+        """
+        Run the agent for a scheduled message, unless the delivery is a repeat of one already run or running.
+        :param delivery_id: Id of the delivery, when not in the payload.
+        """
+        key = None
+        if self.scheduler_deliveries is not None:
+            key = self.scheduler_deliveries.key(payload.app_name, payload.session_id, payload.message, payload.delivery_id or delivery_id)
+            if not await self.scheduler_deliveries.aclaim(key):
+                self.logger.info('scheduler_delivery_repeated', app_name=payload.app_name, session_id=payload.session_id, delivery_key=key)
+                return
+        try:
+            # Check that the session and app_name combo are correct
+            request = self._make_run_request(payload.app_name, payload.session_id, payload.message)
+            # Takes its turn between the user's messages rather than racing them
+            await self.session_runs.run_exclusive((payload.app_name, payload.session_id), partial(self.local_session_client.run, request))
+        except BaseException:
+            if key is not None:
+                await self.scheduler_deliveries.arelease(key)
+            raise
+
+    async def _run_step(self, engagement: EngagementStatus, name: str, step: EngagementStep, work: Callable[[], Awaitable[None]]):
+        """
+        Run one step of an engagement, recording how it went on the step.
+        """
+        step.status = 'running'
+        try:
+            await work()
+        except Exception as e:
+            step.status = 'failed'
+            step.error = str(e)
+            self.logger.exception('engagement_step_failed', step=name, app_name=engagement.app_name, session_id=engagement.session_id)
+            return
+        step.status = 'succeeded'
+
+    async def _finish_engagement(
+            self,
+            engagement: EngagementStatus,
+            token: str,
+            conversation: Conversation,
+            cached_intro: CachedIntro | None = None,
+    ):
+        """
+        Have the agent introduce itself to the user and schedule its brainbeat, at the same time, recording how each
+        went on the engagement.
+        :param cached_intro: Introduction to send instead of running the agent, already in the session's history.
+        """
+        if cached_intro is not None:
+            intro = partial(self._send_cached_intro, token, conversation, cached_intro)
+        else:
+            intro = partial(self._run_intro, engagement)
+        steps = [self._run_step(engagement, 'intro', engagement.intro, intro)]
+        if engagement.brainbeat.status != 'skipped':
+            steps.append(self._run_step(engagement, 'brainbeat', engagement.brainbeat, partial(self._schedule_brainbeat, engagement, token)))
+        await asyncio.gather(*steps)
+
+    async def _run_intro(self, engagement: EngagementStatus):
+        app_name, session_id = engagement.app_name, engagement.session_id
+        request = self._make_run_request(app_name, session_id, INTRO_MESSAGE)
+        # A user replying quickly mustn't start a turn while the agent is still introducing itself
+        await self.session_runs.run_exclusive((app_name, session_id), partial(self.local_session_client.run, request))
+        if self.intro_cache is None or not self.intro_cache.caches(app_name):
+            return
+        try:
+            events = await self.local_session_client.get_session_events(app_name, session_id)
+        except Exception:
+            # The introduction was still made, it just can't be reused
+            self.logger.exception('intro_capture_failed', app_name=app_name, session_id=session_id)
+            return
+        intro = capture_intro(events, INTRO_MESSAGE)
+        if intro is not None:
+            self.intro_cache.set(app_name, intro)
+
+    async def _send_cached_intro(self, token: str, conversation: Conversation, intro: CachedIntro):
+        conversation_client = AsyncConversationClient.get_instance()
+        for message in intro.messages:
+            response = await conversation_client.send_message(token, conversation, TextMessage(body=message))
+            response.raise_for_status()
+
+    async def _schedule_brainbeat(self, engagement: EngagementStatus, token: str):
+        app_name, session_id = engagement.app_name, engagement.session_id
+        tasks_client = AsyncModelTasksAPIClient(token, engagement.mdl_ref)
+        task_payload = GADKAgentSchedulerPayload(app_name=app_name, session_id=session_id, message=BRAINBEAT_MESSAGE)
+        response = await tasks_client.create_task(
+            task_payload.model_dump(),
+            f'{app_name} Brainbeat',
+            f'Brainbeat for {app_name}.',
+            jitter_cron(self.brainbeat_data[app_name], session_id, self.brainbeat_jitter_minutes),
+            f'{self.hostname}/hapra/v1/scheduler',
+        )
+        response.raise_for_status()
+
+    async def _delete_session(self, app_name: str, session_id: str):
+        await self.local_session_client.delete_session(app_name, session_id)
+        if self.session_index is not None:
+            await self.session_index.aremove(app_name, session_id)
+
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        # Merged into the lifespan of the app the router is included in
+        yield
+        await self.run_queue.stop()
+        await self.local_session_client.close()
+        await AsyncConversationClient.get_instance().aclose()
+        await AsyncModelTasksAPIClient.aclose_all()
+        await MCPSessionPool.get_instance().close()
+        if self.scheduler_deliveries is not None:
+            self.scheduler_deliveries.close()
+        if self.traffic_recorder is not None:
+            self.traffic_recorder.close()
 
     def _agent_engagement_api(self) -> APIRouter:
-        api = APIRouter(prefix="/hapra/v1", tags=['adk'])
+        api = APIRouter(prefix="/hapra/v1", tags=['adk'], lifespan=self._lifespan, route_class=_TimedRoute)
 
         @api.post("/messages/", status_code=status.HTTP_200_OK, include_in_schema=False)
         @api.post("/messages", status_code=status.HTTP_200_OK)
         async def message_notification(payload: MessageNotification):
             """ With a message notification now we need to invoke the llm"""
+            if self.traffic_recorder is not None:
+                self.traffic_recorder.record('messages', '/hapra/v1/messages', payload)
             sig_payload = SignaturePayload.from_signature(payload.agent_signature)
-            run_request = RunAgentRequest(
-                app_name=sig_payload.app_name,
-                user_id=self.USER_ID,
-                session_id=payload.conversation.conversation_id,
-                new_message=Content(
-                    parts=[Part(text=payload.message.payload.body)],
-                    role="user",
-                ),
-                streaming=False,
-            )
-            await self.local_session_client.run(run_request)
+            app_name, session_id = sig_payload.app_name, payload.conversation.conversation_id
+            # Turns of a session run one at a time, messages sent during a turn are answered together in the next
+            key = (app_name, session_id)
+            turn = partial(self._run_turn, app_name, session_id)
+            if not self.async_messages:
+                await self.session_runs.run(key, payload.message.payload.body, turn)
+                return
+
+            _, start = self.session_runs.add(key, payload.message.payload.body)
+            if start:
+                try:
+                    self.run_queue.submit(partial(self.session_runs.drive, key, turn), name=f'{app_name}/{session_id}')
+                except RunQueueFull:
+                    self.session_runs.discard(key)
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail='Too many agent runs are queued, please retry later.',
+                        headers={'Retry-After': '5'},
+                    )
+            return Response(status_code=status.HTTP_202_ACCEPTED)
 
         @api.get("/health_check/ping/{value}", status_code=status.HTTP_200_OK)
         async def ping_pong(value: str) -> str:
             return value
 
+        @api.get("/metrics", include_in_schema=False)
+        async def metrics() -> Response:
+            return Response(content=MetricsRegistry.get_instance().render(), media_type=CONTENT_TYPE)
+
         @api.get('/cards/{app_name}/', include_in_schema=False)
         @api.get('/cards/{app_name}')
         async def get_agent_card(app_name: str) -> AgentDisplayInformation:
@@ -88,11 +414,13 @@ class HonuAgentRouter:
 
         @api.post("/agents/{agent_id}/init_engagement/", status_code=status.HTTP_201_CREATED, include_in_schema=False)
         @api.post("/agents/{agent_id}/init_engagement", status_code=status.HTTP_201_CREATED)
-        async def init_engagement(agent_id: str, init: InitEngagement) -> None:
-            conv_client = ConversationClient.get_instance()
+        async def init_engagement(agent_id: str, init: InitEngagement) -> EngagementStatus:
+            if self.traffic_recorder is not None:
+                self.traffic_recorder.record('init_engagement', f'/hapra/v1/agents/{agent_id}/init_engagement', init)
+            conv_client = AsyncConversationClient.get_instance()
             # Get the data from the agent signature for making the chat name
             sig_payload = SignaturePayload.from_signature(init.agent_signature)
-            conv = conv_client.create_conversation(init.auth_token, init.mdl_ref, name=sig_payload.app_name)
+            conv = await conv_client.create_conversation(init.auth_token, init.mdl_ref, name=sig_payload.app_name)
             session_id = conv.conversation_id
 
             payload = dict(
@@ -100,86 +428,129 @@ class HonuAgentRouter:
                 model_ref=init.mdl_ref
             )
 
+            # Engagements that start while the app's introduction is still being generated make their own, rather than
+            # wait for it
+            cached_intro = self.intro_cache.get(agent_id) if self.intro_cache is not None else None
             try:
-                await self.local_session_client.create_session(agent_id, session_id, payload)
+                if cached_intro is None:
+                    await self.local_session_client.create_session(agent_id, session_id, payload)
+                else:
+                    # The session starts with the introduction already in its history
+                    await self.local_session_client.create_session(agent_id, session_id, payload, events=cached_intro.events_for_new_session())
             except httpx.HTTPStatusError as e:
                 raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
+            if self.session_index is not None:
+                await self.session_index.aadd(agent_id, init.mdl_ref, session_id, init.auth_token)
 
-            # Send a fake message to the agent to prompt an introduction message to the user
-            fake_message = MessageNotification(
-                agent_signature=init.agent_signature,
-                conversation=conv,
-                message=HAPMessage(
-                    message_id='',
-                    author_id='',
-                    timestamp=datetime.now(timezone.utc),
-                    payload=TextMessage(body='honulabs_system_message: You have just been engaged by a User. Please introduce yourself to them.'),
-                )
-            )
-            await message_notification(fake_message)
-
-            # Also create a task to run the brainbeat
+            engagement = EngagementStatus(app_name=agent_id, session_id=session_id, mdl_ref=init.mdl_ref, intro_cached=cached_intro is not None)
             if agent_id not in self.brainbeat_data:
-                return
-            tasks_client = ModelTasksAPIClient(init.auth_token, init.mdl_ref)
-            task_payload = GADKAgentSchedulerPayload(
-                app_name=agent_id,
-                session_id=session_id,
-                message='honulabs_system_message: This is an automated system message. It is time to run your regular "brainbeat", where you check on the user\'s data, and perform any daily tasks you are instructed to do. Write your message as though you are coming directly to the User.',
-            )
-            tasks_client.create_task(
-                task_payload.model_dump(),
-                f'{agent_id} Brainbeat',
-                f'Brainbeat for {agent_id}.',
-                self.brainbeat_data[agent_id],
-                f'{self.hostname}/hapra/v1/scheduler',
-            )
+                engagement.brainbeat.status = 'skipped'
+            self.engagements.set((agent_id, session_id), engagement)
+            finish = partial(self._finish_engagement, engagement, init.auth_token, conv, cached_intro)
+            try:
+                self.run_queue.submit(finish, name=f'{agent_id}/{session_id}/engagement')
+            except RunQueueFull:
+                # The engagement already exists, so finish it before responding rather than fail
+                await finish()
+            return engagement
+
+        @api.get("/agents/{agent_id}/engagements/{session_id}/", include_in_schema=False)
+        @api.get("/agents/{agent_id}/engagements/{session_id}")
+        async def get_engagement(agent_id: str, session_id: str) -> EngagementStatus:
+            engagement = self.engagements.get((agent_id, session_id), record=False)
+            if engagement is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No recent engagement for this session.')
+            return engagement
+
+        @api.post("/agents/{agent_id}/intro/refresh/", status_code=status.HTTP_200_OK, include_in_schema=False)
+        @api.post("/agents/{agent_id}/intro/refresh", status_code=status.HTTP_200_OK)
+        async def refresh_intro(agent_id: str) -> dict[str, bool]:
+            if self.intro_cache is None or not self.intro_cache.caches(agent_id):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='The introduction of this agent is not cached.')
+            return {'dropped': self.intro_cache.refresh(agent_id)}
 
         @api.post("/agents/{agent_id}/disengage/", status_code=status.HTTP_200_OK, include_in_schema=False)
         @api.post("/agents/{agent_id}/disengage", status_code=status.HTTP_200_OK)
-        async def disengage_agent(agent_id: str, disengage: DisengageAgent) -> None:
-            conversation_client = ConversationClient.get_instance()
+        async def disengage_agent(agent_id: str, disengage: DisengageAgent) -> DisengageResult:
+            conversation_client = AsyncConversationClient.get_instance()
+            result = DisengageResult(mdl_ref=disengage.mdl_ref)
             try:
-                sessions = await self.local_session_client.get_sessions_for_model_ref(agent_id, disengage.mdl_ref)
-            except:
-                sessions = []
-            for token, conv_id in sessions:
+                sessions = await self._get_sessions_for_model_ref(agent_id, disengage.mdl_ref)
+            except Exception as e:
+                result.results.append(CleanupResult(resource='sessions', resource_id=agent_id, success=False, error=str(e)))
+                return result
 
-                # Delete all the tasks
-                client = ModelTasksAPIClient(token, disengage.mdl_ref)
-                try:
-                    client.delete_all_my_tasks()
-                except:
-                    print('Could not delete tasks for model ref', disengage.mdl_ref)
+            semaphore = asyncio.Semaphore(self.disengage_concurrency)
 
-                # Then delete all the conversations
-                try:
-                    conversation_client.delete_conversation(token, disengage.mdl_ref, conv_id)
-                except:
-                    pass
-                try:
-                    await self.local_session_client.delete_session(agent_id, conv_id)
-                except:
-                    pass
+            async def cleanup(resource: str, resource_id: str, delete: Callable[[], Awaitable[bool | None]]) -> CleanupResult:
+                async with semaphore:
+                    try:
+                        # Deleters that don't report success raise on failure instead
+                        success = await delete() is not False
+                        return CleanupResult(resource=resource, resource_id=resource_id, success=success)
+                    except Exception as e:
+                        return CleanupResult(resource=resource, resource_id=resource_id, success=False, error=str(e))
+
+            jobs = []
+            if sessions:
+                # The tasks belong to the model, so they only need deleting once
+                token, _ = sessions[0]
+                tasks_client = AsyncModelTasksAPIClient(token, disengage.mdl_ref)
+
+                async def _delete_tasks() -> bool:
+                    return all((await tasks_client.delete_all_my_tasks()).values())
+                jobs.append(cleanup('tasks', disengage.mdl_ref, _delete_tasks))
+            for token, conv_id in sessions:
+                jobs.append(cleanup(
+                    'conversation',
+                    conv_id,
+                    partial(conversation_client.delete_conversation, token, disengage.mdl_ref, conv_id),
+                ))
+                jobs.append(cleanup('session', conv_id, partial(self._delete_session, agent_id, conv_id)))
+
+            result.results.extend(await asyncio.gather(*jobs))
+            if not result.success:
+                self.logger.warning(
+                    'disengage_partially_failed',
+                    mdl_ref=disengage.mdl_ref,
+                    failed=[r.model_dump() for r in result.results if not r.success],
+                )
+            return result
 
         @api.post("/scheduler/", status_code=status.HTTP_200_OK, include_in_schema=False)
         @api.post("/scheduler", status_code=status.HTTP_200_OK)
-        async def run_task(payload: GADKAgentSchedulerPayload) -> str:
-            # Check that the session and app_name combo are correct
-            run_request = RunAgentRequest(
-                app_name=payload.app_name,
-                user_id=self.USER_ID,
-                session_id=payload.session_id,
-                new_message=Content(
-                    parts=[Part(text=payload.message)],
-                    role="user",
-                ),
-                streaming=False,
-            )
+        async def run_task(
+                payload: GADKAgentSchedulerPayload,
+                idempotency_key: str | None = Header(default=None, alias='Idempotency-Key'),
+        ) -> str:
+            if self.traffic_recorder is not None:
+                self.traffic_recorder.record('scheduler', '/hapra/v1/scheduler', payload)
             try:
-                await self.local_session_client.run(run_request)
+                await self._run_scheduled(payload, idempotency_key)
                 return 'success'
             except Exception as e:
                 return str(e.args)
 
+        @api.post("/scheduler/batch/", status_code=status.HTTP_200_OK, include_in_schema=False)
+        @api.post("/scheduler/batch", status_code=status.HTTP_200_OK)
+        async def run_task_batch(batch: BatchSchedulerPayload) -> BatchSchedulerResult:
+            if self.traffic_recorder is not None:
+                self.traffic_recorder.record('scheduler_batch', '/hapra/v1/scheduler/batch', batch)
+
+            async def _run(payload: GADKAgentSchedulerPayload) -> ScheduledRunResult:
+                async with self._scheduled_runs:
+                    try:
+                        await self._run_scheduled(payload)
+                        return ScheduledRunResult(app_name=payload.app_name, session_id=payload.session_id, success=True)
+                    except Exception as e:
+                        return ScheduledRunResult(app_name=payload.app_name, session_id=payload.session_id, success=False, error=str(e.args))
+
+            result = BatchSchedulerResult(results=await asyncio.gather(*(_run(payload) for payload in batch.runs)))
+            if not result.success:
+                self.logger.warning(
+                    'scheduler_batch_partially_failed',
+                    failed=[r.model_dump() for r in result.results if not r.success],
+                )
+            return result
+
         return api
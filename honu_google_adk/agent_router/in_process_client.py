@@ -0,0 +1,166 @@
+from typing import Any, AsyncIterator
+
+from fastapi import HTTPException
+from google.adk.agents import BaseAgent, RunConfig
+from google.adk.agents.run_config import StreamingMode
+from google.adk.apps import App
+from google.adk.artifacts import BaseArtifactService
+from google.adk.auth.credential_service.base_credential_service import BaseCredentialService
+from google.adk.auth.credential_service.in_memory_credential_service import InMemoryCredentialService
+from google.adk.cli.adk_web_server import RunAgentRequest
+from google.adk.cli.utils.agent_loader import AgentLoader
+from google.adk.cli.utils.base_agent_loader import BaseAgentLoader
+from google.adk.cli.utils.service_factory import (
+    create_artifact_service_from_options,
+    create_memory_service_from_options,
+    create_session_service_from_options,
+)
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.memory import BaseMemoryService
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService
+from starlette import status
+
+
+class InProcessSessionClient:
+    """
+    Drop-in replacement for LocalSessionClient that calls the ADK Runner and session service directly, instead of
+    going through the ADK server's HTTP API on localhost.
+    The session service must be backed by the same store as the ADK server's (e.g. the same SESSION_SERVICE_URI)
+    so both see the same sessions.
+    """
+
+    def __init__(
+            self,
+            agent_loader: BaseAgentLoader,
+            session_service: BaseSessionService,
+            artifact_service: BaseArtifactService | None = None,
+            memory_service: BaseMemoryService | None = None,
+            credential_service: BaseCredentialService | None = None,
+    ):
+        self.agent_loader = agent_loader
+        self.session_service = session_service
+        self.artifact_service = artifact_service
+        self.memory_service = memory_service
+        self.credential_service = credential_service or InMemoryCredentialService()
+        self.USER_ID = "user"  # could be the model ref for now
+        self._runners: dict[str, Runner] = {}
+
+    @classmethod
+    def from_options(
+            cls,
+            agents_dir: str,
+            session_service_uri: str | None = None,
+            artifact_service_uri: str | None = None,
+            memory_service_uri: str | None = None,
+    ) -> 'InProcessSessionClient':
+        """
+        Build the client from the same options passed to `get_fast_api_app`.
+        """
+        return cls(
+            agent_loader=AgentLoader(agents_dir),
+            session_service=create_session_service_from_options(
+                base_dir=agents_dir,
+                session_service_uri=session_service_uri,
+            ),
+            artifact_service=create_artifact_service_from_options(
+                base_dir=agents_dir,
+                artifact_service_uri=artifact_service_uri,
+            ),
+            memory_service=create_memory_service_from_options(
+                base_dir=agents_dir,
+                memory_service_uri=memory_service_uri,
+            ),
+        )
+
+    def _get_runner(self, app_name: str) -> Runner:
+        runner = self._runners.get(app_name)
+        if runner is not None:
+            return runner
+
+        agent_or_app = self.agent_loader.load_agent(app_name)
+        if isinstance(agent_or_app, BaseAgent):
+            agent_or_app = App(name=app_name, root_agent=agent_or_app)
+        runner = Runner(
+            app=agent_or_app,
+            session_service=self.session_service,
+            artifact_service=self.artifact_service,
+            memory_service=self.memory_service,
+            credential_service=self.credential_service,
+        )
+        self._runners[app_name] = runner
+        return runner
+
+    async def list_apps(self) -> list[str]:
+        return self.agent_loader.list_agents()
+
+    async def list_sessions(self, app_name: str) -> list[dict]:
+        response = await self.session_service.list_sessions(app_name=app_name, user_id=self.USER_ID)
+        return [session.model_dump(mode='json') for session in response.sessions]
+
+    async def get_sessions_for_model_ref(self, app_name: str, model_ref: str) -> list[(str, str)]:
+        return [
+            (session['state']['token'], session['id'])
+            for session in await self.list_sessions(app_name)
+            if session['state'].get('model_ref', None) == model_ref
+        ]
+
+    async def create_session(self, app_name: str, session_id: str, state: dict[str, Any], events: list[Event] | None = None):
+        """
+        :param events: History to start the session with.
+        """
+        try:
+            session = await self.session_service.create_session(
+                app_name=app_name,
+                user_id=self.USER_ID,
+                session_id=session_id,
+                state=state,
+            )
+        except AlreadyExistsError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        for event in events or []:
+            await self.session_service.append_event(session=session, event=event)
+
+    async def delete_session(self, app_name: str, session_id: str):
+        await self.session_service.delete_session(app_name=app_name, user_id=self.USER_ID, session_id=session_id)
+
+    async def run(self, request: RunAgentRequest):
+        async for _ in self.run_sse(request):
+            pass
+
+    async def run_sse(self, request: RunAgentRequest) -> AsyncIterator[Event]:
+        """
+        Run the agent, yielding events (including partial ones when streaming) as they are produced.
+        """
+        await self.get_session_state(request.app_name, request.session_id)
+        runner = self._get_runner(request.app_name)
+        events = runner.run_async(
+            user_id=request.user_id,
+            session_id=request.session_id,
+            new_message=request.new_message,
+            state_delta=request.state_delta,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE if request.streaming else StreamingMode.NONE),
+        )
+        try:
+            async for event in events:
+                yield event
+        finally:
+            await events.aclose()
+
+    async def get_session_state(self, app_name: str, session_id: str) -> dict:
+        session = await self.session_service.get_session(app_name=app_name, user_id=self.USER_ID, session_id=session_id)
+        if session is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Session not found')
+        return session.state
+
+    async def get_session_events(self, app_name: str, session_id: str) -> list[Event]:
+        session = await self.session_service.get_session(app_name=app_name, user_id=self.USER_ID, session_id=session_id)
+        if session is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Session not found')
+        return session.events
+
+    async def close(self):
+        runners, self._runners = self._runners, {}
+        for runner in runners.values():
+            await runner.close()
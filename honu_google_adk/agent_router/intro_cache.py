@@ -0,0 +1,105 @@
+import time
+import uuid
+from dataclasses import dataclass
+
+from google.adk.events import Event, EventActions
+
+from honu_google_adk.ttl_cache import TTLCache
+
+
+@dataclass
+class CachedIntro:
+    """
+    An agent's introduction, as the session events of the run that produced it and the messages it sent the user.
+    """
+    events: list[Event]
+    messages: list[str]
+
+    def events_for_new_session(self) -> list[Event]:
+        """
+        Copies of the events with new ids and timestamps, without any state or artifact changes the original run made.
+        """
+        invocation_ids: dict[str, str] = {}
+        now = time.time()
+        return [
+            event.model_copy(deep=True, update={
+                'id': Event.new_id(),
+                'invocation_id': invocation_ids.setdefault(event.invocation_id, f'e-{uuid.uuid4()}'),
+                'timestamp': now,
+                'actions': EventActions(),
+            })
+            for event in self.events
+        ]
+
+
+def capture_intro(events: list[Event], prompt: str) -> CachedIntro | None:
+    """
+    Find the introduction in a session's events: the last run prompted with `prompt`, and the text the agent answered
+    with.
+    :return: None if the session has no introduction, or the agent said nothing.
+    """
+    start = None
+    for i, event in enumerate(events):
+        if event.author == 'user' and event.content and any(part.text == prompt for part in event.content.parts or []):
+            start = i
+    if start is None:
+        return None
+
+    intro_events = [event for event in events[start:] if not event.partial]
+    messages = [
+        part.text
+        for event in intro_events[1:]
+        if event.author != 'user' and event.content
+        for part in event.content.parts or []
+        if part.text and not part.thought
+    ]
+    if not messages:
+        return None
+    return CachedIntro(events=intro_events, messages=messages)
+
+
+class IntroMessageCache:
+    """
+    Introductions of the apps that have opted in, generated by the first engagement of each app and config version
+    and reused by the engagements after it, instead of running the agent each time.
+    Only opt in apps whose introduction doesn't depend on the user, e.g. on tools that read the user's data.
+    """
+
+    def __init__(self, apps: dict[str, str], ttl: float = 24 * 60 * 60):
+        """
+        :param apps: Config version of each app whose introduction is cached, by app name. Changing an app's version
+            stops its cached introduction being used.
+        :param ttl: Seconds an introduction is reused for before it is generated again.
+        """
+        self.apps = apps
+        self._intros: TTLCache[tuple[str, str], CachedIntro] = TTLCache(maxsize=max(len(apps), 1), ttl=ttl)
+
+    def caches(self, app_name: str) -> bool:
+        return app_name in self.apps
+
+    def key(self, app_name: str) -> tuple[str, str]:
+        return app_name, self.apps[app_name]
+
+    def get(self, app_name: str) -> CachedIntro | None:
+        if not self.caches(app_name):
+            return None
+        return self._intros.get(self.key(app_name))
+
+    def set(self, app_name: str, intro: CachedIntro):
+        if self.caches(app_name):
+            self._intros.set(self.key(app_name), intro)
+
+    def refresh(self, app_name: str) -> bool:
+        """
+        Drop the app's introductions, so the next engagement generates it again.
+        :return: Whether there were any to drop.
+        """
+        return self._intros.invalidate(lambda key: key[0] == app_name) > 0
+
+    @property
+    def hits(self) -> int:
+        return self._intros.hits
+
+    @property
+    def misses(self) -> int:
+        return self._intros.misses
@@ -0,0 +1,166 @@
+import asyncio
+import random
+from dataclasses import dataclass
+
+import httpx
+import structlog
+from starlette import status
+
+from .conversation_utils import AsyncConversationClient, MAX_MESSAGE_RETRY
+from .schema import Conversation, SupportedMessages, TextMessage
+
+ConversationKey = tuple[str, str]
+
+
+@dataclass
+class _OutboxItem:
+    token: str
+    conversation: Conversation
+    message: SupportedMessages
+    # Adjacent text messages with the same group (e.g. the parts of one event) are sent as a single message
+    group: str | None = None
+
+
+def _is_retryable(response: httpx.Response) -> bool:
+    return response.is_server_error or response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+class ConversationOutbox:
+    """
+    Delivers agent messages to the Conversation server in the background.
+    Each conversation gets its own queue and worker so messages arrive in order, failed sends are retried with
+    backoff, and a conversation with a slow server applies backpressure to its producer instead of growing unbounded.
+    """
+
+    def __init__(
+            self,
+            conversation_client: AsyncConversationClient,
+            max_queue_size: int = 100,
+            max_retries: int = MAX_MESSAGE_RETRY,
+            retry_base_delay: float = 0.5,
+            retry_max_delay: float = 30,
+    ):
+        """
+        :param conversation_client: Client used to send the messages.
+        :param max_queue_size: Number of queued messages after which `put` waits for the queue to drain.
+        :param max_retries: Number of attempts made to send a message before it is dropped.
+        :param retry_base_delay: Backoff before the first retry, doubled on each following one.
+        :param retry_max_delay: Cap on the backoff between retries.
+        """
+        self.conversation_client = conversation_client
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.logger = structlog.get_logger('honu_google_adk.conversation_outbox')
+
+        self._queues: dict[ConversationKey, asyncio.Queue[_OutboxItem]] = {}
+        self._workers: dict[ConversationKey, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(conversation: Conversation) -> ConversationKey:
+        return conversation.mdl_ref, conversation.conversation_id
+
+    def queue_size(self, conversation: Conversation) -> int:
+        queue = self._queues.get(self._key(conversation))
+        return 0 if queue is None else queue.qsize()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            'conversations': len(self._queues),
+            'queued': sum(queue.qsize() for queue in self._queues.values()),
+        }
+
+    async def put(self, token: str, conversation: Conversation, message: SupportedMessages, group: str | None = None):
+        """
+        Queue a message for delivery. Only waits if the conversation's queue is full.
+        :param group: Messages from the same group may be merged with their neighbours when they are plain text.
+        """
+        key = self._key(conversation)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue(maxsize=self.max_queue_size)
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._deliver(key, queue))
+        await queue.put(_OutboxItem(token, conversation, message, group))
+
+    async def flush(self, conversation: Conversation):
+        """
+        Wait until every message queued for the conversation has been delivered or given up on.
+        """
+        queue = self._queues.get(self._key(conversation))
+        if queue is not None:
+            await queue.join()
+
+    @staticmethod
+    def _merge(last: _OutboxItem, item: _OutboxItem) -> _OutboxItem | None:
+        """
+        Merge adjacent text messages from the same group.
+        :return: The merged message, or None if the two aren't merged.
+        """
+        if (
+            item.group is not None
+            and item.group == last.group
+            and isinstance(item.message, TextMessage)
+            and isinstance(last.message, TextMessage)
+        ):
+            return _OutboxItem(last.token, last.conversation, TextMessage(body=f'{last.message.body}\n{item.message.body}'), last.group)
+        return None
+
+    async def _deliver(self, key: ConversationKey, queue: asyncio.Queue[_OutboxItem]):
+        # Taken from the queue to find where the group before it ended, and sent next
+        held: _OutboxItem | None = None
+        try:
+            while True:
+                # Wait a tick so the other parts of the same event have a chance to be queued
+                await asyncio.sleep(0)
+                if held is None:
+                    if queue.empty():
+                        return
+                    held = queue.get_nowait()
+                item, count, held = held, 1, None
+                # Only one group is taken off the queue at a time, so producers still wait on a full queue while it
+                # is being retried
+                while not queue.empty():
+                    following = queue.get_nowait()
+                    merged = self._merge(item, following)
+                    if merged is None:
+                        held = following
+                        break
+                    item, count = merged, count + 1
+                await self._send_with_retries(item)
+                for _ in range(count):
+                    queue.task_done()
+        finally:
+            del self._workers[key]
+            if queue.empty() and self._queues.get(key) is queue:
+                del self._queues[key]
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter" so retries from many conversations don't line up
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+
+    async def _send_with_retries(self, item: _OutboxItem) -> bool:
+        for attempt in range(self.max_retries):
+            try:
+                response = await self.conversation_client.send_message(item.token, item.conversation, item.message)
+                if response.is_success:
+                    return True
+                if not _is_retryable(response):
+                    break
+            except Exception as e:
+                self.logger.warning(
+                    'failed_to_deliver_message',
+                    conversation_id=item.conversation.conversation_id,
+                    attempt=attempt,
+                    error=str(e),
+                )
+            if attempt + 1 < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt))
+
+        self.logger.error(
+            'gave_up_delivering_message',
+            conversation_id=item.conversation.conversation_id,
+            message=item.message.model_dump(),
+        )
+        return False
@@ -1,5 +1,6 @@
 import traceback
 from collections import defaultdict
+from dataclasses import dataclass
 from typing import Optional, Any
 
 import structlog
@@ -11,8 +12,24 @@ from google.adk.plugins import BasePlugin
 from google.adk.tools import BaseTool, ToolContext
 from google.genai import types
 
-from honu_google_adk.agent_router.conversation_utils import ConversationClient
+from honu_google_adk.agent_router.chat_status import ChatStatusCoalescer
+from honu_google_adk.agent_router.conversation_utils import AsyncConversationClient
+from honu_google_adk.agent_router.outbox import ConversationOutbox
 from honu_google_adk.agent_router.schema import Conversation, TextMessage
+from honu_google_adk.metrics import MetricFamily, MetricsRegistry
+from honu_google_adk.ttl_cache import TTLCache
+
+
+@dataclass
+class _StreamedText:
+    # Text received in partial events that hasn't been forwarded yet
+    buffer: str = ''
+    # Text already forwarded to the conversation
+    sent: str = ''
+
+
+def _event_text(event: Event) -> str:
+    return ''.join(part.text for part in event.content.parts if part.text)
 
 
 class HonuConversationPlugin(BasePlugin):
@@ -20,19 +37,36 @@ class HonuConversationPlugin(BasePlugin):
 
     def __init__(self, name: str):
         super().__init__(name)
-        self.conversation_client = ConversationClient.get_instance()
+        self.conversation_client = AsyncConversationClient.get_instance()
+        # Status changes are sent in the background so they never hold up the agent
+        self.chat_status = ChatStatusCoalescer(self.conversation_client)
+        # Messages are delivered in order by a background worker per conversation
+        self.outbox = ConversationOutbox(self.conversation_client)
+        # Text of streamed responses that is being forwarded paragraph by paragraph, by (invocation_id, author)
+        self._streamed_text: TTLCache[tuple[str, str], _StreamedText] = TTLCache(maxsize=10_000, ttl=3600)
         self.logger = structlog.get_logger('honu_google_adk.honu_conversation_plugin')
-
-    def _get_conv_for_session_id(self, token: str, model_ref: str, session_id: str) -> Conversation | None:
-        convs = [
-            c
-            for c in
-            self.conversation_client.get_conversations_for_model(token, model_ref)
-            if c.conversation_id == session_id
+        MetricsRegistry.get_instance().register_collector(f'honu_conversation_plugin/{name}', self._collect_metrics)
+
+    def _collect_metrics(self) -> list[MetricFamily]:
+        outbox = self.outbox.stats()
+        return [
+            MetricFamily(
+                'honu_outbox_queued_messages',
+                'Messages waiting to be delivered to the Conversation server.',
+                'gauge',
+                [({'plugin': self.name}, outbox['queued'])],
+            ),
+            MetricFamily(
+                'honu_outbox_conversations',
+                'Conversations with messages being delivered.',
+                'gauge',
+                [({'plugin': self.name}, outbox['conversations'])],
+            ),
         ]
-        if not convs:
-            return None
-        return convs[0]
+
+    async def _get_conv_for_session_id(self, token: str, model_ref: str, session_id: str) -> Conversation | None:
+        # Sessions share their id with the conversation they were created for
+        return await self.conversation_client.get_conversation(token, model_ref, session_id)
 
     async def before_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> Optional[types.Content]:
         token = callback_context.state.get('token')
@@ -42,12 +76,12 @@ class HonuConversationPlugin(BasePlugin):
             return
 
         # Try to get the conversation for the current session
-        conversation = self._get_conv_for_session_id(token, model_ref, callback_context.session.id)
+        conversation = await self._get_conv_for_session_id(token, model_ref, callback_context.session.id)
         if conversation is None:
             return
 
         # Set the status for the conversation
-        self.conversation_client.set_chat_status(token, conversation, 'thinking')
+        self.chat_status.update(token, conversation, 'thinking')
 
     async def after_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> Optional[types.Content]:
         # Check for token and model ref in state
@@ -58,12 +92,13 @@ class HonuConversationPlugin(BasePlugin):
             return
 
         # Try to get the conversation for the current session
-        conversation = self._get_conv_for_session_id(token, model_ref, callback_context.session.id)
+        conversation = await self._get_conv_for_session_id(token, model_ref, callback_context.session.id)
         if conversation is None:
             return
 
-        # Set the status for the conversation
-        self.conversation_client.set_chat_status(token, conversation, None)
+        # Make sure the user has every message before we stop showing the agent as busy
+        await self.outbox.flush(conversation)
+        self.chat_status.update(token, conversation, None)
 
     async def on_event_callback(self, *, invocation_context: InvocationContext, event: Event) -> Optional[Event]:
         if event.content is None:
@@ -79,27 +114,68 @@ class HonuConversationPlugin(BasePlugin):
             return
 
         # Try to get the conversation for the current session
-        conversation = self._get_conv_for_session_id(token, model_ref, session_id)
+        conversation = await self._get_conv_for_session_id(token, model_ref, session_id)
         if conversation is None:
             return
 
+        if event.partial:
+            await self._forward_partial_text(token, conversation, event)
+            return
+
+        # If the response was streamed some of its text has already been forwarded, only the rest needs sending
+        streamed = self._streamed_text.pop((event.invocation_id, event.author))
+        if streamed is not None:
+            await self._send_rest_of_streamed_text(token, conversation, event, streamed)
+
         # Loop through the parts of the event and update the conversation accordingly
         for part in event.content.parts:
             if part.function_call:
-                self.conversation_client.set_chat_status(token, conversation, f'running tool: {part.function_call.name}')
+                self.chat_status.update(token, conversation, f'running tool: {part.function_call.name}')
                 self.logger.info('function_call_event', **part.function_call.model_dump())
             elif part.text:
-                self.conversation_client.send_message(
-                    token,
-                    conversation,
-                    TextMessage(body=part.text)
-                )
+                if streamed is None:
+                    await self.outbox.put(
+                        token,
+                        conversation,
+                        TextMessage(body=part.text),
+                        group=event.id,
+                    )
             elif part.function_response:
-                self.conversation_client.set_chat_status(token, conversation, 'thinking')
+                self.chat_status.update(token, conversation, 'thinking')
                 self.logger.info('function_response_event', **part.function_response.model_dump())
             else:
                 self.logger.warning('unhandled_message_type', **part)
 
+    async def _forward_partial_text(self, token: str, conversation: Conversation, event: Event):
+        """
+        Forward the completed paragraphs of a response that is still being streamed, so the user can start reading it
+        before the model has finished.
+        """
+        key = (event.invocation_id, event.author)
+        streamed = self._streamed_text.get(key, record=False)
+        if streamed is None:
+            streamed = _StreamedText()
+            self._streamed_text.set(key, streamed)
+
+        streamed.buffer += _event_text(event)
+        paragraphs, separator, streamed.buffer = streamed.buffer.rpartition('\n\n')
+        if not separator:
+            return
+        streamed.sent += paragraphs + separator
+        if paragraphs.strip():
+            await self.outbox.put(token, conversation, TextMessage(body=paragraphs.strip()))
+
+    async def _send_rest_of_streamed_text(self, token: str, conversation: Conversation, event: Event, streamed: _StreamedText):
+        full_text = _event_text(event)
+        if full_text.startswith(streamed.sent):
+            rest = full_text[len(streamed.sent):]
+        else:
+            # Shouldn't happen, but better to repeat ourselves than to lose part of the response
+            self.logger.warning('streamed_text_does_not_match_final_response', invocation_id=event.invocation_id)
+            rest = full_text
+        if rest.strip():
+            await self.outbox.put(token, conversation, TextMessage(body=rest.strip()), group=event.id)
+
     async def on_model_error_callback(
         self,
         *,
@@ -115,13 +191,13 @@ class HonuConversationPlugin(BasePlugin):
             return
 
         # Try to get the conversation for the current session
-        conversation = self._get_conv_for_session_id(token, model_ref, callback_context.session.id)
+        conversation = await self._get_conv_for_session_id(token, model_ref, callback_context.session.id)
         if conversation is None:
             self.logger.error('llm_model_error', llm_request=llm_request, exc_info=traceback.print_exception(error), model_ref=model_ref)
             return
 
-        # Set the status for the conversation
-        self.conversation_client.send_message(
+        # Let the user know something went wrong
+        await self.outbox.put(
             token,
             conversation,
             TextMessage(body='An error occurred handling your last message. Please try again or contact support if this persists.'),
@@ -148,7 +224,7 @@ class HonuConversationPlugin(BasePlugin):
             return
 
         # Try to get the conversation for the current session
-        conversation = self._get_conv_for_session_id(token, model_ref, tool_context.session.id)
+        conversation = await self._get_conv_for_session_id(token, model_ref, tool_context.session.id)
         if conversation is None:
             # Log as much info as we can
             self.logger.error(
@@ -160,8 +236,8 @@ class HonuConversationPlugin(BasePlugin):
             )
             return
 
-        # Set the status for the conversation
-        self.conversation_client.send_message(
+        # Let the user know something went wrong
+        await self.outbox.put(
             token,
             conversation,
             TextMessage(body='An error occurred handling your last message. Please try again or contact support if this persists.'),
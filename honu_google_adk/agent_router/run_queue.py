@@ -0,0 +1,123 @@
+import asyncio
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import structlog
+
+Job = Callable[[], Awaitable[None]]
+
+
+class RunQueueFull(Exception):
+    """
+    The queue is at its limit, the job has been shed rather than queued.
+    """
+
+
+@dataclass
+class _QueuedJob:
+    job: Job
+    name: str
+    enqueued_at: float
+
+
+class AgentRunQueue:
+    """
+    A bounded queue of agent runs worked through by a fixed number of async workers.
+    Lets endpoints accept work and respond straight away, while capping how many runs happen at once and shedding
+    load once too many are waiting.
+    """
+
+    def __init__(self, concurrency: int = 8, max_queued: int = 100, wait_time_samples: int = 1000):
+        """
+        :param concurrency: Number of jobs run at the same time.
+        :param max_queued: Number of jobs that can wait for a worker before new ones are rejected.
+        :param wait_time_samples: Number of recent queue wait times kept for the stats.
+        """
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.logger = structlog.get_logger('honu_google_adk.agent_run_queue')
+
+        self._queue: asyncio.Queue[_QueuedJob] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_times: deque[float] = deque(maxlen=wait_time_samples)
+
+    def _start(self) -> asyncio.Queue[_QueuedJob]:
+        # Started lazily so the queue is bound to the event loop that is serving requests
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        return self._queue
+
+    def submit(self, job: Job, name: str = 'agent_run'):
+        """
+        Queue a job without waiting for it to run.
+        :param job: Called with no arguments by a worker, returning the awaitable to run.
+        :param name: Used to identify the job in logs.
+        :raise RunQueueFull: If `max_queued` jobs are already waiting.
+        """
+        queue = self._start()
+        try:
+            queue.put_nowait(_QueuedJob(job, name, time.monotonic()))
+        except asyncio.QueueFull:
+            self._rejected += 1
+            self.logger.warning('agent_run_rejected', job=name, queued=queue.qsize())
+            raise RunQueueFull()
+
+    async def _work(self):
+        while True:
+            queued = await self._queue.get()
+            wait_time = time.monotonic() - queued.enqueued_at
+            self._wait_times.append(wait_time)
+            self._running += 1
+            try:
+                await queued.job()
+                self._completed += 1
+            except Exception:
+                self._failed += 1
+                self.logger.exception('queued_agent_run_failed', job=queued.name, queue_wait_seconds=wait_time)
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def join(self):
+        """
+        Wait for every queued job to finish.
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self, drain_timeout: float = 30):
+        """
+        Give queued jobs up to `drain_timeout` seconds to finish, then cancel the workers.
+        """
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning('agent_run_queue_stopped_before_draining', queued=self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue = None
+        self._workers = []
+
+    def stats(self) -> dict[str, float]:
+        waits = sorted(self._wait_times)
+        return {
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'running': self._running,
+            'completed': self._completed,
+            'failed': self._failed,
+            'rejected': self._rejected,
+            'wait_seconds_p50': statistics.median(waits) if waits else 0.0,
+            'wait_seconds_p95': waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            'wait_seconds_max': waits[-1] if waits else 0.0,
+        }
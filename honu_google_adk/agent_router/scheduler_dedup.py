@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+PRUNE_EVERY = 100
+
+
+class SchedulerDeliveryLog:
+    """
+    Remembers which scheduled runs have been delivered, so a delivery the scheduling service retries or repeats is
+    acknowledged without running the agent again.
+    Deliveries are identified by their delivery id when they have one. Without one, a run of the same app, session and
+    message claimed within the last `window` seconds is treated as a repeat. Stored in a SQLite file so repeats are
+    still recognised after a restart, and pruned to the newest `max_entries` deliveries of the last `retention` seconds.
+    Use the `a` prefixed methods from async code, they run the SQLite calls in a thread rather than on the event loop.
+    """
+
+    def __init__(
+            self,
+            path: str | Path = ':memory:',
+            window: float = 300,
+            retention: float = 24 * 60 * 60,
+            max_entries: int = 100_000,
+    ):
+        """
+        :param path: SQLite file the log is kept in. In memory by default, which only recognises repeats until the
+            router restarts.
+        :param window: Seconds within which runs of the same session and message without a delivery id are treated as
+            repeats.
+        :param retention: Seconds a delivery with an id is remembered for.
+        :param max_entries: Number of deliveries remembered.
+        """
+        self.path = str(path)
+        self.window = window
+        self.retention = retention
+        self.max_entries = max_entries
+        self.duplicates = 0
+        self._claims = 0
+        # The connection is shared by the threads the async methods run in
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS scheduler_deliveries ('
+                'delivery_key TEXT PRIMARY KEY, claimed_at REAL NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS scheduler_deliveries_by_age ON scheduler_deliveries (claimed_at)'
+            )
+
+    @staticmethod
+    def key(app_name: str, session_id: str, message: str, delivery_id: str | None = None) -> str:
+        if delivery_id:
+            return f'id/{delivery_id}'
+        digest = hashlib.sha256(message.encode()).hexdigest()[:32]
+        return f'run/{app_name}/{session_id}/{digest}'
+
+    def claim(self, key: str, now: float | None = None) -> bool:
+        """
+        Claim a delivery before running it.
+        :return: False if the delivery has already been claimed, and is either running or has run.
+        """
+        now = time.time() if now is None else now
+        # Runs without a delivery id are only repeats of recent runs, so the same message can be scheduled again later
+        expires_after = self.retention if key.startswith('id/') else self.window
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM scheduler_deliveries WHERE delivery_key = ? AND claimed_at <= ?',
+                (key, now - expires_after),
+            )
+            claimed = self._conn.execute(
+                'INSERT OR IGNORE INTO scheduler_deliveries (delivery_key, claimed_at) VALUES (?, ?)',
+                (key, now),
+            ).rowcount == 1
+            if not claimed:
+                self.duplicates += 1
+                return False
+            self._claims += 1
+        if self._claims % PRUNE_EVERY == 0:
+            self.prune(now)
+        return True
+
+    def release(self, key: str):
+        """
+        Forget a delivery whose run failed, so the scheduling service's retry runs it again.
+        """
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM scheduler_deliveries WHERE delivery_key = ?', (key,))
+
+    def prune(self, now: float | None = None):
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM scheduler_deliveries WHERE claimed_at < ? OR (delivery_key LIKE ? AND claimed_at < ?)',
+                (now - self.retention, 'run/%', now - self.window),
+            )
+            self._conn.execute(
+                'DELETE FROM scheduler_deliveries WHERE delivery_key NOT IN '
+                '(SELECT delivery_key FROM scheduler_deliveries ORDER BY claimed_at DESC LIMIT ?)',
+                (self.max_entries,),
+            )
+
+    async def aclaim(self, key: str) -> bool:
+        return await asyncio.to_thread(self.claim, key)
+
+    async def arelease(self, key: str):
+        await asyncio.to_thread(self.release, key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM scheduler_deliveries').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -15,6 +15,54 @@ class DisengageAgent(BaseModel):
     agent_signature: str
 
 
+class CleanupResult(BaseModel):
+    """
+    The outcome of deleting one resource while disengaging an agent
+    """
+    resource: Literal['sessions', 'tasks', 'conversation', 'session']
+    resource_id: str
+    success: bool
+    error: str | None = None
+
+
+class DisengageResult(BaseModel):
+    """
+    Everything deleted when disengaging an agent. Failed resources can be cleaned up by disengaging again.
+    """
+    mdl_ref: str
+    results: list[CleanupResult] = []
+
+    @property
+    def success(self) -> bool:
+        return all(result.success for result in self.results)
+
+
+class EngagementStep(BaseModel):
+    """
+    The progress of one piece of work left running in the background by init_engagement
+    """
+    status: Literal['pending', 'running', 'succeeded', 'failed', 'skipped'] = 'pending'
+    error: str | None = None
+
+
+class EngagementStatus(BaseModel):
+    """
+    An engagement's conversation and session exist as soon as init_engagement responds, while the agent's
+    introduction and the brainbeat task are set up in the background.
+    """
+    app_name: str
+    session_id: str
+    mdl_ref: str
+    # Whether the introduction was a cached one rather than generated for this engagement
+    intro_cached: bool = False
+    intro: EngagementStep = EngagementStep()
+    brainbeat: EngagementStep = EngagementStep()
+
+    @property
+    def done(self) -> bool:
+        return all(step.status not in ('pending', 'running') for step in (self.intro, self.brainbeat))
+
+
 class TextMessage(BaseModel):
     """
     A Simple Text Message
@@ -114,3 +162,30 @@ class GADKAgentSchedulerPayload(BaseModel):
     app_name: str
     session_id: str
     message: str
+    # Identifies the delivery, so repeats of it can be recognised
+    delivery_id: str | None = None
+
+
+class BatchSchedulerPayload(BaseModel):
+    """
+    Many scheduled runs delivered at once, e.g. every brainbeat due in the same minute.
+    """
+    runs: list[GADKAgentSchedulerPayload]
+
+
+class ScheduledRunResult(BaseModel):
+    """
+    The outcome of one run of a batch delivered to the scheduler
+    """
+    app_name: str
+    session_id: str
+    success: bool
+    error: str | None = None
+
+
+class BatchSchedulerResult(BaseModel):
+    results: list[ScheduledRunResult] = []
+
+    @property
+    def success(self) -> bool:
+        return all(result.success for result in self.results)
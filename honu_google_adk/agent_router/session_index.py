@@ -0,0 +1,160 @@
+"""
+Index from (app_name, model_ref) to the ids of the sessions engaged for that model.
+
+Rebuild it from the sessions already in the ADK app with:
+
+    python -m honu_google_adk.agent_router.session_index --index ./sessions.model_index.db --port 7999
+"""
+import argparse
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from .utils import LocalSessionClient
+
+
+class ModelSessionIndex:
+    """
+    Keeps track of which sessions belong to which model, and the token each was engaged with, so finding them doesn't
+    mean listing every session of the app or reading each one. Stored in a SQLite file, which should sit alongside the
+    session store so it survives restarts.
+    Use the `a` prefixed methods from async code, they run the SQLite calls in a thread rather than on the event loop.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        # The connection is shared by the threads the async methods run in
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS model_sessions ('
+                'app_name TEXT NOT NULL, model_ref TEXT NOT NULL, session_id TEXT NOT NULL, token TEXT, '
+                'PRIMARY KEY (app_name, session_id))'
+            )
+            # Indexes made before tokens were kept get the column, their sessions' tokens are read from the sessions
+            columns = [row[1] for row in self._conn.execute('PRAGMA table_info(model_sessions)')]
+            if 'token' not in columns:
+                self._conn.execute('ALTER TABLE model_sessions ADD COLUMN token TEXT')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS model_sessions_by_model ON model_sessions (app_name, model_ref)'
+            )
+
+    @classmethod
+    def for_session_service_uri(cls, session_service_uri: str) -> 'ModelSessionIndex':
+        """
+        Create the index next to a SQLite session store, e.g. `sqlite:///./sessions.db` gets
+        `./sessions.model_index.db`.
+        :raise ValueError: If the session store isn't a SQLite file, pass a path to the constructor instead.
+        """
+        scheme, _, db_path = session_service_uri.partition(':///')
+        if not scheme.startswith('sqlite') or not db_path or db_path == ':memory:':
+            raise ValueError(f'Can only place the index next to a SQLite session store, got {session_service_uri}')
+        db_path = Path(db_path)
+        return cls(db_path.with_name(f'{db_path.stem}.model_index.db'))
+
+    def add(self, app_name: str, model_ref: str, session_id: str, token: str | None = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO model_sessions (app_name, model_ref, session_id, token) VALUES (?, ?, ?, ?)',
+                (app_name, model_ref, session_id, token),
+            )
+
+    def remove(self, app_name: str, session_id: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM model_sessions WHERE app_name = ? AND session_id = ?',
+                (app_name, session_id),
+            )
+
+    def session_ids(self, app_name: str, model_ref: str) -> list[str]:
+        return [session_id for _, session_id in self.sessions(app_name, model_ref)]
+
+    def sessions(self, app_name: str, model_ref: str) -> list[tuple[str | None, str]]:
+        """
+        :return: (token, session_id) for each of the model's sessions. The token is None for sessions indexed without
+            one.
+        """
+        with self._lock:
+            return self._conn.execute(
+                'SELECT token, session_id FROM model_sessions WHERE app_name = ? AND model_ref = ? ORDER BY session_id',
+                (app_name, model_ref),
+            ).fetchall()
+
+    def replace(self, app_name: str, entries: Iterable[tuple[str, str, str | None]]) -> int:
+        """
+        Replace everything indexed for the app.
+        :param entries: (model_ref, session_id, token) of each session.
+        :return: The number of sessions indexed.
+        """
+        entries = list(entries)
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM model_sessions WHERE app_name = ?', (app_name,))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO model_sessions (app_name, model_ref, session_id, token) VALUES (?, ?, ?, ?)',
+                [(app_name, model_ref, session_id, token) for model_ref, session_id, token in entries],
+            )
+        return len(entries)
+
+    async def aadd(self, app_name: str, model_ref: str, session_id: str, token: str | None = None):
+        await asyncio.to_thread(self.add, app_name, model_ref, session_id, token)
+
+    async def aremove(self, app_name: str, session_id: str):
+        await asyncio.to_thread(self.remove, app_name, session_id)
+
+    async def asessions(self, app_name: str, model_ref: str) -> list[tuple[str | None, str]]:
+        return await asyncio.to_thread(self.sessions, app_name, model_ref)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+async def rebuild(index: ModelSessionIndex, session_client: LocalSessionClient, app_names: list[str] | None = None) -> dict[str, int]:
+    """
+    Rebuild the index for each app from a full scan of its sessions.
+    :return: The number of sessions indexed for each app.
+    """
+    if not app_names:
+        app_names = await session_client.list_apps()
+    indexed = {}
+    for app_name in app_names:
+        sessions = await session_client.list_sessions(app_name)
+        indexed[app_name] = await asyncio.to_thread(
+            index.replace,
+            app_name,
+            [
+                (session['state']['model_ref'], session['id'], session['state'].get('token'))
+                for session in sessions
+                if session['state'].get('model_ref') is not None
+            ],
+        )
+    return indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the model to session index from the sessions in the ADK app.')
+    parser.add_argument('--index', required=True, help='Path of the index file.')
+    parser.add_argument('--port', type=int, default=7999, help='Port the ADK app is served on.')
+    parser.add_argument('--app', action='append', dest='apps', help='App to rebuild, may be repeated. Defaults to every app.')
+    args = parser.parse_args()
+
+    async def _rebuild():
+        session_client = LocalSessionClient(args.port)
+        try:
+            return await rebuild(index, session_client, args.apps)
+        finally:
+            await session_client.close()
+
+    index = ModelSessionIndex(args.index)
+    try:
+        for app_name, count in asyncio.run(_rebuild()).items():
+            print(f'{app_name}: indexed {count} sessions')
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+import structlog
+
+T = TypeVar('T')
+
+# Runs one turn of the agent on the given messages
+Turn = Callable[[list[str]], Awaitable[None]]
+
+
+@dataclass
+class _SessionTurns:
+    # Messages waiting for the next turn, and a future for each resolved once that turn has run
+    pending: list[str] = field(default_factory=list)
+    waiters: list[asyncio.Future] = field(default_factory=list)
+
+
+@dataclass
+class _SessionLock:
+    # Held for each turn of the session, and dropped once no turn holds or waits for it
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+def _retrieve(future: asyncio.Future):
+    # Nobody may be waiting on the future, so its exception is retrieved here to keep asyncio from warning about it
+    if not future.cancelled():
+        future.exception()
+
+
+class SessionRunCoalescer:
+    """
+    Runs one turn at a time per session. Messages that arrive while a session's turn is running are merged into a
+    single follow-up turn, rather than each starting a turn that races the others on the session's state. Turns that
+    aren't a user's messages, like an introduction or a scheduled run, are run with `run_exclusive` to take their turn
+    in between without being merged with the messages.
+    """
+
+    def __init__(self):
+        self.logger = structlog.get_logger('honu_google_adk.session_runs')
+        self._sessions: dict[Hashable, _SessionTurns] = {}
+        self._drivers: set[asyncio.Task] = set()
+        self._locks: dict[Hashable, _SessionLock] = {}
+        self._messages = 0
+        self._turns = 0
+        self._exclusive_turns = 0
+
+    @asynccontextmanager
+    async def _turn(self, key: Hashable):
+        session_lock = self._locks.setdefault(key, _SessionLock())
+        session_lock.users += 1
+        try:
+            async with session_lock.lock:
+                yield
+        finally:
+            session_lock.users -= 1
+            if not session_lock.users:
+                del self._locks[key]
+
+    def add(self, key: Hashable, text: str) -> tuple[asyncio.Future, bool]:
+        """
+        Add a message to the session's next turn.
+        :return: A future resolved once the turn with the message has run, and whether the session has no turns
+            running or queued, in which case the caller must `drive` it.
+        """
+        self._messages += 1
+        session = self._sessions.get(key)
+        start = session is None
+        if start:
+            session = self._sessions[key] = _SessionTurns()
+        waiter = asyncio.get_running_loop().create_future()
+        waiter.add_done_callback(_retrieve)
+        session.pending.append(text)
+        session.waiters.append(waiter)
+        return waiter, start
+
+    def discard(self, key: Hashable):
+        """
+        Drop the messages waiting for the session's next turn, when it can't be driven after all.
+        """
+        session = self._sessions.pop(key, None)
+        for waiter in session.waiters if session is not None else []:
+            waiter.cancel()
+
+    async def drive(self, key: Hashable, turn: Turn):
+        """
+        Run turns for the session until no messages are waiting, each on every message that arrived during the turn
+        before it.
+        :raise Exception: The last error a turn raised, once every waiting message has had its turn.
+        """
+        session = self._sessions[key]
+        error = None
+        waiters = []
+        try:
+            while session.pending:
+                async with self._turn(key):
+                    texts, waiters = session.pending, session.waiters
+                    session.pending, session.waiters = [], []
+                    self._turns += 1
+                    if len(texts) > 1:
+                        self.logger.info('session_messages_coalesced', session=str(key), messages=len(texts))
+                    try:
+                        await turn(texts)
+                    except Exception as e:
+                        error = e
+                        for waiter in waiters:
+                            if not waiter.done():
+                                waiter.set_exception(e)
+                    else:
+                        for waiter in waiters:
+                            if not waiter.done():
+                                waiter.set_result(None)
+        finally:
+            # Cancelled part way through, nothing else will run what is left
+            for waiter in waiters + session.waiters:
+                waiter.cancel()
+            del self._sessions[key]
+        if error is not None:
+            raise error
+
+    async def run(self, key: Hashable, text: str, turn: Turn):
+        """
+        Run the message in the session's next turn, and wait for that turn to finish.
+        """
+        waiter, start = self.add(key, text)
+        if start:
+            driver = asyncio.create_task(self.drive(key, turn))
+            self._drivers.add(driver)
+            driver.add_done_callback(self._drivers.discard)
+            driver.add_done_callback(_retrieve)
+        await waiter
+
+    async def run_exclusive(self, key: Hashable, turn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a turn of the session's own once its current turn has finished, keeping its messages for the turn after.
+        """
+        async with self._turn(key):
+            self._exclusive_turns += 1
+            return await turn()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            'active_sessions': len(self._sessions),
+            'messages': self._messages,
+            'turns': self._turns,
+            'exclusive_turns': self._exclusive_turns,
+            'coalesced': self._messages - self._turns - sum(len(session.pending) for session in self._sessions.values()),
+        }
@@ -1,8 +1,17 @@
+import asyncio
 from dataclasses import dataclass
+from functools import cached_property
 
 import jwt
 import structlog
-from httpx import Client, Response
+from httpx import AsyncClient, Client, Limits, Response
+
+
+def _scheduling_url(auth_token: str) -> str:
+    return jwt.decode(
+        auth_token,
+        options={'verify_signature': False},
+    ).get('url', '').rstrip('/').replace('localhost', 'host.docker.internal')
 
 
 class ModelTasksAPIClientException(Exception):
@@ -22,7 +31,7 @@ class ModelTasksAPIClient:
         self.model_ref = model_ref
         self.logger = structlog.get_logger('honu_google_adk.model_tasks_api_client')
 
-    @property
+    @cached_property
     def client(self):
         return Client(
             base_url=self.url,
@@ -30,13 +39,10 @@ class ModelTasksAPIClient:
             timeout=300,
             verify=False,
         )
-    
-    @property
+
+    @cached_property
     def url(self) -> str:
-        return jwt.decode(
-            self.auth_token, 
-            options={'verify_signature': False},
-        ).get('url', '').rstrip('/').replace('localhost', 'host.docker.internal')
+        return _scheduling_url(self.auth_token)
 
     @property
     def auth_header(self):
@@ -74,3 +80,111 @@ class ModelTasksAPIClient:
             if not response.is_success:
                 # We'll just be trying to delete all tasks, some will fail and some will succeed
                 pass
+
+
+class AsyncModelTasksAPIClient:
+    """
+    Non-blocking version of ModelTasksAPIClient.
+    Every instance for the same scheduling server shares one connection pool, so creating a client per request is
+    cheap, and the token is only decoded once per instance.
+    """
+    _clients: dict[str, AsyncClient] = {}
+
+    def __init__(self, auth_token: str, model_ref: str, delete_concurrency: int = 10, page_size: int = 100):
+        """
+        :param auth_token: Access token, also says which scheduling server to use.
+        :param model_ref: Model reference.
+        :param delete_concurrency: Number of tasks deleted at the same time.
+        :param page_size: Number of tasks requested per page when listing them.
+        """
+        self.auth_token = auth_token
+        self.model_ref = model_ref
+        self.delete_concurrency = delete_concurrency
+        self.page_size = page_size
+        self.url = _scheduling_url(auth_token)
+        self.logger = structlog.get_logger('honu_google_adk.model_tasks_api_client')
+
+    @property
+    def client(self) -> AsyncClient:
+        client = self._clients.get(self.url)
+        if client is None or client.is_closed:
+            client = self._clients[self.url] = AsyncClient(
+                base_url=self.url,
+                timeout=300,
+                verify=False,
+                limits=Limits(max_connections=50, max_keepalive_connections=10),
+            )
+        return client
+
+    @classmethod
+    async def aclose_all(cls):
+        clients, cls._clients = cls._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    @property
+    def auth_header(self):
+        return {"Authorization": f"Bearer {self.auth_token}"}
+
+    @property
+    def _scheduling_path(self) -> str:
+        _, domain_id, model_id = self.model_ref.split('|')
+        return f'/v1/domains/{domain_id}/models/{model_id}/scheduling'
+
+    async def create_task(self, payload, name, description, cron_str, target_url) -> Response:
+        response = await self.client.post(
+            self._scheduling_path,
+            json={
+                'name': name,
+                'description': description,
+                'cron_string': cron_str,
+                'target_url': target_url,
+                'payload': payload,
+                'http_headers': {},
+            },
+            headers=self.auth_header,
+        )
+        if not response.is_success:
+            self.logger.error(
+                'failed_to_create_task',
+                response=f'{response.status_code}: {response.text}',
+                model_ref=self.model_ref,
+                name=name,
+            )
+        return response
+
+    async def _get_task_page(self, offset: int) -> list[dict]:
+        response = await self.client.get(
+            self._scheduling_path,
+            params={'limit': self.page_size, 'offset': offset},
+            headers=self.auth_header,
+        )
+        if not response.is_success:
+            raise ModelTasksAPIClientException(response)
+        return response.json()
+
+    async def delete_all_my_tasks(self) -> dict[str, bool]:
+        """
+        Delete every task in the model, deleting each page of tasks concurrently as soon as it is listed.
+        :return: Whether each task was deleted, by task id.
+        :raise ModelTasksAPIClientException: If the tasks could not be listed.
+        """
+        semaphore = asyncio.Semaphore(self.delete_concurrency)
+
+        async def _delete(task_id: str) -> bool:
+            async with semaphore:
+                response = await self.client.delete(f'{self._scheduling_path}/{task_id}', headers=self.auth_header)
+            # We'll just be trying to delete all tasks, some will fail and some will succeed
+            return response.is_success
+
+        results: dict[str, bool] = {}
+        while True:
+            # Deleted tasks drop out of the listing, so only skip past the ones that couldn't be deleted
+            failed = list(results.values()).count(False)
+            tasks = await self._get_task_page(failed)
+            page = [task['id'] for task in tasks if task['id'] not in results]
+            if not page:
+                return results
+            results.update(zip(page, await asyncio.gather(*(_delete(task_id) for task_id in page))))
+            if len(tasks) < self.page_size:
+                return results
@@ -0,0 +1,34 @@
+import json
+import time
+from pathlib import Path
+
+from pydantic import BaseModel
+
+ENDPOINTS = ('messages', 'init_engagement', 'scheduler', 'scheduler_batch')
+
+
+class TrafficRecorder:
+    """
+    Appends the payloads hitting the router to a JSON lines file.
+    Recordings contain auth tokens, so keep them somewhere as safe as the tokens themselves.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        # Line buffered, so a record is on disk as soon as it is written
+        self._file = open(self.path, 'a', buffering=1)
+
+    def record(self, endpoint: str, path: str, body: BaseModel):
+        """
+        :param endpoint: One of ENDPOINTS.
+        :param path: Path the payload was posted to.
+        """
+        self._file.write(json.dumps({
+            'ts': time.time(),
+            'endpoint': endpoint,
+            'path': path,
+            'body': body.model_dump(mode='json'),
+        }) + '\n')
+
+    def close(self):
+        self._file.close()
@@ -1,64 +1,185 @@
 import traceback
+from contextlib import asynccontextmanager
 from fastapi import HTTPException
-from typing import Iterator, Any
+from typing import AsyncIterator, Iterator, Any
 
 import httpx
 from google.adk.cli.adk_web_server import RunAgentRequest
-from httpx_sse import connect_sse, ServerSentEvent
+from google.adk.events import Event
+from httpx_sse import aconnect_sse, ServerSentEvent
 from starlette import status
 
+from ..metrics import SESSION_CLIENT_SECONDS, timed
+
+
+class AgentRunError(Exception):
+    """
+    The agent failed part way through a streamed run.
+    """
+
 
 class LocalSessionClient:
 
-    def __init__(self, port):
+    def __init__(
+            self,
+            port,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            session_timeout: float = 30,
+            run_timeout: float = 600,
+    ):
+        """
+        :param port: Port the ADK app is served on.
+        :param max_connections: Maximum number of open connections to the ADK app.
+        :param max_keepalive_connections: Number of idle connections kept open for reuse.
+        :param session_timeout: Timeout in seconds for the session endpoints.
+        :param run_timeout: Seconds to wait for the agent to respond when running it.
+        """
         self.agent_url = f"http://localhost:{port}"
         self.USER_ID = "user"  # could be the model ref for now
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.session_timeout = httpx.Timeout(session_timeout)
+        self.run_timeout = httpx.Timeout(session_timeout, read=run_timeout)
+
+        self._client: httpx.AsyncClient | None = None
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._requests = 0
+        self._saturated_requests = 0
 
     @property
-    def client(self):
-        return httpx.AsyncClient(
-            base_url=self.agent_url,
-            headers={
-                "accept": "application/json",
-                "Content-type": "application/json"
-            },
-            timeout=None,
-        )
+    def client(self) -> httpx.AsyncClient:
+        # One client for the lifetime of the app so connections are kept alive between calls
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.agent_url,
+                headers={
+                    "accept": "application/json",
+                    "Content-type": "application/json"
+                },
+                timeout=self.session_timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                ),
+            )
+        return self._client
 
-    async def get_sessions_for_model_ref(self, app_name: str, model_ref: str) -> list[(str, str)]:
-        async with self.client as client:
+    @asynccontextmanager
+    async def _request(self, operation: str):
+        """
+        Borrow the client for one request, keeping track of how busy the connection pool is and how long it takes.
+        """
+        self._requests += 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        if self._in_flight > self.max_connections:
+            # This request has to wait for a connection to free up
+            self._saturated_requests += 1
+        try:
+            with timed(SESSION_CLIENT_SECONDS, f'honu.session_client.{operation}', operation=operation):
+                yield self.client
+        finally:
+            self._in_flight -= 1
+
+    def pool_stats(self) -> dict[str, float]:
+        return {
+            'max_connections': self.max_connections,
+            'in_flight': self._in_flight,
+            'peak_in_flight': self._peak_in_flight,
+            'utilisation': self._in_flight / self.max_connections,
+            'requests': self._requests,
+            'saturated_requests': self._saturated_requests,
+        }
+
+    async def list_apps(self) -> list[str]:
+        async with self._request('list_apps') as client:
+            response = await client.get("/list-apps")
+            if response.status_code != status.HTTP_200_OK:
+                response.raise_for_status()
+            return response.json()
+
+    async def list_sessions(self, app_name: str) -> list[dict]:
+        async with self._request('list_sessions') as client:
             response = await client.get(f"/apps/{app_name}/users/{self.USER_ID}/sessions")
             if response.status_code != status.HTTP_200_OK:
                 response.raise_for_status()
+            return response.json()
 
-            return [
-                (session['state']['token'], session['id'])
-                for session in response.json()
-                if session['state'].get('model_ref', None) == model_ref
-            ]
+    async def get_sessions_for_model_ref(self, app_name: str, model_ref: str) -> list[(str, str)]:
+        return [
+            (session['state']['token'], session['id'])
+            for session in await self.list_sessions(app_name)
+            if session['state'].get('model_ref', None) == model_ref
+        ]
 
-    async def create_session(self, app_name: str, session_id: str, state: dict[str, Any]):
-        async with self.client as client:
-            response = await client.post(f"/apps/{app_name}/users/{self.USER_ID}/sessions/{session_id}", json=state)
+    async def create_session(self, app_name: str, session_id: str, state: dict[str, Any], events: list[Event] | None = None):
+        """
+        :param events: History to start the session with.
+        """
+        async with self._request('create_session') as client:
+            if events:
+                response = await client.post(f"/apps/{app_name}/users/{self.USER_ID}/sessions", json={
+                    'session_id': session_id,
+                    'state': state,
+                    'events': [event.model_dump(mode='json', by_alias=True, exclude_none=True) for event in events],
+                })
+            else:
+                response = await client.post(f"/apps/{app_name}/users/{self.USER_ID}/sessions/{session_id}", json=state)
             if not response.is_success:
                 response.raise_for_status()
 
     async def delete_session(self, app_name: str, session_id: str):
-        async with self.client as client:
+        async with self._request('delete_session') as client:
             response = await client.delete(f"/apps/{app_name}/users/{self.USER_ID}/sessions/{session_id}")
             if not response.is_success:
                 response.raise_for_status()
 
     async def run(self, request: RunAgentRequest):
-        async with self.client as client:
-            response = await client.post('/run', json=request.model_dump())
+        if request.streaming:
+            # Plugins see the events as they are produced either way, we only need to wait for the run to end
+            async for _ in self.run_sse(request):
+                pass
+            return
+
+        async with self._request('run') as client:
+            response = await client.post('/run', json=request.model_dump(), timeout=self.run_timeout)
             if not response.is_success:
                 response.raise_for_status()
 
+    async def run_sse(self, request: RunAgentRequest) -> AsyncIterator[Event]:
+        """
+        Run the agent through the SSE endpoint, yielding events (including partial ones when streaming) as they arrive.
+        :raise AgentRunError: If the agent reports an error part way through the run.
+        """
+        async with self._request('run_sse') as client:
+            async with aconnect_sse(client, 'POST', '/run_sse', json=request.model_dump(), timeout=self.run_timeout) as event_source:
+                if not event_source.response.is_success:
+                    await event_source.response.aread()
+                    event_source.response.raise_for_status()
+                async for sse in event_source.aiter_sse():
+                    data = sse.json()
+                    if 'error' in data:
+                        raise AgentRunError(data['error'])
+                    yield Event.model_validate(data)
+
     async def get_session_state(self, app_name: str, session_id: str) -> dict:
-        async with self.client as client:
+        async with self._request('get_session_state') as client:
             response = await client.get(f'/apps/{app_name}/users/{self.USER_ID}/sessions/{session_id}')
             if response.status_code != status.HTTP_200_OK:
                 response.raise_for_status()
             return response.json()['state']
 
+    async def get_session_events(self, app_name: str, session_id: str) -> list[Event]:
+        async with self._request('get_session_events') as client:
+            response = await client.get(f'/apps/{app_name}/users/{self.USER_ID}/sessions/{session_id}')
+            if response.status_code != status.HTTP_200_OK:
+                response.raise_for_status()
+            return [Event.model_validate(event) for event in response.json()['events']]
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
@@ -1,5 +1,8 @@
+import asyncio
+import time
+
 from google.genai import types
-import json
+import structlog
 from fastmcp import Client
 from fastmcp.client import StreamableHttpTransport
 from google.adk.agents.readonly_context import ReadonlyContext
@@ -11,15 +14,37 @@ from mcp import Tool
 from typing import Optional, Any
 from typing_extensions import override
 
+from .mcp_session_pool import MCPSessionPool, PoolKey
+from .metrics import MCP_TOOL_CALL_SECONDS, sampled, timed
+from .tool_response import ResponseLimits, build_tool_response, save_full_response
+from .tool_result_cache import ToolResultCache
+
+# Tools with this tag have their results cached, like tools annotated with readOnlyHint
+CACHEABLE_TAG = 'cacheable'
+
+
+def _tool_tags(tool: Tool) -> set[str]:
+    meta = getattr(tool, 'meta', None) or {}
+    return set(meta.get('_fastmcp', {}).get('tags', []))
+
 
 class HonuMCPFunctionTool(BaseTool):
+    # Share of tool calls that are logged, every failed call is logged regardless
+    log_sample_rate: float = 0.1
+
     mcp_tool: Tool
     mcp_host: str
+    session_pool: MCPSessionPool
+    result_cache: ToolResultCache
+    response_limits: ResponseLimits
 
     def __init__(
             self,
             mcp_tool: Tool,
             mcp_host: str,
+            session_pool: MCPSessionPool | None = None,
+            result_cache: ToolResultCache | None = None,
+            response_limits: ResponseLimits | None = None,
     ):
         super().__init__(
             name=mcp_tool.name,
@@ -27,6 +52,20 @@ class HonuMCPFunctionTool(BaseTool):
         )
         self.mcp_tool = mcp_tool
         self.mcp_host = mcp_host
+        self.session_pool = session_pool if session_pool is not None else MCPSessionPool.get_instance()
+        self.result_cache = result_cache if result_cache is not None else ToolResultCache.get_instance()
+        self.response_limits = response_limits or ResponseLimits()
+        self.logger = structlog.get_logger('honu_google_adk.honu_mcp_function_tool')
+
+    @property
+    def is_read_only(self) -> bool:
+        """
+        Whether the tool only reads data, so its results can be cached.
+        """
+        annotations = self.mcp_tool.annotations
+        if annotations is not None and annotations.readOnlyHint:
+            return True
+        return CACHEABLE_TAG in _tool_tags(self.mcp_tool)
 
     @override
     def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
@@ -51,33 +90,94 @@ class HonuMCPFunctionTool(BaseTool):
         )
         return client
 
+    def _get_pool_key(self, tool_context: ToolContext) -> PoolKey:
+        return self.mcp_host, tool_context.state.get('token'), tool_context.state.get('model_ref')
+
     @override
     async def run_async(
       self, *, args: dict[str, Any], tool_context: ToolContext
   ) -> Any:
-        client = self._get_client(tool_context)
-        print('calling', self.mcp_tool.name, 'with arguments', args)
-
-        async with client:
-            # Execute operations
-            result = await client.call_tool(self.mcp_tool.name, args)
-        response: dict[str, Any] = {'success': True}
-        if result.content:
-            try:
-                response['artefacts'] = json.loads(result.content[0].text)
-            except:
-                response['text'] = result.content[0].text
-                response['error_msg'] = 'Could not unwrap response into JSON. Plaintext response has been provided instead.'
-        print('received response', response, 'for tool', self.mcp_tool.name, 'tool_result', result)
+        model_ref = tool_context.state.get('model_ref')
+        if not self.is_read_only:
+            response = await self._call_tool(args, tool_context)
+            # The tool may have changed data that the model's read-only tools returned
+            self.result_cache.invalidate_model(model_ref)
+            return await save_full_response(response, tool_context, self.mcp_tool.name)
+
+        cache_key = self.result_cache.key(model_ref, self.mcp_tool.name, args)
+
+        async def _load() -> dict[str, Any]:
+            response = await self._call_tool(args, tool_context)
+            # Summarised responses carry their full payload, too much to keep around
+            if 'error_msg' not in response and not response.get('truncated'):
+                self.result_cache.set(cache_key, response)
+            return response
+
+        # Served from the cache, or shared with an identical call already in flight. Each caller gets its own copy, and
+        # saves the full payload of a summarised response in its own session
+        response = await self.result_cache.get_or_load(cache_key, _load)
+        return await save_full_response(response, tool_context, self.mcp_tool.name)
+
+    async def _call_tool(self, args: dict[str, Any], tool_context: ToolContext) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            with timed(MCP_TOOL_CALL_SECONDS, 'honu.mcp.call_tool', tool=self.mcp_tool.name):
+                # Reuse an already initialised session for this host/token/model where possible
+                result = await self.session_pool.call_tool(
+                    self._get_pool_key(tool_context),
+                    lambda: self._get_client(tool_context),
+                    self.mcp_tool.name,
+                    args,
+                )
+        except Exception as e:
+            self.logger.warning('mcp_tool_call_failed', tool=self.mcp_tool.name, arguments=list(args), error=str(e))
+            raise
+
+        response = await build_tool_response(result.content, self.response_limits)
+        if sampled(self.log_sample_rate):
+            self.logger.info(
+                'mcp_tool_called',
+                tool=self.mcp_tool.name,
+                arguments=list(args),
+                duration_seconds=round(time.perf_counter() - start, 3),
+                truncated=response.get('truncated', False),
+            )
         return response
 
 class HonuToolSet(BaseToolset):
     tags: set[str] | None = None
 
-    def __init__(self, mcp_host: str, *tags_to_filter_by: str):
+    def __init__(
+            self,
+            mcp_host: str,
+            *tags_to_filter_by: str,
+            session_pool: MCPSessionPool | None = None,
+            catalogue_ttl: float = 300,
+            result_cache: ToolResultCache | None = None,
+            response_limits: ResponseLimits | None = None,
+    ):
+        """
+        :param mcp_host: URL of the MCP server to take tools from.
+        :param tags_to_filter_by: Only expose tools with at least one of these tags. All tools are exposed if empty.
+        :param session_pool: Pool of MCP sessions for tool calls. Defaults to the shared MCPSessionPool.
+        :param catalogue_ttl: Seconds the tool list is served from memory before it is refreshed in the background.
+        :param result_cache: Cache for the results of read-only tools, those annotated with readOnlyHint or tagged
+            `cacheable`. Defaults to the shared ToolResultCache.
+        :param response_limits: Size limits for tool responses, above which they are summarised for the model.
+        """
         self.mcp_host = mcp_host
+        self.session_pool = session_pool
+        self.result_cache = result_cache
+        self.response_limits = response_limits
+        self.catalogue_ttl = catalogue_ttl
         if len(tags_to_filter_by):
             self.tags = set(tags_to_filter_by)
+        self.logger = structlog.get_logger('honu_google_adk.honu_tool_set')
+
+        self._catalogue: list[HonuMCPFunctionTool] | None = None
+        self._catalogue_fetched_at = 0.0
+        self._catalogue_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
         super().__init__(tool_filter=None)
 
     def _get_unauth_client(self):
@@ -100,18 +200,55 @@ class HonuToolSet(BaseToolset):
         tool_tags = set(getattr(tool, 'meta').get('_fastmcp', {}).get('tags', []))
         return len(self.tags & tool_tags) > 0
 
+    async def _refresh_catalogue(self) -> list[HonuMCPFunctionTool]:
+        client = self._get_unauth_client()
+        async with client:
+            mcp_tools = await client.list_tools()
+
+        # Keep the existing tool objects for any tool whose definition hasn't changed
+        current = {tool.name: tool for tool in self._catalogue or []}
+        catalogue = []
+        for mcp_tool in mcp_tools:
+            if not self._is_valid_tool(mcp_tool):
+                continue
+            tool = current.get(mcp_tool.name)
+            if tool is None or tool.mcp_tool != mcp_tool:
+                tool = HonuMCPFunctionTool(
+                    mcp_tool,
+                    self.mcp_host,
+                    self.session_pool,
+                    self.result_cache,
+                    self.response_limits,
+                )
+            catalogue.append(tool)
+
+        self._catalogue = catalogue
+        self._catalogue_fetched_at = time.monotonic()
+        return catalogue
+
+    async def _refresh_catalogue_in_background(self):
+        try:
+            await self._refresh_catalogue()
+        except Exception as e:
+            # Carry on serving the last good catalogue, we'll try again when it is next requested
+            self.logger.warning('failed_to_refresh_tool_catalogue', mcp_host=self.mcp_host, error=str(e))
+
     async def get_tools(
             self,
             readonly_context: Optional[ReadonlyContext] = None,
     ) -> list[BaseTool]:
-        client = self._get_unauth_client()
-        async with client:
-            return [
-                HonuMCPFunctionTool(tool, self.mcp_host)
-                for tool in (await client.list_tools())
-                if self._is_valid_tool(tool)
-            ]
-
+        if self._catalogue is None:
+            # Nothing to serve yet so this caller has to wait, but make sure only one of them fetches the tools
+            async with self._catalogue_lock:
+                if self._catalogue is None:
+                    await self._refresh_catalogue()
+            return list(self._catalogue)
+
+        is_stale = time.monotonic() - self._catalogue_fetched_at >= self.catalogue_ttl
+        if is_stale and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_catalogue_in_background())
+        return list(self._catalogue)
 
     async def close(self):
-        return None
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
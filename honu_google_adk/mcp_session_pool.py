@@ -0,0 +1,213 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable
+
+import anyio
+import httpx
+import structlog
+from fastmcp import Client
+from mcp import McpError
+from mcp.types import CONNECTION_CLOSED
+
+# (mcp_host, token, model_ref)
+PoolKey = tuple[str, str | None, str | None]
+ClientFactory = Callable[[], Client]
+
+
+def _is_dead_session_error(error: BaseException) -> bool:
+    """
+    Whether an error raised while calling a tool means the MCP session itself is gone (so the call is worth retrying
+    on a fresh session), rather than the tool failing.
+    """
+    if isinstance(error, (anyio.ClosedResourceError, anyio.BrokenResourceError, httpx.ConnectError)):
+        return True
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED or error.error.message == 'Session terminated'
+    return False
+
+
+@dataclass
+class _PooledSession:
+    client: Client
+    last_used: float
+    last_checked: float
+    active: int = 0
+    # False for overflow sessions created while the pool was full of busy sessions
+    pooled: bool = True
+    discarded: bool = False
+
+
+class MCPSessionPool:
+    """
+    Keeps initialised MCP client sessions alive so tool calls don't pay for a connect and an initialize handshake
+    every time.
+    Sessions are keyed by (mcp_host, token, model_ref) and shared between concurrent calls, as MCP multiplexes
+    requests over a single session.
+    """
+    _instance = None
+
+    def __init__(
+            self,
+            max_size: int = 64,
+            idle_timeout: float = 300,
+            health_check_interval: float = 30,
+            health_check_timeout: float = 5,
+    ):
+        """
+        :param max_size: Maximum number of sessions kept open. The least recently used idle session is closed to make
+            room for a new one.
+        :param idle_timeout: Seconds a session can go unused before it is closed.
+        :param health_check_interval: Sessions unused for longer than this are pinged before being reused.
+        :param health_check_timeout: Seconds to wait for a health check ping.
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.logger = structlog.get_logger('honu_google_adk.mcp_session_pool')
+
+        self._sessions: OrderedDict[PoolKey, _PooledSession] = OrderedDict()
+        self._key_locks: defaultdict[PoolKey, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._closing: set[asyncio.Task] = set()
+
+    @classmethod
+    def get_instance(cls) -> 'MCPSessionPool':
+        """
+        The pool shared by every HonuToolSet that isn't given its own.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def _is_healthy(self, entry: _PooledSession) -> bool:
+        if not entry.client.is_connected():
+            return False
+        # Only ping sessions that have been sat around long enough for the server or a proxy to have dropped them
+        if entry.active or time.monotonic() - entry.last_checked < self.health_check_interval:
+            return True
+        try:
+            with anyio.fail_after(self.health_check_timeout):
+                await entry.client.ping()
+        except Exception:
+            return False
+        entry.last_checked = time.monotonic()
+        return True
+
+    async def _close(self, entry: _PooledSession):
+        try:
+            with anyio.move_on_after(5):
+                await entry.client.close()
+        except Exception as e:
+            self.logger.warning('failed_to_close_mcp_session', error=str(e))
+
+    def _close_in_background(self, entry: _PooledSession):
+        task = asyncio.create_task(self._close(entry))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def _discard(self, key: PoolKey, entry: _PooledSession):
+        """
+        Remove a session from the pool. It is closed straight away if idle, otherwise by the last call using it.
+        """
+        if self._sessions.get(key) is entry:
+            del self._sessions[key]
+        entry.discarded = True
+        if not entry.active:
+            self._close_in_background(entry)
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        for key, entry in list(self._sessions.items()):
+            if not entry.active and now - entry.last_used > self.idle_timeout:
+                self.logger.debug('evicting_idle_mcp_session', mcp_host=key[0], model_ref=key[2])
+                self._discard(key, entry)
+        for key in [k for k, lock in self._key_locks.items() if k not in self._sessions and not lock.locked()]:
+            del self._key_locks[key]
+
+    def _make_room(self) -> bool:
+        """
+        Close least recently used idle sessions until there's space for another one.
+        :return: False if the pool is full of sessions which are all in use.
+        """
+        while len(self._sessions) >= self.max_size:
+            lru = next(((k, e) for k, e in self._sessions.items() if not e.active), None)
+            if lru is None:
+                return False
+            self._discard(*lru)
+        return True
+
+    async def _acquire(self, key: PoolKey, client_factory: ClientFactory) -> _PooledSession:
+        self._evict_idle()
+        async with self._key_locks[key]:
+            entry = self._sessions.get(key)
+            if entry is not None and not await self._is_healthy(entry):
+                self.logger.info('reconnecting_unhealthy_mcp_session', mcp_host=key[0], model_ref=key[2])
+                self._discard(key, entry)
+                entry = None
+
+            if entry is None:
+                now = time.monotonic()
+                entry = _PooledSession(client=client_factory(), last_used=now, last_checked=now)
+                await entry.client.__aenter__()
+                if self._make_room():
+                    self._sessions[key] = entry
+                else:
+                    entry.pooled = False
+
+            if entry.pooled:
+                self._sessions.move_to_end(key)
+            entry.active += 1
+            entry.last_used = time.monotonic()
+            return entry
+
+    async def _release(self, entry: _PooledSession):
+        entry.active -= 1
+        entry.last_used = time.monotonic()
+        if not entry.active and (entry.discarded or not entry.pooled):
+            await self._close(entry)
+
+    @asynccontextmanager
+    async def session(self, key: PoolKey, client_factory: ClientFactory) -> AsyncIterator[Client]:
+        """
+        Borrow a connected client for `key`, creating the session with `client_factory` if there isn't a usable one.
+        """
+        entry = await self._acquire(key, client_factory)
+        try:
+            yield entry.client
+        except BaseException as e:
+            if _is_dead_session_error(e):
+                self._discard(key, entry)
+            raise
+        finally:
+            await self._release(entry)
+
+    async def call_tool(self, key: PoolKey, client_factory: ClientFactory, tool_name: str, args: dict[str, Any]):
+        """
+        Call a tool over a pooled session. If the session turns out to be dead the call is retried once on a fresh one.
+        """
+        try:
+            async with self.session(key, client_factory) as client:
+                return await client.call_tool(tool_name, args)
+        except Exception as e:
+            if not _is_dead_session_error(e):
+                raise
+            self.logger.info('retrying_tool_call_on_new_mcp_session', tool=tool_name, mcp_host=key[0], error=str(e))
+        async with self.session(key, client_factory) as client:
+            return await client.call_tool(tool_name, args)
+
+    async def close(self):
+        """
+        Close every pooled session.
+        """
+        for key, entry in list(self._sessions.items()):
+            self._discard(key, entry)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+        # Locks are bound to the event loop they were first used from
+        self._key_locks.clear()
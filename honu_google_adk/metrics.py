@@ -0,0 +1,222 @@
+"""
+Metrics in the Prometheus text format, OpenTelemetry spans and sampled logging for the hot paths.
+
+Metrics are served by HonuAgentRouter at /hapra/v1/metrics. Spans are only recorded when an OpenTelemetry SDK
+tracer provider has been configured for the process, as the ADK already does when tracing to Cloud Trace.
+"""
+import bisect
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+try:
+    from opentelemetry import trace
+    _tracer = trace.get_tracer('honu_google_adk')
+except ImportError:
+    # Spans are optional, metrics still work without OpenTelemetry
+    _tracer = None
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class MetricFamily:
+    """
+    A set of samples reported by a collector when the metrics are rendered.
+    """
+    name: str
+    documentation: str
+    type: str
+    samples: list[tuple[dict[str, Any], float]] = field(default_factory=list)
+
+
+def _labels(labels: dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        (key, value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: defaultdict[Labels, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels):
+        self._values[_labels(labels)] += amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_labels(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self._values.items()):
+            lines.append(f'{self.name}{_format_labels(labels)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: count in each bucket (not cumulative, the last one is +Inf), and the sum
+        self._counts: dict[Labels, list[int]] = {}
+        self._sums: defaultdict[Labels, float] = defaultdict(float)
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(_labels(labels), []))
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """
+        Observe how long the block takes, with an `outcome` label of `error` if it raises and `ok` otherwise.
+        """
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            yield
+            outcome = 'ok'
+        finally:
+            self.observe(time.perf_counter() - start, outcome=outcome, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), counts):
+                cumulative += count
+                bucket_labels = _format_labels((*labels, ('le', _format_value(bound))))
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(self._sums[labels])}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {cumulative}')
+        return lines
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """
+    The metrics of the process. Counters and histograms are updated as things happen, while collectors report
+    values such as queue depths and cache hit rates when the metrics are rendered.
+    """
+    _instance = None
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._collectors: dict[str, Collector] = {}
+
+    @classmethod
+    def get_instance(cls) -> 'MetricsRegistry':
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, documentation, buckets))
+
+    def register_collector(self, name: str, collector: Collector):
+        """
+        :param name: Registering another collector under the same name replaces it.
+        """
+        self._collectors[name] = collector
+
+    def unregister_collector(self, name: str):
+        self._collectors.pop(name, None)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        families: dict[str, MetricFamily] = {}
+        for collector in list(self._collectors.values()):
+            for family in collector():
+                # Several collectors (e.g. one per router) can report samples for the same family
+                families.setdefault(family.name, MetricFamily(family.name, family.documentation, family.type))
+                families[family.name].samples.extend(family.samples)
+        for family in families.values():
+            lines.append(f'# HELP {family.name} {family.documentation}')
+            lines.append(f'# TYPE {family.name} {family.type}')
+            for labels, value in family.samples:
+                lines.append(f'{family.name}{_format_labels(_labels(labels))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+_registry = MetricsRegistry.get_instance()
+
+HTTP_REQUEST_SECONDS = _registry.histogram(
+    'honu_http_request_duration_seconds',
+    'Time taken to handle requests to the router, by route.',
+)
+SESSION_CLIENT_SECONDS = _registry.histogram(
+    'honu_session_client_request_duration_seconds',
+    'Time taken by calls to the ADK app through LocalSessionClient, by operation.',
+)
+MCP_TOOL_CALL_SECONDS = _registry.histogram(
+    'honu_mcp_tool_call_duration_seconds',
+    'Time taken by calls to MCP tools that went to the MCP host, by tool.',
+)
+CONVERSATION_REQUEST_SECONDS = _registry.histogram(
+    'honu_conversation_request_duration_seconds',
+    'Time taken by requests to the Conversation server, by operation.',
+)
+CONVERSATION_RESPONSES = _registry.counter(
+    'honu_conversation_responses_total',
+    'Responses from the Conversation server, by operation and status code.',
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, span_name: str, **labels) -> Iterator[None]:
+    """
+    Observe how long the block takes in the histogram, and record it as a span when tracing is configured.
+    """
+    if _tracer is None:
+        with histogram.time(**labels):
+            yield
+        return
+    with _tracer.start_as_current_span(span_name, attributes={f'honu.{key}': str(value) for key, value in labels.items()}):
+        with histogram.time(**labels):
+            yield
+
+
+def sampled(rate: float) -> bool:
+    """
+    Whether to log this occurrence of a hot path event, for roughly `rate` of them.
+    """
+    return rate >= 1 or random.random() < rate
@@ -0,0 +1,273 @@
+"""
+Record the traffic hitting HonuAgentRouter and replay it at a chosen concurrency and rate.
+
+Record by passing `traffic_recorder=TrafficRecorder('traffic.jsonl')` (from honu_google_adk.agent_router.traffic_recorder)
+to HonuAgentRouter, then replay with:
+
+    python -m honu_google_adk.replay traffic.jsonl --target http://localhost:7999 --concurrency 1,4,16
+    python -m honu_google_adk.replay traffic.jsonl --stand-ins --concurrency 1,4,16 --rate 50
+
+Each concurrency level is replayed in turn, reporting latency percentiles, error rates and status codes per endpoint,
+and the level at which the router saturated. With `--stand-ins` the traffic is replayed against a local router whose
+agent uses a stub model, and Honu services are replaced by local fakes, with tokens and app names rewritten to match.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import httpx
+import structlog
+
+from .agent_router.traffic_recorder import ENDPOINTS
+from .testing.stats import summarise
+
+
+def load_recording(path: str | Path) -> list[dict[str, Any]]:
+    """
+    The records written by TrafficRecorder, oldest first.
+    """
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return sorted(records, key=lambda record: record['ts'])
+
+
+def _succeeded(endpoint: str, response: httpx.Response) -> bool:
+    # The scheduler endpoints report failed runs in the body of a 200
+    if endpoint == 'scheduler':
+        return response.json() == 'success'
+    if endpoint == 'scheduler_batch':
+        return all(result['success'] for result in response.json()['results'])
+    return True
+
+
+async def replay(
+        records: list[dict[str, Any]],
+        target: str,
+        concurrency: int,
+        rate: float | None = None,
+        timeout: float = 600,
+) -> dict[str, dict[str, Any]]:
+    """
+    Post every record to the target, in recorded order.
+    :param concurrency: Number of requests in flight at once.
+    :param rate: Requests started per second, or None to start them as fast as `concurrency` allows.
+    :return: Stats and status code counts for each endpoint, and for all of them together under `all`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: defaultdict[str, list[float]] = defaultdict(list)
+    errors: Counter[str] = Counter()
+    status_codes: defaultdict[str, Counter[str]] = defaultdict(Counter)
+
+    async with httpx.AsyncClient(base_url=target, timeout=timeout, limits=httpx.Limits(max_connections=concurrency)) as client:
+
+        async def _send(i: int, record: dict[str, Any]):
+            if rate:
+                await asyncio.sleep(max(0.0, start + i / rate - time.perf_counter()))
+            async with semaphore:
+                sent_at = time.perf_counter()
+                try:
+                    response = await client.post(record['path'], json=record['body'])
+                    code = str(response.status_code)
+                    success = response.is_success and _succeeded(record['endpoint'], response)
+                except httpx.HTTPError as e:
+                    code = type(e).__name__
+                    success = False
+            status_codes[record['endpoint']][code] += 1
+            if success:
+                latencies[record['endpoint']].append(time.perf_counter() - sent_at)
+            else:
+                errors[record['endpoint']] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_send(i, record) for i, record in enumerate(records)))
+        elapsed = time.perf_counter() - start
+
+    report = {}
+    for endpoint in sorted(status_codes):
+        report[endpoint] = summarise(latencies[endpoint], errors[endpoint], elapsed)
+        report[endpoint]['status_codes'] = dict(status_codes[endpoint])
+    report['all'] = summarise(
+        [latency for endpoint_latencies in latencies.values() for latency in endpoint_latencies],
+        sum(errors.values()),
+        elapsed,
+    )
+    return report
+
+
+def find_saturation(
+        levels: list[tuple[int, dict[str, dict[str, Any]]]],
+        max_error_rate: float = 0.01,
+        min_throughput_gain: float = 0.1,
+        max_latency_growth: float = 2,
+) -> int | None:
+    """
+    The first concurrency level at which the router stopped keeping up: errors went over `max_error_rate`, throughput
+    grew by less than `min_throughput_gain` over the previous level, or p95 latency grew to more than
+    `max_latency_growth` times that of the first level.
+    :param levels: (concurrency, replay report) for each level, in increasing order of concurrency.
+    :return: The concurrency level, or None if the router kept up at every level.
+    """
+    first = levels[0][1]['all'] if levels else None
+    previous = None
+    for concurrency, report in levels:
+        stats = report['all']
+        if stats['error_rate'] > max_error_rate:
+            return concurrency
+        if previous is not None and stats['throughput_rps'] < previous['throughput_rps'] * (1 + min_throughput_gain):
+            return concurrency
+        if first['p95_ms'] and stats['p95_ms'] > first['p95_ms'] * max_latency_growth:
+            return concurrency
+        previous = stats
+    return None
+
+
+def _rewrite_signature(signature: str, app_name: str) -> str:
+    payload = json.loads(base64.b64decode(signature.removeprefix('external_agent/').encode()).decode())
+    payload['app_name'] = app_name
+    return 'external_agent/' + base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+def rewrite_for_stand_ins(records: Iterable[dict[str, Any]], app_name: str, token: str) -> list[dict[str, Any]]:
+    """
+    Point recorded traffic at the stand-ins: every app becomes `app_name`, and every token becomes `token`.
+    """
+    rewritten = []
+    for record in records:
+        record = json.loads(json.dumps(record))
+        body = record['body']
+        if 'agent_signature' in body:
+            body['agent_signature'] = _rewrite_signature(body['agent_signature'], app_name)
+        if record['endpoint'] == 'init_engagement':
+            body['auth_token'] = token
+            record['path'] = f'/hapra/v1/agents/{app_name}/init_engagement'
+        if record['endpoint'] == 'scheduler':
+            body['app_name'] = app_name
+        if record['endpoint'] == 'scheduler_batch':
+            for run in body['runs']:
+                run['app_name'] = app_name
+        rewritten.append(record)
+    return rewritten
+
+
+def _seed_stand_ins(records: list[dict[str, Any]], router, fake_platform, app_name: str, token: str):
+    """
+    Create the conversations and sessions that recorded messages and brainbeats refer to, as they were created by
+    engagements that happened before the recording.
+    """
+    sessions: dict[str, dict[str, Any]] = {}
+    for record in records:
+        body = record['body']
+        if record['endpoint'] == 'messages':
+            sessions[body['conversation']['conversation_id']] = body['conversation']
+        elif record['endpoint'] == 'scheduler':
+            sessions.setdefault(body['session_id'], None)
+        elif record['endpoint'] == 'scheduler_batch':
+            for run in body['runs']:
+                sessions.setdefault(run['session_id'], None)
+
+    async def _create_sessions():
+        for session_id, conversation in sessions.items():
+            model_ref = conversation['mdl_ref'] if conversation is not None else 'model|replay|scheduler'
+            if conversation is not None:
+                fake_platform.conversations[(model_ref, session_id)] = conversation
+            await router.local_session_client.create_session(app_name, session_id, {'token': token, 'model_ref': model_ref})
+    asyncio.run(_create_sessions())
+
+
+def replay_levels(
+        records: list[dict[str, Any]],
+        target: str,
+        levels: list[int],
+        rate: float | None = None,
+        on_report: Callable[[int, dict[str, dict[str, Any]]], None] | None = None,
+) -> list[tuple[int, dict[str, dict[str, Any]]]]:
+    """
+    Replay the records once at each concurrency level.
+    :param on_report: Called with each level's report as soon as it is ready.
+    :return: (concurrency, replay report) for each level.
+    """
+    reports = []
+    for concurrency in levels:
+        report = asyncio.run(replay(records, target, concurrency, rate))
+        if on_report is not None:
+            on_report(concurrency, report)
+        reports.append((concurrency, report))
+    return reports
+
+
+def replay_against_stand_ins(
+        records: list[dict[str, Any]],
+        levels: list[int],
+        rate: float | None = None,
+        model_latency: float = 0,
+        on_report: Callable[[int, dict[str, dict[str, Any]]], None] | None = None,
+) -> list[tuple[int, dict[str, dict[str, Any]]]]:
+    """
+    Replay the records at each concurrency level against a local router, with a stub model agent and the fake
+    Honu platform.
+    :param model_latency: Seconds each stub model turn takes.
+    """
+    # Only needed, and only imported, when replaying locally
+    from .testing import STUB_APP_NAME, FakeHonuPlatform, ServerThread, build_router_app, build_stub_app, free_port
+
+    fake_platform = FakeHonuPlatform()
+    with ServerThread(fake_platform.app) as platform_server:
+        token = FakeHonuPlatform.make_token(platform_server.url)
+        port = free_port()
+        app, router = build_router_app(
+            f'http://127.0.0.1:{port}',
+            {STUB_APP_NAME: build_stub_app(model_latency=model_latency)},
+        )
+        records = rewrite_for_stand_ins(records, STUB_APP_NAME, token)
+        _seed_stand_ins(records, router, fake_platform, STUB_APP_NAME, token)
+        with ServerThread(app, port) as router_server:
+            return replay_levels(records, router_server.url, levels, rate, on_report)
+
+
+def _print_report(concurrency: int, report: dict[str, dict[str, Any]]):
+    print(f'\nconcurrency {concurrency}')
+    print(f'{"endpoint":<18}{"requests":>9}{"errors":>8}{"rps":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}  status codes')
+    for endpoint, stats in report.items():
+        print(
+            f'{endpoint:<18}{stats["requests"]:>9}{stats["errors"]:>8}{stats["throughput_rps"]:>9.1f}'
+            f'{stats["p50_ms"]:>9.1f}{stats["p95_ms"]:>9.1f}{stats["p99_ms"]:>9.1f}  {stats.get("status_codes", "")}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded router traffic and report how the router copes.')
+    parser.add_argument('recording', help='JSON lines file written by TrafficRecorder.')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--target', help='Base URL of the router to replay against.')
+    target.add_argument('--stand-ins', action='store_true', help='Replay against a local router and fake Honu services.')
+    parser.add_argument('--concurrency', default='1,4,16', help='Comma separated concurrency levels to replay at.')
+    parser.add_argument('--rate', type=float, default=0, help='Requests started per second, 0 for as fast as possible.')
+    parser.add_argument('--endpoint', action='append', choices=ENDPOINTS, help='Only replay these endpoints.')
+    parser.add_argument('--model-latency', type=float, default=0, help='Seconds each stub model turn takes, with --stand-ins.')
+    parser.add_argument('--output', help='File the reports are written to as JSON.')
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    records = [r for r in load_recording(args.recording) if not args.endpoint or r['endpoint'] in args.endpoint]
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    if args.stand_ins:
+        reports = replay_against_stand_ins(records, levels, args.rate or None, args.model_latency, _print_report)
+    else:
+        reports = replay_levels(records, args.target, levels, args.rate or None, _print_report)
+
+    saturation = find_saturation(reports)
+    print(f'\nsaturated at concurrency {saturation}' if saturation is not None else '\ndid not saturate')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'levels': {str(c): r for c, r in reports}, 'saturated_at': saturation}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
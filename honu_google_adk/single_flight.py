@@ -0,0 +1,56 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+T = TypeVar('T')
+
+
+@dataclass
+class _Flight(Generic[T]):
+    task: asyncio.Task[T]
+    waiters: int = 0
+
+
+class SingleFlight(Generic[K, T]):
+    """
+    Makes concurrent calls with the same key share one execution, every caller getting its result or its error.
+    A caller being cancelled only cancels the shared execution once every caller waiting on it has been cancelled.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.deduplicated = 0
+        self._flights: dict[K, _Flight[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        :param fn: Called to start the execution if none is in flight for the key.
+        """
+        self.calls += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.deduplicated += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Nobody else wants the result
+                self._forget(key, flight)
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: K, flight: _Flight[T]):
+        # A newer flight may have taken the key after this one was cancelled
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,15 @@
+"""
+Local stand-ins for the services the package talks to, for benchmarks and tests that must run without a network.
+"""
+from .fake_mcp import build_fake_mcp_server
+from .fake_platform import FakeHonuPlatform
+from .servers import ServerThread, free_port
+from .stub_agent import (
+    STUB_APP_NAME,
+    StubAgentLoader,
+    StubLlm,
+    build_adk_router_app,
+    build_router_app,
+    build_stub_app,
+    write_stub_agents_dir,
+)
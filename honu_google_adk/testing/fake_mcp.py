@@ -0,0 +1,30 @@
+from fastmcp import FastMCP
+from mcp.types import ToolAnnotations
+
+
+def build_fake_mcp_server(boards: int = 20, cards_per_board: int = 50) -> FastMCP:
+    """
+    An MCP server with a few Trello-like tools: two reads, one of them returning a large payload, and a write.
+    Serve it over HTTP with `ServerThread(server.http_app())`, its tools are then at `<url>/mcp`.
+    """
+    server = FastMCP('fake_honu_mcp')
+    data = {
+        f'board_{b}': [{'id': f'card_{b}_{c}', 'name': f'Card {c}', 'description': 'x' * 200} for c in range(cards_per_board)]
+        for b in range(boards)
+    }
+
+    @server.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    def list_boards() -> dict:
+        return {'boards': [{'id': board_id, 'cards': len(cards)} for board_id, cards in data.items()]}
+
+    @server.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    def get_board(board_id: str) -> dict:
+        return {'id': board_id, 'cards': data.get(board_id, [])}
+
+    @server.tool
+    def add_card(board_id: str, name: str) -> dict:
+        card = {'id': f'card_{board_id}_{len(data.setdefault(board_id, []))}', 'name': name, 'description': ''}
+        data[board_id].append(card)
+        return card
+
+    return server
@@ -0,0 +1,112 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any
+
+import jwt
+from fastapi import FastAPI, HTTPException, Request, Response
+from starlette import status
+
+
+class FakeHonuPlatform:
+    """
+    In-memory stand-in for the Honu Conversation server and scheduling API, serving the endpoints the router and
+    plugin call. Both are served by the same app, so tokens made by `make_token` point the conversation and tasks
+    clients at it.
+    """
+
+    def __init__(self, latency: float = 0):
+        """
+        :param latency: Seconds each request takes, to stand in for the network and the real servers' work.
+        """
+        self.latency = latency
+        # By (model_ref, conversation_id)
+        self.conversations: dict[tuple[str, str], dict[str, Any]] = {}
+        self.messages: defaultdict[tuple[str, str], list[dict]] = defaultdict(list)
+        self.statuses: defaultdict[tuple[str, str], list[str | None]] = defaultdict(list)
+        # By (domain_id, model_id), then task id
+        self.tasks: defaultdict[tuple[str, str], dict[str, dict]] = defaultdict(dict)
+        self.app = self._build_app()
+
+    @staticmethod
+    def make_token(platform_url: str, org_id: str = 'org_benchmark', **claims) -> str:
+        """
+        A token for a platform served at `platform_url` (which must not use `localhost`, see _scheduling_url).
+        """
+        return jwt.encode({'url': platform_url, 'org_id': org_id, **claims}, 'fake_platform_secret_long_enough_for_hs256', algorithm='HS256')
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware('http')
+        async def simulate_latency(request: Request, call_next):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return await call_next(request)
+
+        @app.get('/')
+        async def root():
+            return {}
+
+        @app.post('/v1/conversations/{mdl_ref}', status_code=status.HTTP_201_CREATED)
+        async def create_conversation(mdl_ref: str, body: dict):
+            conversation = {
+                'mdl_ref': mdl_ref,
+                'conversation_id': uuid.uuid4().hex,
+                'metadata': {
+                    'name': body.get('name', ''),
+                    'created_by': 'agent',
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    'users': [],
+                    'agents': [],
+                },
+            }
+            self.conversations[(mdl_ref, conversation['conversation_id'])] = conversation
+            return conversation
+
+        @app.get('/v1/conversations/{mdl_ref}')
+        async def list_conversations(mdl_ref: str):
+            return [conv for (model_ref, _), conv in self.conversations.items() if model_ref == mdl_ref]
+
+        @app.get('/v1/conversations/{mdl_ref}/{conv_id}')
+        async def get_conversation(mdl_ref: str, conv_id: str):
+            conversation = self.conversations.get((mdl_ref, conv_id))
+            if conversation is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+            return conversation
+
+        @app.delete('/v1/conversations/{mdl_ref}/{conv_id}')
+        async def delete_conversation(mdl_ref: str, conv_id: str):
+            if self.conversations.pop((mdl_ref, conv_id), None) is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+        @app.patch('/v1/conversations/{mdl_ref}/{conv_id}')
+        async def set_status(mdl_ref: str, conv_id: str, body: dict):
+            self.statuses[(mdl_ref, conv_id)].append(body.get('status'))
+            return self.conversations.get((mdl_ref, conv_id), {})
+
+        @app.post('/v1/conversations/{mdl_ref}/{conv_id}/messages/', status_code=status.HTTP_201_CREATED)
+        async def send_message(mdl_ref: str, conv_id: str, body: dict):
+            message = {'message_id': uuid.uuid4().hex, 'payload': body}
+            self.messages[(mdl_ref, conv_id)].append(message)
+            return message
+
+        @app.post('/v1/domains/{domain_id}/models/{model_id}/scheduling', status_code=status.HTTP_201_CREATED)
+        async def create_task(domain_id: str, model_id: str, body: dict):
+            task = {'id': uuid.uuid4().hex, **body}
+            self.tasks[(domain_id, model_id)][task['id']] = task
+            return task
+
+        @app.get('/v1/domains/{domain_id}/models/{model_id}/scheduling')
+        async def list_tasks(domain_id: str, model_id: str, limit: int = 100, offset: int = 0):
+            return list(self.tasks[(domain_id, model_id)].values())[offset:offset + limit]
+
+        @app.delete('/v1/domains/{domain_id}/models/{model_id}/scheduling/{task_id}')
+        async def delete_task(domain_id: str, model_id: str, task_id: str):
+            if self.tasks[(domain_id, model_id)].pop(task_id, None) is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+        return app
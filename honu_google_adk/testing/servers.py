@@ -0,0 +1,53 @@
+import socket
+import threading
+import time
+
+import uvicorn
+
+
+def free_port() -> int:
+    """
+    A free port on 127.0.0.1.
+    Skips ports containing 8080, as the conversation client rewrites 8080 to 8008 when working out the chat URL.
+    """
+    while True:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        if '8080' not in str(port):
+            return port
+
+
+class ServerThread:
+    """
+    Serves an ASGI app with uvicorn on 127.0.0.1 from a background thread, with its own event loop.
+    Use as a context manager, or call `start` and `stop`.
+    """
+
+    def __init__(self, app, port: int | None = None):
+        self.port = port or free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=self.port, log_level='warning'))
+        self._thread = threading.Thread(target=self.server.run, name=f'server-{self.port}', daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def start(self, timeout: float = 10) -> 'ServerThread':
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f'Server on port {self.port} did not start')
+            time.sleep(0.01)
+        return self
+
+    def stop(self, timeout: float = 30):
+        self.server.should_exit = True
+        self._thread.join(timeout)
+
+    def __enter__(self) -> 'ServerThread':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
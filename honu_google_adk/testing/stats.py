@@ -0,0 +1,53 @@
+import math
+import statistics
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    The `q` (0 to 1) percentile of the values, by the nearest rank.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarise(latencies: list[float], errors: int, elapsed: float) -> dict[str, float]:
+    """
+    :param latencies: Seconds taken by each successful request.
+    :param errors: Number of failed requests.
+    :param elapsed: Seconds taken to make every request.
+    """
+    requests = len(latencies) + errors
+    return {
+        'requests': requests,
+        'errors': errors,
+        'error_rate': errors / requests if requests else 0.0,
+        'throughput_rps': requests / elapsed if elapsed else 0.0,
+        'mean_ms': 1000 * statistics.fmean(latencies) if latencies else 0.0,
+        'p50_ms': 1000 * percentile(latencies, 0.5),
+        'p95_ms': 1000 * percentile(latencies, 0.95),
+        'p99_ms': 1000 * percentile(latencies, 0.99),
+        'max_ms': 1000 * max(latencies, default=0.0),
+    }
+
+
+def compare(baseline: dict[str, dict[str, float]], current: dict[str, dict[str, float]], max_regression: float) -> list[str]:
+    """
+    Compare the results of each scenario against a baseline.
+    :param max_regression: Allowed relative increase in p50/p95 latency or decrease in throughput, e.g. 0.2 for 20%.
+    :return: A description of each regression beyond `max_regression`.
+    """
+    regressions = []
+    for scenario, result in current.items():
+        before = baseline.get(scenario)
+        if before is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if before[metric] and result[metric] > before[metric] * (1 + max_regression):
+                regressions.append(f'{scenario} {metric}: {before[metric]:.1f} -> {result[metric]:.1f}')
+        if before['throughput_rps'] and result['throughput_rps'] < before['throughput_rps'] * (1 - max_regression):
+            regressions.append(f'{scenario} throughput_rps: {before["throughput_rps"]:.1f} -> {result["throughput_rps"]:.1f}')
+        if result['error_rate'] > before['error_rate']:
+            regressions.append(f'{scenario} error_rate: {before["error_rate"]:.3f} -> {result["error_rate"]:.3f}')
+    return regressions
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import AsyncGenerator
+
+from fastapi import FastAPI
+from google.adk.agents import Agent, BaseAgent
+from google.adk.apps import App
+from google.adk.cli.fast_api import get_fast_api_app
+from google.adk.cli.utils.base_agent_loader import BaseAgentLoader
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from ..agent_router.honu_router import HonuAgentRouter
+from ..agent_router.in_process_client import InProcessSessionClient
+from ..agent_router.plugins import HonuConversationPlugin
+from ..main import HonuToolSet
+
+STUB_APP_NAME = 'stub_agent'
+
+
+class StubLlm(BaseLlm):
+    """
+    A model that answers with canned text, so the overhead of everything around the model can be measured.
+    A user message of the form `call <tool> <json arguments>` makes it call that tool before answering.
+    """
+    model: str = 'stub'
+    # Seconds each model turn takes
+    latency: float = 0
+    reply: str = 'Hello! I am a stub agent.\n\nI answer instantly so the rest of the stack can be measured.'
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        text = ''.join(part.text for part in last.parts or [] if part.text) if last is not None else ''
+        if last is not None and last.role == 'user' and text.startswith('call '):
+            _, name, *arguments = text.split(' ', 2)
+            function_call = types.FunctionCall(name=name, args=json.loads(arguments[0]) if arguments else {})
+            yield LlmResponse(content=types.Content(role='model', parts=[types.Part(function_call=function_call)]))
+            return
+
+        if stream:
+            for paragraph in self.reply.split('\n\n')[:-1]:
+                yield LlmResponse(content=types.Content(role='model', parts=[types.Part(text=paragraph + '\n\n')]), partial=True)
+        yield LlmResponse(content=types.Content(role='model', parts=[types.Part(text=self.reply)]))
+
+
+class StubAgentLoader(BaseAgentLoader):
+    """
+    Serves apps built in code, rather than loading them from an agents directory.
+    """
+
+    def __init__(self, apps: dict[str, App | BaseAgent]):
+        self.apps = apps
+
+    def load_agent(self, agent_name: str) -> App | BaseAgent:
+        return self.apps[agent_name]
+
+    def list_agents(self) -> list[str]:
+        return sorted(self.apps)
+
+
+def build_stub_app(name: str = STUB_APP_NAME, mcp_host: str | None = None, model_latency: float = 0) -> App:
+    """
+    An app whose agent uses StubLlm, with the conversation plugin, and the tools of `mcp_host` if given.
+    """
+    agent = Agent(
+        name=name,
+        model=StubLlm(latency=model_latency),
+        instruction='You are a stub agent.',
+        tools=[HonuToolSet(mcp_host)] if mcp_host else [],
+    )
+    return App(name=name, root_agent=agent, plugins=[HonuConversationPlugin('honu_conversation')])
+
+
+def build_router_app(hostname: str, apps: dict[str, App], **router_options) -> tuple[FastAPI, HonuAgentRouter]:
+    """
+    A FastAPI app serving the Honu router, running the apps in process with in-memory sessions.
+    :param hostname: Public URL the app will be served on.
+    :param router_options: Passed on to HonuAgentRouter.
+    """
+    session_client = InProcessSessionClient(StubAgentLoader(apps), InMemorySessionService())
+    router = HonuAgentRouter(hostname, 0, session_client=session_client, **router_options)
+    app = FastAPI()
+    app.include_router(router.agent_router)
+    return app, router
+
+
+def write_stub_agents_dir(agents_dir: str | Path, mcp_host: str | None = None, model_latency: float = 0) -> Path:
+    """
+    Write an agents directory holding the stub app, for serving it with `get_fast_api_app`.
+    The ADK imports the app once per process, so later calls with other options get the first app.
+    :return: The agents directory.
+    """
+    package = Path(agents_dir) / STUB_APP_NAME
+    package.mkdir(parents=True, exist_ok=True)
+    (package / '__init__.py').write_text(
+        'from honu_google_adk.testing import build_stub_app\n\n'
+        f'app = build_stub_app(mcp_host={mcp_host!r}, model_latency={model_latency!r})\n'
+    )
+    return Path(agents_dir)
+
+
+def build_adk_router_app(hostname: str, port: int, agents_dir: str | Path, **router_options) -> tuple[FastAPI, HonuAgentRouter]:
+    """
+    The ADK's own FastAPI app with the Honu router added, as it is deployed. The router reaches the apps through the
+    ADK's HTTP API with LocalSessionClient. Sessions and artifacts are kept in memory.
+    :param hostname: Public URL the app will be served on.
+    :param port: Port the app will be served on.
+    :param agents_dir: Directory of the apps, see `write_stub_agents_dir`.
+    :param router_options: Passed on to HonuAgentRouter.
+    """
+    app = get_fast_api_app(
+        agents_dir=str(agents_dir),
+        session_service_uri='memory://',
+        artifact_service_uri='memory://',
+        web=False,
+        port=port,
+    )
+    router = HonuAgentRouter(hostname, port, **router_options)
+    app.include_router(router.agent_router)
+    return app, router
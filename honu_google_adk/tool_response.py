@@ -0,0 +1,159 @@
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from google.adk.tools import ToolContext
+from google.genai import types
+from mcp.types import ContentBlock, EmbeddedResource, TextContent, TextResourceContents
+
+PARSE_ERROR_MSG = 'Could not unwrap response into JSON. Plaintext response has been provided instead.'
+# Where a summarised response carries its full payload until save_full_response saves it for the caller
+FULL_PAYLOAD_KEY = '_full_payload'
+
+
+@dataclass(frozen=True)
+class ResponseLimits:
+    # Responses with more characters than this are summarised for the model, the full response is saved as an artifact
+    max_response_chars: int = 20_000
+    # Responses with more characters than this are parsed in a worker thread so they don't hold up the event loop
+    parse_in_thread_chars: int = 100_000
+    # How much of an oversize response goes into the summary
+    preview_items: int = 10
+    preview_chars: int = 500
+
+
+def _content_text(item: ContentBlock) -> str | None:
+    if isinstance(item, TextContent):
+        return item.text
+    if isinstance(item, EmbeddedResource) and isinstance(item.resource, TextResourceContents):
+        return item.resource.text
+    return None
+
+
+def _describe_content(item: ContentBlock) -> dict[str, Any]:
+    # Images, audio and binary resources aren't useful to the model inline, describe them instead
+    description = {'type': item.type}
+    resource = getattr(item, 'resource', item)
+    for field in ('mimeType', 'uri', 'name'):
+        value = getattr(item, field, None) or getattr(resource, field, None)
+        if value is not None:
+            description[field] = str(value)
+    return description
+
+
+def _clip(value: Any, limits: ResponseLimits) -> Any:
+    dumped = value if isinstance(value, str) else json.dumps(value, default=str)
+    if len(dumped) <= limits.preview_chars:
+        return value
+    return dumped[:limits.preview_chars] + '...'
+
+
+def _summarise(value: Any, limits: ResponseLimits, depth: int = 0) -> Any:
+    """
+    A compact projection of a value: the size of lists and objects, and their first few items.
+    """
+    if depth >= 2:
+        return _clip(value, limits)
+    if isinstance(value, list):
+        return {
+            'type': 'list',
+            'length': len(value),
+            'first_items': [_summarise(item, limits, depth + 1) for item in value[:limits.preview_items]],
+        }
+    if isinstance(value, dict):
+        keys = list(value)
+        return {
+            'type': 'object',
+            'keys': keys[:10 * limits.preview_items],
+            'values': {key: _summarise(value[key], limits, depth + 1) for key in keys[:limits.preview_items]},
+        }
+    return _clip(value, limits)
+
+
+def _build_response(content: Sequence[ContentBlock], limits: ResponseLimits) -> tuple[dict[str, Any], str | None]:
+    """
+    :return: The response for the model, and the full payload if the response had to be summarised.
+    """
+    response: dict[str, Any] = {'success': True}
+    if not content:
+        return response, None
+
+    texts = [_content_text(item) for item in content]
+    artefacts = []
+    unparsed = []
+    for item, text in zip(content, texts):
+        if text is None:
+            artefacts.append(_describe_content(item))
+            continue
+        try:
+            artefacts.append(json.loads(text))
+        except ValueError:
+            artefacts.append(text)
+            unparsed.append(text)
+
+    if len(content) == 1 and unparsed:
+        response['text'] = unparsed[0]
+        response['error_msg'] = PARSE_ERROR_MSG
+    else:
+        # A single item is unwrapped, so single item responses look the same as they always have
+        response['artefacts'] = artefacts[0] if len(artefacts) == 1 else artefacts
+
+    size = sum(len(text) for text in texts if text is not None)
+    if size <= limits.max_response_chars:
+        return response, None
+
+    full_payload = texts[0] if len(content) == 1 else json.dumps(artefacts, default=str)
+    if 'text' in response:
+        response['text'] = _clip(response['text'], limits)
+    else:
+        response['artefacts'] = _summarise(response['artefacts'], limits)
+    response['truncated'] = True
+    response['full_response_chars'] = size
+    return response, full_payload
+
+
+async def build_tool_response(content: Sequence[ContentBlock], limits: ResponseLimits) -> dict[str, Any]:
+    """
+    Turn the content of an MCP tool result into the response given to the model.
+    Every content item is included, and responses over the size limit are summarised, carrying the full payload under
+    FULL_PAYLOAD_KEY. Pass the response to `save_full_response` before giving it to the model.
+    """
+    size = sum(len(text) for text in map(_content_text, content) if text is not None)
+    if size > limits.parse_in_thread_chars:
+        response, full_payload = await asyncio.to_thread(_build_response, content, limits)
+    else:
+        response, full_payload = _build_response(content, limits)
+    if full_payload is not None:
+        response[FULL_PAYLOAD_KEY] = full_payload
+    return response
+
+
+async def save_full_response(response: dict[str, Any], tool_context: ToolContext, tool_name: str) -> dict[str, Any]:
+    """
+    Save the full payload of a summarised response as an artifact of the caller's session, under the response's
+    `full_response_ref`. Without an artifact service the full payload is dropped.
+    Each caller of a shared response saves it, as artifacts belong to a session.
+    :param response: From `build_tool_response`, and changed in place.
+    """
+    full_payload = response.pop(FULL_PAYLOAD_KEY, None)
+    if full_payload is None:
+        return response
+
+    ref = f'{tool_name}-{uuid.uuid4().hex}.json'
+    try:
+        await tool_context.save_artifact(
+            ref,
+            types.Part.from_bytes(
+                data=full_payload.encode(),
+                mime_type='text/plain' if 'text' in response else 'application/json',
+            ),
+        )
+    except ValueError:
+        # The agent has no artifact service
+        response['note'] = 'The response was too large so has been summarised. The full response is not available.'
+        return response
+    response['full_response_ref'] = ref
+    response['note'] = f'The response was too large so has been summarised. It is saved in full as the artifact {ref}.'
+    return response
@@ -0,0 +1,91 @@
+import json
+from typing import Any, Awaitable, Callable
+
+from .single_flight import SingleFlight
+from .ttl_cache import TTLCache
+
+# (model_ref, tool_name, canonical JSON of the arguments)
+ToolResultKey = tuple[str | None, str, str]
+
+
+class ToolResultCache:
+    """
+    Caches the responses of read-only MCP tools, so an agent asking for the same data several times in a turn (or
+    across nearby brainbeats) only goes to the MCP host once.
+    Entries are scoped to a model, and everything cached for a model is dropped when one of its non-read-only tools
+    is called as that may have changed what the read-only ones return.
+    Identical calls made while one is already in flight wait for its response rather than going to the MCP host too.
+    """
+    _instance = None
+
+    def __init__(self, maxsize: int = 1_000, ttl: float = 60):
+        """
+        :param maxsize: Maximum number of responses kept. The least recently used one is dropped to make room.
+        :param ttl: Seconds a response is served from the cache.
+        """
+        self._cache: TTLCache[ToolResultKey, dict[str, Any]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: SingleFlight[ToolResultKey, dict[str, Any]] = SingleFlight()
+
+    @classmethod
+    def get_instance(cls) -> 'ToolResultCache':
+        """
+        The cache shared by every HonuToolSet that isn't given its own.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def key(model_ref: str | None, tool_name: str, args: dict[str, Any]) -> ToolResultKey:
+        # The same arguments in a different order, or with different spacing, make the same key
+        return model_ref, tool_name, json.dumps(args, sort_keys=True, separators=(',', ':'), default=str)
+
+    def get(self, key: ToolResultKey) -> dict[str, Any] | None:
+        response = self._cache.get(key)
+        # A copy so the caller can't change what is cached
+        return dict(response) if response is not None else None
+
+    def set(self, key: ToolResultKey, response: dict[str, Any]):
+        self._cache.set(key, dict(response))
+
+    async def get_or_load(self, key: ToolResultKey, load: Callable[[], Awaitable[dict[str, Any]]]) -> dict[str, Any]:
+        """
+        Get the cached response, or load it sharing any identical load already in flight.
+        :param load: Calls the tool, and is responsible for caching the response if it should be.
+        """
+        response = self.get(key)
+        if response is not None:
+            return response
+        return dict(await self._in_flight.do(key, load))
+
+    def invalidate_model(self, model_ref: str | None) -> int:
+        """
+        Drop every response cached for the model.
+        :return: The number of responses dropped.
+        """
+        return self._cache.invalidate(lambda key: key[0] == model_ref)
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self._cache.hit_rate
+
+    @property
+    def deduplicated(self) -> int:
+        """
+        Number of calls that shared a response already in flight.
+        """
+        return self._in_flight.deduplicated
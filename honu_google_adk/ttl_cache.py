@@ -0,0 +1,82 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A size bounded LRU cache whose entries also expire after a time to live.
+    Not thread safe, it is meant to be used from a single event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        :param maxsize: Maximum number of entries. The least recently used entry is dropped to make room.
+        :param ttl: Default number of seconds an entry is kept for.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _MISSING, record=False) is not _MISSING
+
+    def get(self, key: K, default=None, record: bool = True):
+        """
+        :param record: Whether the lookup counts towards the hit/miss counters.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            if record:
+                self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        if record:
+            self.hits += 1
+        return entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None):
+        """
+        :param ttl: Overrides the cache's default time to live for this entry.
+        """
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K, default=None):
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def invalidate(self, predicate: Callable[[K], bool]) -> int:
+        """
+        Remove every entry whose key matches the predicate.
+        :return: The number of entries removed.
+        """
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -0,0 +1,31 @@
+from honu_google_adk.agent_router.brainbeat import brainbeat_offset, jitter_cron
+
+
+def test_offsets_are_stable_and_spread_across_the_window():
+    offsets = [brainbeat_offset(f'session-{i}', 60) for i in range(500)]
+    assert offsets == [brainbeat_offset(f'session-{i}', 60) for i in range(500)]
+    assert all(0 <= offset < 60 for offset in offsets)
+    assert len(set(offsets)) > 50
+    assert brainbeat_offset('session-0', 0) == 0
+
+
+def test_jitter_cron_shifts_daily_and_hourly_schedules():
+    offset = brainbeat_offset('session', 120)
+    minutes = 9 * 60 + offset
+    assert jitter_cron('0 9 * * *', 'session', 120) == f'{minutes % 60} {minutes // 60} * * *'
+    assert jitter_cron('0 9 * * *', 'session', 0) == '0 9 * * *'
+    # Every hour of the schedule gets the same offset
+    shifted = jitter_cron('0 9,17 * * *', 'session', 120).split()
+    assert shifted[1] == f'{minutes // 60},{minutes // 60 + 8}'
+    assert 0 <= int(jitter_cron('0 * * * *', 'session', 120).split()[0]) < 60
+
+
+def test_jitter_cron_wraps_past_midnight_only_on_daily_schedules():
+    keys = [f'session-{i}' for i in range(50)]
+    assert any(jitter_cron('30 23 * * *', key, 120).split()[1] == '0' for key in keys)
+    assert all(jitter_cron('30 23 * * 1-5', key, 120).split()[1] == '23' for key in keys)
+
+
+def test_jitter_cron_leaves_schedules_it_cannot_shift():
+    assert jitter_cron('*/15 9 * * *', 'session', 60) == '*/15 9 * * *'
+    assert jitter_cron('0 9-17 * * *', 'session', 60) == '0 9-17 * * *'
@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime, timezone
+
+from honu_google_adk.agent_router.chat_status import ChatStatusCoalescer
+from honu_google_adk.agent_router.schema import Conversation, ConversationMetadata
+
+
+class FakeConversationClient:
+    def __init__(self):
+        self.statuses = []
+
+    async def set_chat_status(self, token, conversation, chat_status=None):
+        await asyncio.sleep(0)
+        self.statuses.append(chat_status)
+
+
+def _conversation() -> Conversation:
+    return Conversation(
+        mdl_ref='model|d|m',
+        conversation_id='conv',
+        metadata=ConversationMetadata(name='', created_by='', created_at=datetime.now(timezone.utc), users=[], agents=[]),
+    )
+
+
+def test_bursts_of_statuses_are_coalesced():
+    client = FakeConversationClient()
+
+    async def scenario():
+        coalescer = ChatStatusCoalescer(client, window=0.01)
+        conv = _conversation()
+        for chat_status in ('thinking', 'running tool: a', 'running tool: b', 'thinking'):
+            coalescer.update('token', conv, chat_status)
+        await coalescer.flush(conv)
+        # Same as the last status sent so it is skipped
+        coalescer.update('token', conv, 'thinking')
+        await coalescer.flush(conv)
+        coalescer.update('token', conv, None)
+        await coalescer.flush(conv)
+
+    asyncio.run(scenario())
+    assert client.statuses == ['thinking', None]
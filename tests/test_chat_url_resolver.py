@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from honu_google_adk.agent_router.chat_url_resolver import ChatURLResolver
+
+
+class FakeChatServers:
+
+    def __init__(self, up: set[str]):
+        self.up = up
+        self.probes = []
+
+    async def probe(self, chat_url: str) -> bool:
+        self.probes.append(chat_url)
+        await asyncio.sleep(0.01)
+        return chat_url in self.up
+
+
+def _candidates(url_claim: str) -> list[str]:
+    return [url_claim, f'{url_claim}-fallback']
+
+
+def test_tenants_resolve_independently_and_concurrent_lookups_share_a_probe():
+    servers = FakeChatServers(up={'http://a', 'http://b-fallback'})
+
+    async def scenario():
+        resolver = ChatURLResolver(_candidates, servers.probe)
+        resolved = await asyncio.gather(*[resolver.resolve(claim) for claim in ('http://a', 'http://b') * 5])
+        return resolved, await resolver.resolve('http://a')
+
+    resolved, cached = asyncio.run(scenario())
+    assert resolved == ['http://a', 'http://b-fallback'] * 5
+    assert cached == 'http://a'
+    assert sorted(servers.probes) == ['http://a', 'http://b', 'http://b-fallback']
+
+
+def test_unreachable_tenant_fails_fast_until_negative_ttl_expires():
+    servers = FakeChatServers(up=set())
+
+    async def scenario():
+        resolver = ChatURLResolver(_candidates, servers.probe, negative_ttl=0.05)
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await resolver.resolve('http://down')
+        assert len(servers.probes) == 2
+
+        await asyncio.sleep(0.05)
+        servers.up.add('http://down')
+        return await resolver.resolve('http://down')
+
+    assert asyncio.run(scenario()) == 'http://down'
+
+
+def test_stale_url_is_served_while_it_is_rechecked_in_the_background():
+    servers = FakeChatServers(up={'http://a'})
+
+    async def scenario():
+        resolver = ChatURLResolver(_candidates, servers.probe, refresh_interval=0)
+        await resolver.resolve('http://a')
+
+        # A failed recheck keeps the URL that used to work
+        servers.up.clear()
+        assert await resolver.resolve('http://a') == 'http://a'
+        assert len(servers.probes) == 1
+        await asyncio.sleep(0.05)
+        assert await resolver.resolve('http://a') == 'http://a'
+
+    asyncio.run(scenario())
+    assert servers.probes[:3] == ['http://a', 'http://a', 'http://a-fallback']
@@ -0,0 +1,47 @@
+import asyncio
+from types import SimpleNamespace
+
+from google.adk.events import Event
+from google.genai.types import Content, Part
+
+from honu_google_adk.agent_router.outbox import ConversationOutbox
+from honu_google_adk.agent_router.plugins import HonuConversationPlugin
+from tests.test_chat_status import _conversation
+from tests.test_outbox import FlakyConversationClient
+
+
+def _text_event(text: str, partial: bool) -> Event:
+    return Event(
+        invocation_id='invocation',
+        author='agent',
+        partial=partial,
+        content=Content(role='model', parts=[Part(text=text)]),
+    )
+
+
+def test_streamed_responses_are_forwarded_by_paragraph(monkeypatch):
+    client = FlakyConversationClient(failures=0)
+    conv = _conversation()
+
+    async def scenario():
+        plugin = HonuConversationPlugin('honu')
+        plugin.outbox = ConversationOutbox(client)
+
+        async def _get_conv(token, model_ref, session_id):
+            return conv
+        monkeypatch.setattr(plugin, '_get_conv_for_session_id', _get_conv)
+
+        invocation_context = SimpleNamespace(
+            session=SimpleNamespace(id='conv', state={'token': 'token', 'model_ref': conv.mdl_ref}),
+        )
+        for event in (
+            _text_event('Para one.\n\nPara t', partial=True),
+            _text_event('wo.', partial=True),
+            _text_event('Para one.\n\nPara two.', partial=False),
+        ):
+            await plugin.on_event_callback(invocation_context=invocation_context, event=event)
+            await asyncio.sleep(0.01)
+        await plugin.outbox.flush(conv)
+
+    asyncio.run(scenario())
+    assert client.sent == ['Para one.', 'Para two.']
@@ -1,6 +1,9 @@
+import asyncio
+
+import httpx
 import jwt
 
-from honu_google_adk.agent_router.conversation_utils import ConversationClient
+from honu_google_adk.agent_router.conversation_utils import AsyncConversationClient, ConversationClient
 
 
 def test__get_char_url(monkeypatch):
@@ -21,3 +24,96 @@ def test__get_char_url(monkeypatch):
     chat_url = cc._get_chat_url(token)
     assert chat_url == "http://localhost:8008"
 
+
+
+def test_async_client_shares_one_pool_across_tokens(monkeypatch):
+    monkeypatch.setattr(AsyncConversationClient, '_instance', None)
+    seen_auth = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == '/':
+            return httpx.Response(200)
+        seen_auth.append(request.headers['Authorization'])
+        return httpx.Response(204)
+
+    async def scenario():
+        cc = AsyncConversationClient.get_instance()
+        cc._clients['http://chat.test'] = httpx.AsyncClient(
+            base_url='http://chat.test',
+            transport=httpx.MockTransport(handler),
+        )
+        for tenant in ('a', 'b'):
+            token = jwt.encode({'url': 'http://chat.test', 'org_id': tenant}, 'some_secret_which_is_long_enough_for_hs256', algorithm='HS256')
+            await cc.delete_conversation(token, f'model|{tenant}|x', 'conv')
+        clients = list(cc._clients)
+        await cc.aclose()
+        return clients
+
+    assert asyncio.run(scenario()) == ['http://chat.test']
+    assert len(set(seen_auth)) == 2
+
+
+def test_conversation_lookup_is_cached_until_deleted(monkeypatch):
+    monkeypatch.setattr(AsyncConversationClient, '_instance', None)
+    requests = []
+    conversation = {
+        'mdl_ref': 'model|d|m',
+        'conversation_id': 'conv',
+        'metadata': {'name': 'n', 'created_by': 'u', 'created_at': '2025-01-01T00:00:00Z', 'users': [], 'agents': []},
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == '/':
+            return httpx.Response(200)
+        requests.append((request.method, request.url.path))
+        if request.method == 'GET':
+            return httpx.Response(200, json=conversation)
+        return httpx.Response(204)
+
+    async def scenario():
+        cc = AsyncConversationClient.get_instance()
+        cc._clients['http://chat.test'] = httpx.AsyncClient(
+            base_url='http://chat.test',
+            transport=httpx.MockTransport(handler),
+        )
+        token = jwt.encode({'url': 'http://chat.test'}, 'some_secret_which_is_long_enough_for_hs256', algorithm='HS256')
+        for _ in range(3):
+            assert (await cc.get_conversation(token, 'model|d|m', 'conv')).conversation_id == 'conv'
+        await cc.delete_conversation(token, 'model|d|m', 'conv')
+        await cc.get_conversation(token, 'model|d|m', 'conv')
+        await cc.aclose()
+
+    asyncio.run(scenario())
+    assert requests == [
+        ('GET', '/v1/conversations/model|d|m/conv'),
+        ('DELETE', '/v1/conversations/model|d|m/conv'),
+        ('GET', '/v1/conversations/model|d|m/conv'),
+    ]
+
+
+def test_conversations_that_could_not_be_fetched_are_not_looked_up_again_for_a_while(monkeypatch):
+    monkeypatch.setattr(AsyncConversationClient, '_instance', None)
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == '/':
+            return httpx.Response(200)
+        requests.append((request.method, request.url.path))
+        return httpx.Response(404)
+
+    async def scenario():
+        cc = AsyncConversationClient.get_instance()
+        cc._clients['http://chat.test'] = httpx.AsyncClient(
+            base_url='http://chat.test',
+            transport=httpx.MockTransport(handler),
+        )
+        token = jwt.encode({'url': 'http://chat.test'}, 'some_secret_which_is_long_enough_for_hs256', algorithm='HS256')
+        found = [await cc.get_conversation(token, 'model|d|m', 'conv') for _ in range(3)]
+        # Until they expire
+        cc._missing_conversations.clear()
+        found.append(await cc.get_conversation(token, 'model|d|m', 'conv'))
+        await cc.aclose()
+        return found
+
+    assert asyncio.run(scenario()) == [None] * 4
+    assert requests == [('GET', '/v1/conversations/model|d|m/conv')] * 2
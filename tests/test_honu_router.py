@@ -0,0 +1,380 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from honu_google_adk.agent_router import honu_router
+from honu_google_adk.agent_router.honu_router import HonuAgentRouter
+from honu_google_adk.agent_router.scheduler_dedup import SchedulerDeliveryLog
+from honu_google_adk.agent_router.session_index import ModelSessionIndex
+from honu_google_adk.agent_router.schema import Conversation
+from honu_google_adk.agent_router.tasks_utils import AsyncModelTasksAPIClient
+from honu_google_adk.testing import FakeHonuPlatform
+
+
+def _signature(app_name: str = 'agent', model_ref: str = 'model|d|m') -> str:
+    payload = {'agent_url': 'http://agent.test', 'app_name': app_name, 'model_ref': model_ref}
+    return 'external_agent/' + base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+def _message_notification(text: str, conversation_id: str = 'conv') -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        'agent_signature': _signature(),
+        'conversation': {
+            'mdl_ref': 'model|d|m',
+            'conversation_id': conversation_id,
+            'metadata': {'name': 'agent', 'created_by': 'user', 'created_at': now, 'users': [], 'agents': []},
+        },
+        'message': {'message_id': 'm', 'author_id': 'user', 'timestamp': now, 'payload': {'body': text}},
+    }
+
+
+class FakeSessionClient:
+    def __init__(self, run_delay: float = 0):
+        self.run_delay = run_delay
+        self.runs = []
+
+    async def run(self, request):
+        await asyncio.sleep(self.run_delay)
+        self.runs.append((request.session_id, '\n'.join(part.text for part in request.new_message.parts)))
+
+    async def close(self):
+        ...
+
+
+def _client(router: HonuAgentRouter) -> TestClient:
+    app = FastAPI()
+    app.include_router(router.agent_router)
+    return TestClient(app)
+
+
+def test_async_messages_are_accepted_then_run():
+    router = HonuAgentRouter('http://agent.test', 7999, async_messages=True, max_concurrent_runs=1, max_queued_runs=1)
+    router.local_session_client = FakeSessionClient(run_delay=0.2)
+
+    with _client(router) as client:
+        first = client.post('/hapra/v1/messages', json=_message_notification('hi', 'conv-1'))
+        second = client.post('/hapra/v1/messages', json=_message_notification('there', 'conv-2'))
+        third = client.post('/hapra/v1/messages', json=_message_notification('again', 'conv-3'))
+
+    assert (first.status_code, second.status_code, third.status_code) == (202, 202, 503)
+    # Shutting the app down lets the queued runs finish
+    assert router.local_session_client.runs == [('conv-1', 'hi'), ('conv-2', 'there')]
+
+
+def test_disengage_cleans_up_concurrently_and_reports_failures(monkeypatch):
+    deleted_tasks = []
+
+    class FakeTasksClient:
+        def __init__(self, token, model_ref):
+            self.model_ref = model_ref
+
+        async def delete_all_my_tasks(self):
+            deleted_tasks.append(self.model_ref)
+            return {'task': True}
+
+        @classmethod
+        async def aclose_all(cls):
+            ...
+
+    class FakeConversationClient:
+        async def delete_conversation(self, token, model_ref, conv_id):
+            return conv_id != 'conv-2'
+
+        async def aclose(self):
+            ...
+
+    class SessionsClient(FakeSessionClient):
+        async def get_sessions_for_model_ref(self, app_name, model_ref):
+            return [('token', f'conv-{i}') for i in range(3)]
+
+        async def delete_session(self, app_name, session_id):
+            await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(honu_router, 'AsyncModelTasksAPIClient', FakeTasksClient)
+    monkeypatch.setattr(honu_router.AsyncConversationClient, 'get_instance', lambda: FakeConversationClient())
+    router = HonuAgentRouter('http://agent.test', 7999, session_client=SessionsClient())
+
+    with _client(router) as client:
+        response = client.post('/hapra/v1/agents/agent/disengage', json={'mdl_ref': 'model|d|m', 'agent_signature': _signature()})
+
+    assert response.status_code == 200
+    assert deleted_tasks == ['model|d|m']
+    failed = [(r['resource'], r['resource_id']) for r in response.json()['results'] if not r['success']]
+    assert failed == [('conversation', 'conv-2')]
+    assert len(response.json()['results']) == 7
+
+
+def test_metrics_endpoint_reports_request_latency_and_queue_depth():
+    router = HonuAgentRouter('http://agent.test', 7999)
+    router.local_session_client = FakeSessionClient()
+
+    with _client(router) as client:
+        client.post('/hapra/v1/messages', json=_message_notification('hi'))
+        response = client.get('/hapra/v1/metrics')
+
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert 'honu_http_request_duration_seconds_count{method="POST",outcome="ok",route="/hapra/v1/messages"}' in response.text
+    assert 'honu_run_queue_queued 0' in response.text
+    assert '# TYPE honu_tool_result_cache_hits_total counter' in response.text
+
+
+def test_scheduler_batch_runs_under_the_concurrency_limit():
+    running = 0
+    most_running = 0
+
+    class LimitedSessionClient(FakeSessionClient):
+        async def run(self, request):
+            nonlocal running, most_running
+            if request.session_id == 'missing':
+                raise ValueError('Session not found')
+            running += 1
+            most_running = max(most_running, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            self.runs.append(request.session_id)
+
+    router = HonuAgentRouter('http://agent.test', 7999, max_concurrent_scheduled_runs=2)
+    router.local_session_client = LimitedSessionClient()
+    runs = [{'app_name': 'agent', 'session_id': session_id, 'message': 'Brainbeat'} for session_id in ['a', 'b', 'c', 'd', 'missing']]
+
+    with _client(router) as client:
+        response = client.post('/hapra/v1/scheduler/batch', json={'runs': runs})
+
+    assert response.status_code == 200
+    assert [(r['session_id'], r['success']) for r in response.json()['results']] == [
+        ('a', True), ('b', True), ('c', True), ('d', True), ('missing', False),
+    ]
+    assert sorted(router.local_session_client.runs) == ['a', 'b', 'c', 'd']
+    assert most_running == 2
+
+
+def test_repeated_scheduler_deliveries_run_once():
+    class FlakySessionClient(FakeSessionClient):
+        fail = True
+
+        async def run(self, request):
+            if request.session_id == 'flaky' and self.fail:
+                self.fail = False
+                raise ValueError('ADK app unavailable')
+            await super().run(request)
+
+    router = HonuAgentRouter('http://agent.test', 7999, scheduler_deliveries=SchedulerDeliveryLog())
+    router.local_session_client = FlakySessionClient()
+
+    def _payload(session_id: str, **kwargs) -> dict:
+        return {'app_name': 'agent', 'session_id': session_id, 'message': 'Brainbeat', **kwargs}
+
+    with _client(router) as client:
+        responses = [
+            client.post('/hapra/v1/scheduler', json=_payload('a', delivery_id='d1')),
+            client.post('/hapra/v1/scheduler', json=_payload('a', delivery_id='d1')),
+            client.post('/hapra/v1/scheduler', json=_payload('b'), headers={'Idempotency-Key': 'd2'}),
+            client.post('/hapra/v1/scheduler', json=_payload('b'), headers={'Idempotency-Key': 'd2'}),
+            # Without an id, repeats within the schedule window are recognised
+            client.post('/hapra/v1/scheduler', json=_payload('c')),
+            client.post('/hapra/v1/scheduler/batch', json={'runs': [_payload('c'), _payload('d')]}),
+            # A failed run is run again when retried
+            client.post('/hapra/v1/scheduler', json=_payload('flaky', delivery_id='d3')),
+            client.post('/hapra/v1/scheduler', json=_payload('flaky', delivery_id='d3')),
+        ]
+
+    assert [r.json() for r in responses[:5]] == ['success'] * 5
+    assert responses[5].json()['results'][0]['success']
+    assert responses[6].json() != 'success' and responses[7].json() == 'success'
+    assert [session_id for session_id, _ in router.local_session_client.runs] == ['a', 'b', 'c', 'd', 'flaky']
+    assert router.scheduler_deliveries.duplicates == 3
+
+
+def test_init_engagement_responds_before_the_intro_and_brainbeat_are_set_up(monkeypatch):
+    created_tasks = []
+
+    class FakeTasksClient:
+        def __init__(self, token, model_ref):
+            ...
+
+        async def create_task(self, payload, name, description, cron_string, url):
+            await asyncio.sleep(0.1)
+            created_tasks.append(cron_string)
+            raise ValueError('Scheduling API unavailable')
+
+        @classmethod
+        async def aclose_all(cls):
+            ...
+
+    class FakeConversationClient:
+        async def create_conversation(self, token, model_ref, name):
+            return Conversation.model_validate(_message_notification('')['conversation'])
+
+        async def aclose(self):
+            ...
+
+    class SessionsClient(FakeSessionClient):
+        async def create_session(self, app_name, session_id, state):
+            ...
+
+    monkeypatch.setattr(honu_router, 'AsyncModelTasksAPIClient', FakeTasksClient)
+    monkeypatch.setattr(honu_router.AsyncConversationClient, 'get_instance', lambda: FakeConversationClient())
+    router = HonuAgentRouter('http://agent.test', 7999, agents_with_brainbeats={'agent': '0 9 * * *'}, session_client=SessionsClient(run_delay=0.2))
+
+    with _client(router) as client:
+        engaged = client.post(
+            '/hapra/v1/agents/agent/init_engagement',
+            json={'mdl_ref': 'model|d|m', 'auth_token': 'token', 'agent_signature': _signature()},
+        )
+        in_progress = client.get('/hapra/v1/agents/agent/engagements/conv').json()
+        missing = client.get('/hapra/v1/agents/agent/engagements/other')
+
+    assert engaged.status_code == 201 and engaged.json()['session_id'] == 'conv'
+    assert router.local_session_client.runs == [('conv', honu_router.INTRO_MESSAGE)]
+    assert in_progress['intro']['status'] in ('pending', 'running')
+    assert missing.status_code == 404
+    # Both steps ran alongside each other, and the failed one is reported without failing the other
+    engagement = router.engagements.get(('agent', 'conv'))
+    assert engagement.intro.status == 'succeeded'
+    assert engagement.brainbeat.status == 'failed' and engagement.brainbeat.error == 'Scheduling API unavailable'
+    assert created_tasks == ['0 9 * * *']
+
+
+def test_messages_sent_during_a_turn_are_answered_together():
+    router = HonuAgentRouter('http://agent.test', 7999, async_messages=True)
+    router.local_session_client = FakeSessionClient(run_delay=0.2)
+
+    with _client(router) as client:
+        responses = [client.post('/hapra/v1/messages', json=_message_notification(text)) for text in ('hi', 'there', 'again')]
+
+    assert [response.status_code for response in responses] == [202] * 3
+    runs = router.local_session_client.runs
+    # However the first turn raced the later messages, each is answered exactly once, in order, in fewer turns
+    assert '\n'.join(text for _, text in runs) == 'hi\nthere\nagain'
+    assert len(runs) < 3
+
+
+def test_intro_and_scheduled_runs_take_turns_with_messages(monkeypatch):
+    class FakeConversationClient:
+        async def create_conversation(self, token, model_ref, name):
+            return Conversation.model_validate(_message_notification('')['conversation'])
+
+        async def aclose(self):
+            ...
+
+    class TurnTrackingClient(FakeSessionClient):
+        running = 0
+        overlapped = False
+
+        async def create_session(self, app_name, session_id, state):
+            ...
+
+        async def run(self, request):
+            self.overlapped = self.overlapped or self.running > 0
+            self.running += 1
+            try:
+                await super().run(request)
+            finally:
+                self.running -= 1
+
+    monkeypatch.setattr(honu_router.AsyncConversationClient, 'get_instance', lambda: FakeConversationClient())
+    router = HonuAgentRouter('http://agent.test', 7999, async_messages=True, session_client=TurnTrackingClient(run_delay=0.2))
+
+    with _client(router) as client:
+        engaged = client.post(
+            '/hapra/v1/agents/agent/init_engagement',
+            json={'mdl_ref': 'model|d|m', 'auth_token': 'token', 'agent_signature': _signature()},
+        )
+        # The user replies while the agent is still introducing itself, and a brainbeat is due
+        replied = client.post('/hapra/v1/messages', json=_message_notification('hi'))
+        brainbeat = client.post('/hapra/v1/scheduler', json={'app_name': 'agent', 'session_id': 'conv', 'message': 'Brainbeat'})
+
+    assert (engaged.status_code, replied.status_code, brainbeat.json()) == (201, 202, 'success')
+    runs = router.local_session_client.runs
+    assert runs[0] == ('conv', honu_router.INTRO_MESSAGE)
+    assert sorted(runs[1:]) == [('conv', 'Brainbeat'), ('conv', 'hi')]
+    assert not router.local_session_client.overlapped
+    assert router.session_runs.stats()['exclusive_turns'] == 2
+
+
+def test_brainbeat_rejected_by_the_scheduling_api_is_reported_failed(monkeypatch):
+    class FakeConversationClient:
+        async def create_conversation(self, token, model_ref, name):
+            return Conversation.model_validate(_message_notification('')['conversation'])
+
+        async def aclose(self):
+            ...
+
+    class SessionsClient(FakeSessionClient):
+        async def create_session(self, app_name, session_id, state):
+            ...
+
+    def scheduling_api(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503, text='Scheduling API unavailable')
+
+    platform_url = 'http://platform.test'
+    scheduling_client = httpx.AsyncClient(base_url=platform_url, transport=httpx.MockTransport(scheduling_api))
+    monkeypatch.setattr(AsyncModelTasksAPIClient, '_clients', {platform_url: scheduling_client})
+    monkeypatch.setattr(honu_router.AsyncConversationClient, 'get_instance', lambda: FakeConversationClient())
+    router = HonuAgentRouter('http://agent.test', 7999, agents_with_brainbeats={'agent': '0 9 * * *'}, session_client=SessionsClient())
+
+    with _client(router) as client:
+        engaged = client.post(
+            '/hapra/v1/agents/agent/init_engagement',
+            json={'mdl_ref': 'model|d|m', 'auth_token': FakeHonuPlatform.make_token(platform_url), 'agent_signature': _signature()},
+        )
+
+    assert engaged.status_code == 201
+    engagement = router.engagements.get(('agent', 'conv'))
+    assert engagement.intro.status == 'succeeded'
+    assert engagement.brainbeat.status == 'failed' and '503' in engagement.brainbeat.error
+
+
+def test_disengage_takes_tokens_from_the_session_index(monkeypatch):
+    class FakeTasksClient:
+        def __init__(self, token, model_ref):
+            ...
+
+        async def delete_all_my_tasks(self):
+            return {}
+
+        @classmethod
+        async def aclose_all(cls):
+            ...
+
+    class FakeConversationClient:
+        deleted = []
+
+        async def delete_conversation(self, token, model_ref, conv_id):
+            self.deleted.append((token, conv_id))
+            return True
+
+        async def aclose(self):
+            ...
+
+    class SessionsClient(FakeSessionClient):
+        read = []
+
+        async def get_session_state(self, app_name, session_id):
+            self.read.append(session_id)
+            return {'token': 'token-from-state', 'model_ref': 'model|d|m'}
+
+        async def delete_session(self, app_name, session_id):
+            ...
+
+    index = ModelSessionIndex(':memory:')
+    index.add('agent', 'model|d|m', 'conv-1', 'token-1')
+    # Indexed before tokens were kept
+    index.add('agent', 'model|d|m', 'conv-2')
+    monkeypatch.setattr(honu_router, 'AsyncModelTasksAPIClient', FakeTasksClient)
+    monkeypatch.setattr(honu_router.AsyncConversationClient, 'get_instance', lambda: FakeConversationClient())
+    router = HonuAgentRouter('http://agent.test', 7999, session_client=SessionsClient(), session_index=index)
+
+    with _client(router) as client:
+        response = client.post('/hapra/v1/agents/agent/disengage', json={'mdl_ref': 'model|d|m', 'agent_signature': _signature()})
+
+    assert response.json()['results'] and all(r['success'] for r in response.json()['results'])
+    assert SessionsClient.read == ['conv-2']
+    assert sorted(FakeConversationClient.deleted) == [('token-1', 'conv-1'), ('token-from-state', 'conv-2')]
+    assert index.sessions('agent', 'model|d|m') == []
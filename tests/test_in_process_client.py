@@ -0,0 +1,50 @@
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.cli.utils.base_agent_loader import BaseAgentLoader
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+
+from honu_google_adk.agent_router.honu_router import HonuAgentRouter
+from honu_google_adk.agent_router.in_process_client import InProcessSessionClient
+
+
+class EchoAgent(BaseAgent):
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            content=Content(role='model', parts=[Part(text=f'echo: {ctx.user_content.parts[0].text}')]),
+        )
+
+
+class EchoAgentLoader(BaseAgentLoader):
+    def load_agent(self, agent_name: str) -> BaseAgent:
+        return EchoAgent(name=agent_name)
+
+    def list_agents(self) -> list[str]:
+        return ['echo']
+
+
+def test_in_process_client_runs_agents_without_http():
+    async def scenario():
+        session_service = InMemorySessionService()
+        session_client = InProcessSessionClient(EchoAgentLoader(), session_service)
+        router = HonuAgentRouter('http://agent.test', 7999, session_client=session_client)
+
+        await session_client.create_session('echo', 'conv', {'token': 'token', 'model_ref': 'model|d|m'})
+        await session_client.run(router._make_run_request('echo', 'conv', 'hello'))
+        session = await session_service.get_session(app_name='echo', user_id='user', session_id='conv')
+        sessions = await session_client.get_sessions_for_model_ref('echo', 'model|d|m')
+        await session_client.delete_session('echo', 'conv')
+        remaining = await session_client.get_sessions_for_model_ref('echo', 'model|d|m')
+        await session_client.close()
+        return [e.content.parts[0].text for e in session.events], sessions, remaining
+
+    texts, sessions, remaining = asyncio.run(scenario())
+    assert texts == ['hello', 'echo: hello']
+    assert sessions == [('token', 'conv')]
+    assert remaining == []
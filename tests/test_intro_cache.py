@@ -0,0 +1,154 @@
+import asyncio
+import base64
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from google.adk.events import Event
+from google.genai import types
+
+from honu_google_adk.agent_router.conversation_utils import AsyncConversationClient
+from honu_google_adk.agent_router.honu_router import INTRO_MESSAGE
+from honu_google_adk.agent_router.intro_cache import IntroMessageCache, capture_intro
+from honu_google_adk.testing import STUB_APP_NAME, FakeHonuPlatform, ServerThread, StubLlm, build_router_app, build_stub_app, free_port
+
+
+def _event(author: str, text: str, **kwargs) -> Event:
+    role = 'user' if author == 'user' else 'model'
+    return Event(author=author, invocation_id='e-1', content=types.Content(role=role, parts=[types.Part(text=text)]), **kwargs)
+
+
+def test_capture_intro_takes_the_reply_to_the_last_intro_prompt():
+    events = [
+        _event('user', INTRO_MESSAGE),
+        _event('agent', 'Old hello'),
+        _event('user', INTRO_MESSAGE),
+        _event('agent', 'Hel', partial=True),
+        _event('agent', 'Hello!'),
+    ]
+    intro = capture_intro(events, INTRO_MESSAGE)
+    assert intro.messages == ['Hello!']
+    assert [event.author for event in intro.events] == ['user', 'agent']
+
+    copies = intro.events_for_new_session()
+    assert [event.content for event in copies] == [event.content for event in intro.events]
+    assert {event.id for event in copies}.isdisjoint(event.id for event in intro.events)
+    assert len({event.invocation_id for event in copies}) == 1 and copies[0].invocation_id != 'e-1'
+
+    assert capture_intro([_event('user', 'Hi'), _event('agent', 'Hello!')], INTRO_MESSAGE) is None
+    assert capture_intro([_event('user', INTRO_MESSAGE)], INTRO_MESSAGE) is None
+
+
+def test_cache_is_per_app_and_version():
+    cache = IntroMessageCache({'agent': 'v1'})
+    intro = capture_intro([_event('user', INTRO_MESSAGE), _event('agent', 'Hello!')], INTRO_MESSAGE)
+    cache.set('agent', intro)
+    cache.set('other_agent', intro)
+    assert cache.get('agent') is intro
+    assert cache.get('other_agent') is None
+
+    cache.apps['agent'] = 'v2'
+    assert cache.get('agent') is None
+    assert cache.refresh('agent') and not cache.refresh('agent')
+
+
+def _engage(router_url: str, token: str, model_ref: str, signature_app_name: str = STUB_APP_NAME) -> dict:
+    payload = {'agent_url': 'http://agent.test', 'app_name': signature_app_name, 'model_ref': model_ref}
+    signature = 'external_agent/' + base64.b64encode(json.dumps(payload).encode()).decode()
+    engaged = httpx.post(
+        f'{router_url}/hapra/v1/agents/{STUB_APP_NAME}/init_engagement',
+        json={'mdl_ref': model_ref, 'auth_token': token, 'agent_signature': signature},
+        timeout=30,
+    ).json()
+    status_url = f'{router_url}/hapra/v1/agents/{STUB_APP_NAME}/engagements/{engaged["session_id"]}'
+    while (engagement := httpx.get(status_url).json())['intro']['status'] in ('pending', 'running'):
+        time.sleep(0.01)
+    return engagement
+
+
+def _count_model_calls(monkeypatch, delay: float = 0) -> list[int]:
+    model_calls = [0]
+    generate = StubLlm.generate_content_async
+
+    async def counting_generate(self, llm_request, stream=False):
+        model_calls[0] += 1
+        await asyncio.sleep(delay)
+        async for response in generate(self, llm_request, stream):
+            yield response
+    monkeypatch.setattr(StubLlm, 'generate_content_async', counting_generate)
+    return model_calls
+
+
+def test_engagements_reuse_the_first_intro(monkeypatch):
+    monkeypatch.setattr(AsyncConversationClient, '_instance', None)
+    model_calls = _count_model_calls(monkeypatch)
+
+    fake_platform = FakeHonuPlatform()
+    with ServerThread(fake_platform.app) as platform_server:
+        token = FakeHonuPlatform.make_token(platform_server.url)
+        port = free_port()
+        app, router = build_router_app(
+            f'http://127.0.0.1:{port}',
+            {STUB_APP_NAME: build_stub_app()},
+            intro_cache=IntroMessageCache({STUB_APP_NAME: 'v1'}),
+        )
+
+        with ServerThread(app, port) as router_server:
+            first = _engage(router_server.url, token, 'model|d|first')
+            second = _engage(router_server.url, token, 'model|d|second')
+            refreshed = httpx.post(f'{router_server.url}/hapra/v1/agents/{STUB_APP_NAME}/intro/refresh')
+            third = _engage(router_server.url, token, 'model|d|third')
+            not_cached = httpx.post(f'{router_server.url}/hapra/v1/agents/other_agent/intro/refresh')
+
+    assert [e['intro_cached'] for e in (first, second, third)] == [False, True, False]
+    assert all(e['intro']['status'] == 'succeeded' for e in (first, second, third))
+    assert refreshed.json() == {'dropped': True} and not_cached.status_code == 404
+    assert model_calls == [2]
+    # Every user was introduced to, and the cached intro is in the second session's history
+    reply = build_stub_app().root_agent.model.reply
+    assert [[m['payload']['body'] for m in messages] for messages in fake_platform.messages.values()] == [[reply]] * 3
+    events = asyncio.run(router.local_session_client.get_session_events(STUB_APP_NAME, second['session_id']))
+    assert [(event.author, event.content.parts[0].text) for event in events] == [('user', INTRO_MESSAGE), (STUB_APP_NAME, reply)]
+
+
+def test_first_engagements_respond_before_the_intro_is_generated(monkeypatch):
+    monkeypatch.setattr(AsyncConversationClient, '_instance', None)
+    model_calls = _count_model_calls(monkeypatch, delay=1)
+
+    fake_platform = FakeHonuPlatform()
+    with ServerThread(fake_platform.app) as platform_server:
+        token = FakeHonuPlatform.make_token(platform_server.url)
+        port = free_port()
+        app, _ = build_router_app(
+            f'http://127.0.0.1:{port}',
+            {STUB_APP_NAME: build_stub_app()},
+            intro_cache=IntroMessageCache({STUB_APP_NAME: 'v1'}),
+        )
+
+        def _init(i: int) -> httpx.Response:
+            # The app name in the signature only names the conversation, the intro is run by the app engaged
+            payload = {'agent_url': 'http://agent.test', 'app_name': 'Stub Agent', 'model_ref': f'model|d|{i}'}
+            signature = 'external_agent/' + base64.b64encode(json.dumps(payload).encode()).decode()
+            return httpx.post(
+                f'{router_server.url}/hapra/v1/agents/{STUB_APP_NAME}/init_engagement',
+                json={'mdl_ref': f'model|d|{i}', 'auth_token': token, 'agent_signature': signature},
+                timeout=30,
+            )
+
+        with ServerThread(app, port) as router_server, ThreadPoolExecutor(3) as pool:
+            started = time.monotonic()
+            engaged = list(pool.map(_init, range(3)))
+            responded_after = time.monotonic() - started
+            for e in engaged:
+                status_url = f'{router_server.url}/hapra/v1/agents/{STUB_APP_NAME}/engagements/{e.json()["session_id"]}'
+                while httpx.get(status_url).json()['intro']['status'] in ('pending', 'running'):
+                    time.sleep(0.01)
+            later = _engage(router_server.url, token, 'model|d|later', signature_app_name='Stub Agent')
+
+    # None of them waited for an introduction, so each made its own
+    assert responded_after < 1
+    assert [e.status_code for e in engaged] == [201] * 3
+    assert not any(e.json()['intro_cached'] for e in engaged)
+    assert later['intro_cached'] and later['intro']['status'] == 'succeeded'
+    assert model_calls == [3]
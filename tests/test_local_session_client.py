@@ -0,0 +1,55 @@
+import asyncio
+
+import httpx
+from google.adk.cli.adk_web_server import CreateSessionRequest
+from google.adk.events import Event
+from google.genai import types
+
+from honu_google_adk.agent_router.utils import LocalSessionClient
+
+
+def test_client_is_shared_between_calls_and_tracks_pool_usage():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={'state': {'token': 't'}})
+
+    async def scenario():
+        session_client = LocalSessionClient(7999, max_connections=1)
+        session_client._client = httpx.AsyncClient(base_url=session_client.agent_url, transport=httpx.MockTransport(handler))
+        client = session_client.client
+        states = await asyncio.gather(*(session_client.get_session_state('app', str(i)) for i in range(3)))
+        stats = session_client.pool_stats()
+        reused = session_client.client is client
+        await session_client.close()
+        return states, stats, reused
+
+    states, stats, reused = asyncio.run(scenario())
+    assert states == [{'token': 't'}] * 3
+    assert reused
+    assert (stats['requests'], stats['in_flight'], stats['peak_in_flight'], stats['saturated_requests']) == (3, 0, 3, 2)
+
+
+def test_sessions_created_with_history_round_trip_their_events():
+    created = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == 'POST':
+            created.append((request.url.path, CreateSessionRequest.model_validate_json(request.content)))
+            return httpx.Response(200, json={})
+        return httpx.Response(200, json={'state': {}, 'events': [e.model_dump(mode='json', by_alias=True) for e in created[0][1].events]})
+
+    event = Event(author='agent', invocation_id='e-1', content=types.Content(role='model', parts=[types.Part(text='Hello!')]))
+
+    async def scenario():
+        session_client = LocalSessionClient(7999)
+        session_client._client = httpx.AsyncClient(base_url=session_client.agent_url, transport=httpx.MockTransport(handler))
+        await session_client.create_session('app', 'conv', {'token': 't'}, events=[event])
+        events = await session_client.get_session_events('app', 'conv')
+        await session_client.close()
+        return events
+
+    events = asyncio.run(scenario())
+    (path, request), = created
+    assert path == '/apps/app/users/user/sessions'
+    assert (request.session_id, request.state) == ('conv', {'token': 't'})
+    assert events == [event]
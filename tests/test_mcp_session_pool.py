@@ -0,0 +1,62 @@
+import asyncio
+
+from fastmcp import Client, FastMCP
+
+from honu_google_adk.mcp_session_pool import MCPSessionPool
+
+server = FastMCP('test')
+
+
+@server.tool
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+def _counting_factory():
+    created = []
+
+    def factory():
+        client = Client(server)
+        created.append(client)
+        return client
+    return factory, created
+
+
+def test_session_is_reused_between_calls():
+    async def scenario():
+        pool = MCPSessionPool()
+        factory, created = _counting_factory()
+        key = ('host', 'token', 'model')
+        first = await pool.call_tool(key, factory, 'add', {'a': 1, 'b': 2})
+        second = await pool.call_tool(key, factory, 'add', {'a': 2, 'b': 2})
+        await pool.close()
+        return first.data, second.data, len(created)
+
+    assert asyncio.run(scenario()) == (3, 4, 1)
+
+
+def test_dead_session_is_replaced():
+    async def scenario():
+        pool = MCPSessionPool()
+        factory, created = _counting_factory()
+        key = ('host', 'token', 'model')
+        await pool.call_tool(key, factory, 'add', {'a': 1, 'b': 2})
+        await created[0].close()
+        result = await pool.call_tool(key, factory, 'add', {'a': 1, 'b': 1})
+        await pool.close()
+        return result.data, len(created)
+
+    assert asyncio.run(scenario()) == (2, 2)
+
+
+def test_idle_and_overflow_sessions_are_closed():
+    async def scenario():
+        pool = MCPSessionPool(max_size=1, idle_timeout=0)
+        factory, created = _counting_factory()
+        await pool.call_tool(('host', 'a', 'model'), factory, 'add', {'a': 1, 'b': 2})
+        await pool.call_tool(('host', 'b', 'model'), factory, 'add', {'a': 1, 'b': 2})
+        size = len(pool)
+        await pool.close()
+        return size, [c.is_connected() for c in created]
+
+    assert asyncio.run(scenario()) == (1, [False, False])
@@ -1,3 +1,6 @@
+import asyncio
+
+from fastmcp import Client, FastMCP
 from google.adk.tools import BaseTool
 
 from honu_google_adk.main import HonuToolSet
@@ -17,3 +20,32 @@ def test_mcp_tool_is_valid():
     test_tool.meta = {'_fastmcp': {'tags': ['public', 'utility']}}
     assert not HonuToolSet._is_valid_tool(valid_tags, test_tool)
 
+
+
+def test_tool_catalogue_is_cached_and_survives_failed_refresh(monkeypatch):
+    server = FastMCP('test')
+
+    @server.tool
+    def list_boards() -> list[str]:
+        return []
+
+    toolset = HonuToolSet('http://mcp.test', catalogue_ttl=0)
+    monkeypatch.setattr(toolset, '_get_unauth_client', lambda: Client(server))
+
+    async def scenario():
+        first = await toolset.get_tools()
+        second = await toolset.get_tools()
+        await toolset._refresh_task
+
+        def _failing_client():
+            raise ConnectionError('MCP host is down')
+        monkeypatch.setattr(toolset, '_get_unauth_client', _failing_client)
+        await toolset.get_tools()
+        await toolset._refresh_task
+        third = await toolset.get_tools()
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert [t.name for t in first] == ['list_boards']
+    # Unchanged tool definitions keep the same tool objects
+    assert first[0] is second[0] is third[0]
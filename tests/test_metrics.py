@@ -0,0 +1,42 @@
+import pytest
+
+from honu_google_adk.metrics import Counter, Histogram, MetricFamily, MetricsRegistry, timed
+
+
+def test_histogram_and_counter_render_in_prometheus_format():
+    histogram = Histogram('request_seconds', 'Request time.', buckets=(0.1, 1))
+    histogram.observe(0.05, route='/a')
+    histogram.observe(0.5, route='/a')
+    histogram.observe(5, route='/a')
+    with pytest.raises(ValueError):
+        with histogram.time(route='/b'):
+            raise ValueError()
+
+    counter = Counter('responses_total', 'Responses.')
+    counter.inc(status=200)
+    counter.inc(2, status=200)
+
+    rendered = histogram.render()
+    assert rendered[:2] == ['# HELP request_seconds Request time.', '# TYPE request_seconds histogram']
+    assert [line for line in rendered if 'route="/a"' in line] == [
+        'request_seconds_bucket{route="/a",le="0.1"} 1',
+        'request_seconds_bucket{route="/a",le="1"} 2',
+        'request_seconds_bucket{route="/a",le="+Inf"} 3',
+        'request_seconds_sum{route="/a"} 5.55',
+        'request_seconds_count{route="/a"} 3',
+    ]
+    assert histogram.count(route='/b', outcome='error') == 1
+    assert counter.render()[-1] == 'responses_total{status="200"} 3'
+
+
+def test_registry_merges_collectors_reporting_the_same_family():
+    registry = MetricsRegistry()
+    for name in ('a', 'b'):
+        registry.register_collector(name, lambda name=name: [MetricFamily('queued', 'Queued.', 'gauge', [({'queue': name}, 1)])])
+    with timed(registry.histogram('work_seconds', 'Work.'), 'work', job='x'):
+        pass
+
+    rendered = registry.render()
+    assert rendered.count('# TYPE queued gauge') == 1
+    assert 'queued{queue="a"} 1\nqueued{queue="b"} 1\n' in rendered
+    assert 'work_seconds_count{job="x",outcome="ok"} 1' in rendered
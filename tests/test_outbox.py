@@ -0,0 +1,62 @@
+import asyncio
+
+import httpx
+
+from honu_google_adk.agent_router.outbox import ConversationOutbox
+from honu_google_adk.agent_router.schema import TextMessage
+from tests.test_chat_status import _conversation
+
+
+class FlakyConversationClient:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.sent = []
+
+    async def send_message(self, token, conversation, message):
+        await asyncio.sleep(0)
+        if self.failures:
+            self.failures -= 1
+            return httpx.Response(503)
+        self.sent.append(message.body)
+        return httpx.Response(201)
+
+
+def test_messages_are_merged_retried_and_delivered_in_order():
+    client = FlakyConversationClient(failures=2)
+
+    async def scenario():
+        outbox = ConversationOutbox(client, retry_base_delay=0.001)
+        conv = _conversation()
+        await outbox.put('token', conv, TextMessage(body='Hello'), group='event-1')
+        await outbox.put('token', conv, TextMessage(body='there'), group='event-1')
+        await outbox.put('token', conv, TextMessage(body='Bye'), group='event-2')
+        await outbox.flush(conv)
+        return outbox.queue_size(conv)
+
+    assert asyncio.run(scenario()) == 0
+    assert client.sent == ['Hello\nthere', 'Bye']
+
+
+def test_producers_wait_while_a_message_is_retried():
+    client = FlakyConversationClient(failures=3)
+
+    async def scenario():
+        outbox = ConversationOutbox(client, max_queue_size=5, retry_base_delay=0.05, retry_max_delay=0.05)
+        conv = _conversation()
+        # Queued before the worker first runs
+        for i in range(5):
+            await outbox.put('token', conv, TextMessage(body=f'message {i}'))
+        accepted = 5
+        while True:
+            put = asyncio.create_task(outbox.put('token', conv, TextMessage(body=f'message {accepted}')))
+            await asyncio.sleep(0.01)
+            if not put.done():
+                break
+            accepted += 1
+        await put
+        await outbox.flush(conv)
+        return accepted
+
+    # The queue, the message being retried and the one held behind it to see it isn't part of the same group
+    assert asyncio.run(scenario()) == 5 + 2
+    assert client.sent == [f'message {i}' for i in range(8)]
@@ -0,0 +1,70 @@
+import base64
+import json
+
+import httpx
+
+from honu_google_adk.agent_router.conversation_utils import AsyncConversationClient
+from honu_google_adk.agent_router.traffic_recorder import TrafficRecorder
+from honu_google_adk.replay import find_saturation, load_recording, replay_against_stand_ins
+from honu_google_adk.testing import STUB_APP_NAME, FakeHonuPlatform, ServerThread, build_router_app, build_stub_app, free_port
+
+
+def _signature(app_name: str) -> str:
+    payload = {'agent_url': 'http://agent.test', 'app_name': app_name, 'model_ref': 'model|d|m'}
+    return 'external_agent/' + base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_recorded_traffic_replays_against_the_stand_ins(tmp_path, monkeypatch):
+    monkeypatch.setattr(AsyncConversationClient, '_instance', None)
+    recording = tmp_path / 'traffic.jsonl'
+    fake_platform = FakeHonuPlatform()
+    with ServerThread(fake_platform.app) as platform_server:
+        token = FakeHonuPlatform.make_token(platform_server.url)
+        port = free_port()
+        app, _ = build_router_app(
+            f'http://127.0.0.1:{port}',
+            {STUB_APP_NAME: build_stub_app()},
+            traffic_recorder=TrafficRecorder(recording),
+        )
+        with ServerThread(app, port) as router_server:
+            httpx.post(
+                f'{router_server.url}/hapra/v1/agents/{STUB_APP_NAME}/init_engagement',
+                json={'mdl_ref': 'model|d|m', 'auth_token': token, 'agent_signature': _signature(STUB_APP_NAME)},
+                timeout=30,
+            )
+            conversation, = fake_platform.conversations.values()
+            httpx.post(f'{router_server.url}/hapra/v1/messages', timeout=30, json={
+                'agent_signature': _signature(STUB_APP_NAME),
+                'conversation': conversation,
+                'message': {'message_id': 'm1', 'author_id': 'user', 'timestamp': '2026-01-01T00:00:00Z', 'payload': {'body': 'Hi'}},
+            })
+            httpx.post(f'{router_server.url}/hapra/v1/scheduler', timeout=30, json={
+                'app_name': STUB_APP_NAME, 'session_id': conversation['conversation_id'], 'message': 'Brainbeat',
+            })
+
+    records = load_recording(recording)
+    # The intro message the router sends itself is not recorded
+    assert [record['endpoint'] for record in records] == ['init_engagement', 'messages', 'scheduler']
+
+    # Replayed as another app, against a platform that has never seen the recorded conversation
+    for record in records:
+        if 'agent_signature' in record['body']:
+            record['body']['agent_signature'] = _signature('recorded_app')
+    monkeypatch.setattr(AsyncConversationClient, '_instance', None)
+    reports = replay_against_stand_ins(records * 3, levels=[1, 3])
+
+    assert [concurrency for concurrency, _ in reports] == [1, 3]
+    for _, report in reports:
+        assert report['all']['requests'] == 9 and report['all']['errors'] == 0
+        assert report['scheduler']['status_codes'] == {'200': 3}
+        assert report['init_engagement']['status_codes'] == {'201': 3}
+
+
+def test_find_saturation():
+    def level(rps: float, p95: float, error_rate: float = 0) -> dict:
+        return {'all': {'throughput_rps': rps, 'p95_ms': p95, 'error_rate': error_rate}}
+
+    assert find_saturation([(1, level(10, 100)), (2, level(19, 110)), (4, level(30, 150))]) is None
+    assert find_saturation([(1, level(10, 100)), (2, level(19, 110)), (4, level(20, 150))]) == 4
+    assert find_saturation([(1, level(10, 100)), (2, level(19, 250))]) == 2
+    assert find_saturation([(1, level(10, 100)), (2, level(19, 110, error_rate=0.05))]) == 2
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from honu_google_adk.agent_router.run_queue import AgentRunQueue, RunQueueFull
+
+
+def test_queue_limits_concurrency_and_sheds_load():
+    async def scenario():
+        queue = AgentRunQueue(concurrency=2, max_queued=3)
+        running = []
+        peak = 0
+        release = asyncio.Event()
+
+        async def job():
+            nonlocal peak
+            running.append(1)
+            peak = max(peak, len(running))
+            await release.wait()
+            running.pop()
+
+        for _ in range(3):
+            queue.submit(job)
+        # Let the workers pick up the first two jobs, freeing space in the queue
+        await asyncio.sleep(0)
+        queue.submit(job)
+        queue.submit(job)
+        with pytest.raises(RunQueueFull):
+            queue.submit(job)
+
+        release.set()
+        await queue.join()
+        stats = queue.stats()
+        await queue.stop()
+        return peak, stats
+
+    peak, stats = asyncio.run(scenario())
+    assert peak == 2
+    assert (stats['completed'], stats['rejected'], stats['queued']) == (5, 1, 0)
+    assert stats['wait_seconds_max'] >= stats['wait_seconds_p50'] >= 0
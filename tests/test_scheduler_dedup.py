@@ -0,0 +1,76 @@
+import asyncio
+
+from honu_google_adk.agent_router.scheduler_dedup import PRUNE_EVERY, SchedulerDeliveryLog
+
+
+def test_claims_survive_reopening(tmp_path):
+    log = SchedulerDeliveryLog(tmp_path / 'deliveries.db')
+    assert log.claim('id/delivery-1')
+    assert not log.claim('id/delivery-1')
+    log.close()
+
+    reopened = SchedulerDeliveryLog(tmp_path / 'deliveries.db')
+    assert not reopened.claim('id/delivery-1')
+    assert reopened.claim('id/delivery-2')
+    assert reopened.duplicates == 1
+
+
+def test_released_claims_can_be_claimed_again():
+    log = SchedulerDeliveryLog()
+    assert log.claim('id/delivery')
+    log.release('id/delivery')
+    assert log.claim('id/delivery')
+
+
+def test_keys_fall_back_to_the_app_session_and_message():
+    key = SchedulerDeliveryLog.key
+    assert key('agent', 'conv', 'Brainbeat', 'delivery') == 'id/delivery'
+    assert key('agent', 'conv', 'Brainbeat') == key('agent', 'conv', 'Brainbeat')
+    assert key('agent', 'conv', 'Brainbeat') != key('agent', 'conv', 'Weekly report')
+    assert key('agent', 'conv', 'Brainbeat') != key('agent', 'other', 'Brainbeat')
+
+
+def test_different_tasks_for_a_session_are_not_repeats():
+    log = SchedulerDeliveryLog(window=300)
+    assert log.claim(log.key('agent', 'conv', 'Brainbeat'), now=1000)
+    assert log.claim(log.key('agent', 'conv', 'Weekly report'), now=1001)
+    assert not log.claim(log.key('agent', 'conv', 'Brainbeat'), now=1002)
+
+
+def test_repeats_are_recognised_within_a_sliding_window():
+    log = SchedulerDeliveryLog(window=300)
+    key = log.key('agent', 'conv', 'Brainbeat')
+    # Either side of where a fixed 300 second bucket would end
+    assert log.claim(key, now=1199)
+    assert not log.claim(key, now=1201)
+    assert not log.claim(key, now=1498)
+    # The window runs from the first claim, so the same message runs again once it has passed
+    assert log.claim(key, now=1500)
+
+    # Deliveries with an id are remembered for the whole retention
+    assert log.claim('id/delivery', now=1000)
+    assert not log.claim('id/delivery', now=2000)
+
+
+def test_async_claims_run_off_the_event_loop(tmp_path):
+    log = SchedulerDeliveryLog(tmp_path / 'deliveries.db')
+
+    async def scenario():
+        return await asyncio.gather(*(log.aclaim('id/delivery') for _ in range(10)))
+
+    assert sorted(asyncio.run(scenario())) == [False] * 9 + [True]
+    asyncio.run(log.arelease('id/delivery'))
+    assert log.claim('id/delivery')
+
+
+def test_log_is_bounded():
+    log = SchedulerDeliveryLog(max_entries=10)
+    for i in range(PRUNE_EVERY):
+        log.claim(f'id/{i}')
+    assert len(log) == 10
+    # The newest deliveries are the ones remembered
+    assert not log.claim(f'id/{PRUNE_EVERY - 1}')
+
+    expiring = SchedulerDeliveryLog(retention=0)
+    expiring.claim('id/delivery')
+    assert expiring.claim('id/delivery')
@@ -0,0 +1,61 @@
+import asyncio
+import sqlite3
+
+from honu_google_adk.agent_router.session_index import ModelSessionIndex, rebuild
+
+
+def test_index_survives_reopening(tmp_path):
+    index = ModelSessionIndex.for_session_service_uri(f'sqlite:///{tmp_path}/sessions.db')
+    index.add('agent', 'model|a', 'conv-1')
+    index.add('agent', 'model|a', 'conv-2')
+    index.add('agent', 'model|b', 'conv-3')
+    index.remove('agent', 'conv-1')
+    index.close()
+
+    reopened = ModelSessionIndex(tmp_path / 'sessions.model_index.db')
+    assert reopened.session_ids('agent', 'model|a') == ['conv-2']
+    assert reopened.session_ids('other_agent', 'model|a') == []
+
+
+def test_async_queries_run_off_the_event_loop(tmp_path):
+    index = ModelSessionIndex(tmp_path / 'index.db')
+
+    async def scenario():
+        await asyncio.gather(*(index.aadd('agent', 'model|a', f'conv-{i}', f'token-{i}') for i in range(10)))
+        await index.aremove('agent', 'conv-0')
+        return await index.asessions('agent', 'model|a')
+
+    assert asyncio.run(scenario()) == sorted((f'token-{i}', f'conv-{i}') for i in range(1, 10))
+
+
+def test_indexes_made_before_tokens_were_kept_get_the_column(tmp_path):
+    path = tmp_path / 'index.db'
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            'CREATE TABLE model_sessions (app_name TEXT NOT NULL, model_ref TEXT NOT NULL, session_id TEXT NOT NULL, '
+            'PRIMARY KEY (app_name, session_id))'
+        )
+        conn.execute("INSERT INTO model_sessions VALUES ('agent', 'model|a', 'conv-1')")
+    conn.close()
+
+    index = ModelSessionIndex(path)
+    index.add('agent', 'model|a', 'conv-2', 'token')
+    assert index.sessions('agent', 'model|a') == [(None, 'conv-1'), ('token', 'conv-2')]
+
+
+def test_rebuild_replaces_the_apps_entries(tmp_path):
+    class FakeSessionClient:
+        async def list_apps(self):
+            return ['agent']
+
+        async def list_sessions(self, app_name):
+            return [
+                {'id': 'conv-1', 'state': {'model_ref': 'model|a', 'token': 't'}},
+                {'id': 'conv-2', 'state': {}},
+            ]
+
+    index = ModelSessionIndex(tmp_path / 'index.db')
+    index.add('agent', 'model|a', 'stale')
+    assert asyncio.run(rebuild(index, FakeSessionClient())) == {'agent': 1}
+    assert index.sessions('agent', 'model|a') == [('t', 'conv-1')]
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from honu_google_adk.agent_router.session_runs import SessionRunCoalescer
+
+
+def test_messages_sent_during_a_turn_share_the_next_turn():
+    turns = []
+
+    async def turn(texts):
+        turns.append(texts)
+        await asyncio.sleep(0.05)
+
+    async def scenario():
+        coalescer = SessionRunCoalescer()
+        first = asyncio.create_task(coalescer.run('conv', 'hi', turn))
+        await asyncio.sleep(0.01)
+        rest = [asyncio.create_task(coalescer.run('conv', text, turn)) for text in ('there', 'again')]
+        other = asyncio.create_task(coalescer.run('other', 'hello', turn))
+        await asyncio.gather(first, *rest, other)
+        return coalescer.stats()
+
+    stats = asyncio.run(scenario())
+    assert turns == [['hi'], ['there', 'again'], ['hello']] or turns == [['hi'], ['hello'], ['there', 'again']]
+    assert stats == {'active_sessions': 0, 'messages': 4, 'turns': 3, 'exclusive_turns': 0, 'coalesced': 1}
+
+
+def test_turns_of_a_session_never_overlap():
+    running = set()
+    overlapped = False
+
+    async def turn(texts):
+        nonlocal overlapped
+        overlapped = overlapped or 'conv' in running
+        running.add('conv')
+        await asyncio.sleep(0.01)
+        running.discard('conv')
+
+    async def scenario():
+        coalescer = SessionRunCoalescer()
+        for i in range(5):
+            await asyncio.gather(*(coalescer.run('conv', f'{i}-{j}', turn) for j in range(3)), asyncio.sleep(0.005))
+
+    asyncio.run(scenario())
+    assert not overlapped
+
+
+def test_a_failed_turn_fails_only_its_messages():
+    async def turn(texts):
+        await asyncio.sleep(0.02)
+        if texts == ['hi']:
+            raise ValueError('model unavailable')
+
+    async def scenario():
+        coalescer = SessionRunCoalescer()
+        first = asyncio.create_task(coalescer.run('conv', 'hi', turn))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(coalescer.run('conv', 'there', turn))
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, ValueError) and second is None
+
+
+def test_discarding_a_session_cancels_its_waiting_messages():
+    async def scenario():
+        coalescer = SessionRunCoalescer()
+        waiter, start = coalescer.add('conv', 'hi')
+        _, again = coalescer.add('conv', 'there')
+        coalescer.discard('conv')
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return start, again, coalescer.stats()['active_sessions']
+
+    assert asyncio.run(scenario()) == (True, False, 0)
+
+
+def test_exclusive_turns_take_their_turn_without_merging_messages():
+    turns = []
+
+    async def turn(texts):
+        turns.append(texts)
+        await asyncio.sleep(0.02)
+
+    async def exclusive(name):
+        turns.append(name)
+        await asyncio.sleep(0.02)
+        return name
+
+    async def scenario():
+        coalescer = SessionRunCoalescer()
+        intro = asyncio.create_task(coalescer.run_exclusive('conv', lambda: exclusive('intro')))
+        await asyncio.sleep(0.01)
+        messages = [asyncio.create_task(coalescer.run('conv', text, turn)) for text in ('hi', 'there')]
+        await asyncio.sleep(0.005)
+        brainbeat = asyncio.create_task(coalescer.run_exclusive('conv', lambda: exclusive('brainbeat')))
+        results = await asyncio.gather(intro, *messages, brainbeat)
+        return results, coalescer.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == ['intro', None, None, 'brainbeat']
+    # The messages sent during the intro wait for it, and are answered together before the brainbeat that came after
+    assert turns == ['intro', ['hi', 'there'], 'brainbeat']
+    assert stats == {'active_sessions': 0, 'messages': 2, 'turns': 1, 'exclusive_turns': 2, 'coalesced': 1}
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from honu_google_adk.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution_and_its_error():
+    executions = []
+
+    async def fetch(fail: bool):
+        executions.append(fail)
+        await asyncio.sleep(0.01)
+        if fail:
+            raise ValueError('upstream failed')
+        return 'result'
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*[flight.do('ok', lambda: fetch(False)) for _ in range(5)])
+        errors = await asyncio.gather(*[flight.do('bad', lambda: fetch(True)) for _ in range(3)], return_exceptions=True)
+        # Nothing is remembered once the call is done
+        again = await flight.do('ok', lambda: fetch(False))
+        return flight, results, errors, again
+
+    flight, results, errors, again = asyncio.run(scenario())
+    assert results == ['result'] * 5 and again == 'result'
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert executions == [False, True, False]
+    assert (flight.calls, flight.deduplicated, len(flight)) == (9, 6, 0)
+
+
+def test_execution_is_only_cancelled_once_every_caller_is():
+    cancelled = []
+
+    async def fetch():
+        try:
+            await asyncio.sleep(0.05)
+            return 'result'
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.create_task(flight.do('key', fetch))
+        second = asyncio.create_task(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == 'result'
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert not cancelled
+
+        only = asyncio.create_task(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        only.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await only
+        await asyncio.sleep(0)
+        return len(flight)
+
+    assert asyncio.run(scenario()) == 0
+    assert cancelled == [True]
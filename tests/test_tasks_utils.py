@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+import jwt
+import pytest
+
+from honu_google_adk.agent_router.tasks_utils import AsyncModelTasksAPIClient
+
+TOKEN = jwt.encode({'url': 'http://scheduling.test'}, 'some_secret_which_is_long_enough_for_hs256', algorithm='HS256')
+
+
+def _scheduling_server(task_count: int, undeletable: set[str], honour_paging: bool):
+    tasks = [f'task-{i}' for i in range(task_count)]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == 'DELETE':
+            task_id = request.url.path.rsplit('/', 1)[-1]
+            if task_id in undeletable:
+                return httpx.Response(500)
+            tasks.remove(task_id)
+            return httpx.Response(204)
+        page = tasks
+        if honour_paging:
+            offset, limit = int(request.url.params['offset']), int(request.url.params['limit'])
+            page = tasks[offset:offset + limit]
+        return httpx.Response(200, json=[{'id': task_id} for task_id in page])
+    return tasks, handler
+
+
+@pytest.mark.parametrize('honour_paging', [True, False])
+def test_delete_all_my_tasks_pages_through_every_task(monkeypatch, honour_paging):
+    remaining, handler = _scheduling_server(250, {'task-5', 'task-120'}, honour_paging)
+    monkeypatch.setattr(AsyncModelTasksAPIClient, '_clients', {})
+
+    async def scenario():
+        AsyncModelTasksAPIClient._clients['http://scheduling.test'] = httpx.AsyncClient(
+            base_url='http://scheduling.test',
+            transport=httpx.MockTransport(handler),
+        )
+        results = await AsyncModelTasksAPIClient(TOKEN, 'model|domain|model').delete_all_my_tasks()
+        # A second client for the same server shares the pool
+        shared = AsyncModelTasksAPIClient(TOKEN, 'model|domain|other').client is AsyncModelTasksAPIClient._clients['http://scheduling.test']
+        await AsyncModelTasksAPIClient.aclose_all()
+        return results, shared
+
+    results, shared = asyncio.run(scenario())
+    assert len(results) == 250
+    assert sorted(task_id for task_id, deleted in results.items() if not deleted) == ['task-120', 'task-5']
+    assert remaining == ['task-5', 'task-120']
+    assert shared
@@ -0,0 +1,112 @@
+import asyncio
+import base64
+import json
+import time
+
+import httpx
+import pytest
+
+from honu_google_adk.agent_router.conversation_utils import AsyncConversationClient
+from honu_google_adk.agent_router.tasks_utils import AsyncModelTasksAPIClient
+from honu_google_adk.testing import (
+    STUB_APP_NAME,
+    FakeHonuPlatform,
+    ServerThread,
+    build_adk_router_app,
+    build_fake_mcp_server,
+    build_router_app,
+    build_stub_app,
+    free_port,
+    write_stub_agents_dir,
+)
+from honu_google_adk.testing.stats import compare, summarise
+
+
+def _wait_for_engagement(status_url: str) -> dict:
+    while True:
+        engagement = httpx.get(status_url).json()
+        if all(engagement[step]['status'] not in ('pending', 'running') for step in ('intro', 'brainbeat')):
+            return engagement
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize('session_client', ['in-process', 'http'])
+def test_engagement_round_trip_against_the_stand_ins(monkeypatch, tmp_path, session_client):
+    monkeypatch.setattr(AsyncConversationClient, '_instance', None)
+    fake_platform = FakeHonuPlatform()
+    with ServerThread(fake_platform.app) as platform_server, ServerThread(build_fake_mcp_server().http_app()) as mcp_server:
+        token = FakeHonuPlatform.make_token(platform_server.url)
+        port = free_port()
+        router_options = {'agents_with_brainbeats': {STUB_APP_NAME: '0 9 * * *'}}
+        if session_client == 'http':
+            # As deployed, the router is added to the ADK's app and goes through its HTTP API
+            write_stub_agents_dir(tmp_path, mcp_host=f'{mcp_server.url}/mcp')
+            app, _ = build_adk_router_app(f'http://127.0.0.1:{port}', port, tmp_path, **router_options)
+        else:
+            app, _ = build_router_app(
+                f'http://127.0.0.1:{port}',
+                {STUB_APP_NAME: build_stub_app(mcp_host=f'{mcp_server.url}/mcp')},
+                **router_options,
+            )
+        signature = 'external_agent/' + base64.b64encode(json.dumps(
+            {'agent_url': 'http://agent.test', 'app_name': STUB_APP_NAME, 'model_ref': 'model|d|m'}
+        ).encode()).decode()
+
+        with ServerThread(app, port) as router_server:
+            engaged = httpx.post(
+                f'{router_server.url}/hapra/v1/agents/{STUB_APP_NAME}/init_engagement',
+                json={'mdl_ref': 'model|d|m', 'auth_token': token, 'agent_signature': signature},
+                timeout=30,
+            )
+            (conversation_key, conversation), = fake_platform.conversations.items()
+            # The intro and the brainbeat task are set up after init_engagement responds
+            status_url = f'{router_server.url}/hapra/v1/agents/{STUB_APP_NAME}/engagements/{conversation["conversation_id"]}'
+            engagement = _wait_for_engagement(status_url)
+            brainbeat = httpx.post(
+                f'{router_server.url}/hapra/v1/scheduler',
+                json={'app_name': STUB_APP_NAME, 'session_id': conversation['conversation_id'], 'message': 'call list_boards'},
+                timeout=30,
+            )
+            tasks = {key: dict(model_tasks) for key, model_tasks in fake_platform.tasks.items()}
+            disengaged = httpx.post(
+                f'{router_server.url}/hapra/v1/agents/{STUB_APP_NAME}/disengage',
+                json={'mdl_ref': 'model|d|m', 'agent_signature': signature},
+                timeout=30,
+            )
+
+    assert engaged.status_code == 201
+    assert engaged.json()['session_id'] == conversation['conversation_id']
+    assert engagement['intro']['status'] == engagement['brainbeat']['status'] == 'succeeded'
+    assert brainbeat.json() == 'success'
+    # The intro and the brainbeat reply were both delivered by the plugin
+    assert [m['payload']['body'] for m in fake_platform.messages[conversation_key]] == [build_stub_app().root_agent.model.reply] * 2
+    assert [task['cron_string'] for task in tasks[('d', 'm')].values()] == ['0 9 * * *']
+    assert all(result['success'] for result in disengaged.json()['results'])
+    assert not fake_platform.conversations and not fake_platform.tasks[('d', 'm')]
+
+
+def test_fake_platform_pages_tasks_like_the_scheduling_api():
+    fake_platform = FakeHonuPlatform()
+
+    async def scenario(url: str):
+        client = AsyncModelTasksAPIClient(FakeHonuPlatform.make_token(url), 'model|d|m', page_size=2)
+        for i in range(5):
+            await client.create_task({}, f'task {i}', '', '* * * * *', 'http://agent.test')
+        deleted = await client.delete_all_my_tasks()
+        await AsyncModelTasksAPIClient.aclose_all()
+        return deleted
+
+    with ServerThread(fake_platform.app) as server:
+        deleted = asyncio.run(scenario(server.url))
+    assert len(deleted) == 5 and all(deleted.values())
+
+
+def test_compare_flags_regressions_beyond_the_threshold():
+    baseline = {'messages': summarise([0.01] * 10, errors=0, elapsed=1)}
+    slower = {'messages': summarise([0.02] * 10, errors=0, elapsed=2)}
+    assert compare(baseline, baseline, 0.2) == []
+    assert [r.split(':')[0] for r in compare(baseline, slower, 0.2)] == [
+        'messages p50_ms',
+        'messages p95_ms',
+        'messages throughput_rps',
+    ]
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+from mcp.types import ImageContent, TextContent
+
+from honu_google_adk.tool_response import FULL_PAYLOAD_KEY, PARSE_ERROR_MSG, ResponseLimits, build_tool_response, save_full_response
+
+
+class FakeToolContext:
+
+    def __init__(self, has_artifact_service: bool = True):
+        self.has_artifact_service = has_artifact_service
+        self.artifacts = {}
+
+    async def save_artifact(self, filename, artifact):
+        if not self.has_artifact_service:
+            raise ValueError('Artifact service is not initialized.')
+        self.artifacts[filename] = artifact.inline_data.data
+
+
+def _text(value) -> TextContent:
+    return TextContent(type='text', text=value if isinstance(value, str) else json.dumps(value))
+
+
+def _build(content, limits=ResponseLimits(), tool_context=None):
+    async def build():
+        response = await build_tool_response(content, limits)
+        return await save_full_response(response, tool_context or FakeToolContext(), 'list_cards')
+    return asyncio.run(build())
+
+
+def test_small_responses_are_unchanged():
+    assert _build([]) == {'success': True}
+    assert _build([_text({'id': 1})]) == {'success': True, 'artefacts': {'id': 1}}
+    assert _build([_text('not json')]) == {'success': True, 'text': 'not json', 'error_msg': PARSE_ERROR_MSG}
+
+
+def test_every_content_item_is_included():
+    image = ImageContent(type='image', data='aGk=', mimeType='image/png')
+    response = _build([_text({'id': 1}), _text('plain'), image])
+    assert response['artefacts'] == [{'id': 1}, 'plain', {'type': 'image', 'mimeType': 'image/png'}]
+
+
+def test_oversize_responses_are_summarised_and_saved_as_an_artifact():
+    cards = {'board': 'todo', 'cards': [{'id': i, 'description': 'x' * 100} for i in range(1000)]}
+    limits = ResponseLimits(max_response_chars=1_000, parse_in_thread_chars=1_000, preview_items=2)
+    tool_context = FakeToolContext()
+
+    response = _build([_text(cards)], limits, tool_context)
+    assert response['truncated'] and FULL_PAYLOAD_KEY not in response
+    assert response['artefacts']['values']['board'] == 'todo'
+    assert response['artefacts']['values']['cards']['length'] == 1000
+    assert len(response['artefacts']['values']['cards']['first_items']) == 2
+    assert len(json.dumps(response)) < 2_000
+    assert json.loads(tool_context.artifacts[response['full_response_ref']]) == cards
+
+    # Without an artifact service the rest of the response is dropped
+    response = _build([_text(cards)], limits, FakeToolContext(has_artifact_service=False))
+    assert response['truncated'] and 'full_response_ref' not in response and FULL_PAYLOAD_KEY not in response
@@ -0,0 +1,145 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastmcp import Client, FastMCP
+from mcp.types import ToolAnnotations
+
+from honu_google_adk.main import HonuMCPFunctionTool
+from honu_google_adk.mcp_session_pool import MCPSessionPool
+from honu_google_adk.tool_response import ResponseLimits
+from honu_google_adk.tool_result_cache import ToolResultCache
+from tests.test_tool_response import FakeToolContext
+
+server = FastMCP('test')
+boards = ['todo']
+calls = []
+
+
+@server.tool(annotations=ToolAnnotations(readOnlyHint=True))
+def list_boards(prefix: str = '', limit: int = 10) -> dict:
+    calls.append('list_boards')
+    return {'boards': [b for b in boards if b.startswith(prefix)][:limit]}
+
+
+@server.tool(tags={'cacheable'})
+def count_boards() -> dict:
+    calls.append('count_boards')
+    return {'count': len(boards)}
+
+
+@server.tool(annotations=ToolAnnotations(readOnlyHint=True))
+def export_boards() -> dict:
+    calls.append('export_boards')
+    return {'boards': [{'name': b, 'notes': 'x' * 1_000} for b in boards * 50]}
+
+
+@server.tool
+def add_board(name: str) -> dict:
+    calls.append('add_board')
+    boards.append(name)
+    return {'name': name}
+
+
+def _context(model_ref: str):
+    return SimpleNamespace(state={'token': 'token', 'model_ref': model_ref})
+
+
+def _session_context(model_ref: str) -> FakeToolContext:
+    tool_context = FakeToolContext()
+    tool_context.state = {'token': 'token', 'model_ref': model_ref}
+    return tool_context
+
+
+async def _tools(cache: ToolResultCache) -> dict[str, HonuMCPFunctionTool]:
+    async with Client(server) as client:
+        mcp_tools = await client.list_tools()
+    pool = MCPSessionPool()
+    tools = {}
+    for mcp_tool in mcp_tools:
+        tool = HonuMCPFunctionTool(mcp_tool, 'http://mcp.test', pool, cache, ResponseLimits(max_response_chars=10_000))
+        tool._get_client = lambda tool_context: Client(server)
+        tools[mcp_tool.name] = tool
+    return tools
+
+
+def test_read_only_results_are_cached_per_model_until_a_write():
+    calls.clear()
+    boards[:] = ['todo']
+    cache = ToolResultCache()
+
+    async def scenario():
+        tools = await _tools(cache)
+        list_boards, count_boards, add_board = tools['list_boards'], tools['count_boards'], tools['add_board']
+        assert list_boards.is_read_only and count_boards.is_read_only and not add_board.is_read_only
+
+        first = await list_boards.run_async(args={'prefix': '', 'limit': 10}, tool_context=_context('m1'))
+        # Argument order doesn't matter
+        second = await list_boards.run_async(args={'limit': 10, 'prefix': ''}, tool_context=_context('m1'))
+        await count_boards.run_async(args={}, tool_context=_context('m1'))
+        await count_boards.run_async(args={}, tool_context=_context('m1'))
+        await list_boards.run_async(args={'prefix': '', 'limit': 10}, tool_context=_context('m2'))
+        assert first == second == {'success': True, 'artefacts': {'boards': ['todo']}}
+        assert calls == ['list_boards', 'count_boards', 'list_boards']
+
+        # Writing for m1 drops only m1's cached results
+        await add_board.run_async(args={'name': 'done'}, tool_context=_context('m1'))
+        third = await list_boards.run_async(args={'prefix': '', 'limit': 10}, tool_context=_context('m1'))
+        await list_boards.run_async(args={'prefix': '', 'limit': 10}, tool_context=_context('m2'))
+        assert third['artefacts'] == {'boards': ['todo', 'done']}
+        await list_boards.session_pool.close()
+
+    asyncio.run(scenario())
+    assert calls[-2:] == ['add_board', 'list_boards']
+    assert (cache.hits, cache.misses) == (3, 4)
+
+
+def test_cache_is_bounded_and_expires():
+    cache = ToolResultCache(maxsize=2, ttl=60)
+    for model_ref in ('a', 'b', 'c'):
+        cache.set(cache.key(model_ref, 'tool', {}), {'success': True})
+    assert len(cache) == 2
+    assert cache.get(cache.key('a', 'tool', {})) is None
+
+    cache = ToolResultCache(ttl=0)
+    cache.set(cache.key('a', 'tool', {}), {'success': True})
+    assert cache.get(cache.key('a', 'tool', {})) is None
+
+
+def test_concurrent_identical_calls_share_one_request():
+    calls.clear()
+    cache = ToolResultCache()
+
+    async def scenario():
+        list_boards = (await _tools(cache))['list_boards']
+        responses = await asyncio.gather(*[
+            list_boards.run_async(args={'prefix': 't'}, tool_context=_context('m1'))
+            for _ in range(5)
+        ])
+        await list_boards.session_pool.close()
+        return responses
+
+    responses = asyncio.run(scenario())
+    assert all(r == responses[0] for r in responses)
+    # Each caller gets its own copy of the response
+    assert len({id(r) for r in responses}) == 5
+    assert calls == ['list_boards']
+    assert cache.deduplicated == 4
+
+
+def test_shared_summarised_responses_are_saved_in_each_callers_session():
+    calls.clear()
+    cache = ToolResultCache()
+
+    async def scenario():
+        export_boards = (await _tools(cache))['export_boards']
+        contexts = [_session_context('m1') for _ in range(3)]
+        responses = await asyncio.gather(*[export_boards.run_async(args={}, tool_context=c) for c in contexts])
+        await export_boards.session_pool.close()
+        return contexts, responses
+
+    contexts, responses = asyncio.run(scenario())
+    assert calls == ['export_boards']
+    assert all(r['truncated'] for r in responses)
+    # Every session can resolve the reference it was given
+    assert [list(c.artifacts) for c in contexts] == [[r['full_response_ref']] for r in responses]
+    assert len({r['full_response_ref'] for r in responses}) == 3
@@ -0,0 +1,18 @@
+from honu_google_adk.ttl_cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used_and_expired():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+    cache.set('a', 1, ttl=0)
+    assert cache.get('a') is None
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    assert cache.invalidate(lambda key: key == 'c') == 1
+    assert len(cache) == 0